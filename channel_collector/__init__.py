@@ -0,0 +1,16 @@
+"""
+YouTube Transcript Collector - движок сбора без GUI
+"""
+
+from .proxy import ProxyManager
+from .collector import YouTubeChannelCollector
+from .engine import CollectionEngine, CollectionResult, CollectorConfig, CollectorEvent
+
+__all__ = [
+    "ProxyManager",
+    "YouTubeChannelCollector",
+    "CollectionEngine",
+    "CollectionResult",
+    "CollectorConfig",
+    "CollectorEvent",
+]
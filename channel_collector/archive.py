@@ -0,0 +1,239 @@
+"""
+Компактный двоичный архив транскриптов с разметкой по времени
+
+Файл - заголовок и записи по одному видео. В записи три сжатых блока:
+метаданные (JSON), колонки времени (начало и длительность в мс, длина
+текста сегмента) и текст всех сегментов подряд. Поэтому выборка только по
+метаданным или по времени не распаковывает текст, а чтение идёт через
+mmap без разбора текста. Записи только дописываются; перед дописыванием
+недописанный после падения хвост обрезается, так что продолжение
+прерванного запуска безопасно.
+
+    python -m channel_collector.archive transcripts.tsa
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import zlib
+from typing import List, Dict, Iterator, Optional, Tuple
+
+
+MAGIC = b"TSA1\0\0\0\0"
+# Заголовок записи: метка, длины трёх сжатых блоков, число сегментов
+RECORD = struct.Struct("<4sIIII")
+RECORD_TAG = b"TSR1"
+# Колонки времени и длин - uint32
+COLUMN_WIDTH = 4
+
+
+def _pack(values: List[int]) -> bytes:
+    """Колонка uint32 little-endian: 4 байта на значение на любой платформе"""
+    return struct.pack(f"<{len(values)}I", *values)
+
+
+def _unpack(raw: bytes, count: int) -> Tuple[int, ...]:
+    if len(raw) != count * COLUMN_WIDTH:
+        raise Exception(f"Повреждённая запись архива: {len(raw)} байт вместо {count * COLUMN_WIDTH}")
+    return struct.unpack(f"<{count}I", raw)
+
+
+def scan_records(buffer, end: int) -> Tuple[List[int], int]:
+    """Смещения целых записей и конец последней из них
+
+    Недописанный хвост после падения в список не попадает.
+    """
+    offsets = []
+    position = len(MAGIC)
+
+    while position + RECORD.size <= end:
+        tag, meta_len, timing_len, text_len, _ = RECORD.unpack_from(buffer, position)
+        record_end = position + RECORD.size + meta_len + timing_len + text_len
+        if tag != RECORD_TAG or record_end > end:
+            break
+        offsets.append(position)
+        position = record_end
+
+    return offsets, min(position, end)
+
+
+def valid_length(path: str) -> int:
+    """Длина архива без недописанного хвоста (0 - файла нет или нет даже заголовка)"""
+    if not os.path.exists(path):
+        return 0
+
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < len(MAGIC):
+            return 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            if buffer[:len(MAGIC)] != MAGIC:
+                raise Exception(f"{path} - не архив транскриптов")
+            return scan_records(buffer, size)[1]
+
+
+def encode_record(item: Dict, segments: Optional[List[Dict]] = None, level: int = 6) -> bytes:
+    """Запись одного видео"""
+    # Текст в метаданные не попадает: он в сегментах
+    meta = {key: value for key, value in item.items() if key != 'transcript'}
+    segments = segments if segments is not None else [{'text': item.get('transcript', ''), 'start': 0.0}]
+
+    texts = [segment.get('text', '').encode('utf-8') for segment in segments]
+    timing = (
+        _pack([int(round(segment.get('start', 0.0) * 1000)) for segment in segments])
+        + _pack([int(round(segment.get('duration', 0.0) * 1000)) for segment in segments])
+        + _pack([len(text) for text in texts])
+    )
+
+    blocks = [
+        zlib.compress(json.dumps(meta, ensure_ascii=False).encode('utf-8'), level),
+        zlib.compress(timing, level),
+        zlib.compress(b"".join(texts), level),
+    ]
+
+    return RECORD.pack(RECORD_TAG, *(len(block) for block in blocks), len(segments)) + b"".join(blocks)
+
+
+class ArchivedTranscript:
+    """Видео из архива; блоки распаковываются по требованию"""
+
+    def __init__(self, buffer, offset: int):
+        tag, meta_len, timing_len, text_len, count = RECORD.unpack_from(buffer, offset)
+        if tag != RECORD_TAG:
+            raise Exception(f"Повреждённая запись архива по смещению {offset}")
+
+        self.count = count
+        self._buffer = buffer
+        self._meta_at = offset + RECORD.size
+        self._timing_at = self._meta_at + meta_len
+        self._text_at = self._timing_at + timing_len
+        self._end = self._text_at + text_len
+        self._meta: Optional[Dict] = None
+        self._timing: Optional[List[Tuple[int, ...]]] = None
+
+    @property
+    def size(self) -> int:
+        """Размер записи на диске"""
+        return self._end - self._meta_at + RECORD.size
+
+    @property
+    def meta(self) -> Dict:
+        """channel_id, video_id, title, published_at и прочие поля"""
+        if self._meta is None:
+            raw = zlib.decompress(self._buffer[self._meta_at:self._timing_at])
+            self._meta = json.loads(raw.decode('utf-8'))
+        return self._meta
+
+    def _columns(self) -> List[Tuple[int, ...]]:
+        if self._timing is None:
+            raw = zlib.decompress(self._buffer[self._timing_at:self._text_at])
+            width = self.count * COLUMN_WIDTH
+            self._timing = [
+                _unpack(raw[i * width:(i + 1) * width], self.count)
+                for i in range(3)
+            ]
+        return self._timing
+
+    @property
+    def starts(self) -> List[float]:
+        """Начало сегментов (сек)"""
+        return [value / 1000 for value in self._columns()[0]]
+
+    @property
+    def durations(self) -> List[float]:
+        """Длительность сегментов (сек)"""
+        return [value / 1000 for value in self._columns()[1]]
+
+    @property
+    def texts(self) -> List[str]:
+        """Текст сегментов"""
+        blob = zlib.decompress(self._buffer[self._text_at:self._end])
+        texts = []
+        position = 0
+        for length in self._columns()[2]:
+            texts.append(blob[position:position + length].decode('utf-8'))
+            position += length
+        return texts
+
+    def segments(self) -> List[Dict]:
+        """Сегменты в формате get_transcript"""
+        return [
+            {'text': text, 'start': start, 'duration': duration}
+            for text, start, duration in zip(self.texts, self.starts, self.durations)
+        ]
+
+    @property
+    def transcript(self) -> str:
+        """Текст как в format_transcript"""
+        return ' '.join(self.texts)
+
+
+class SegmentArchive:
+    """Чтение архива через mmap"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+        if size and self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise Exception(f"{path} - не архив транскриптов")
+
+        self._offsets = self._scan()
+
+    def _scan(self) -> List[int]:
+        """Смещения записей: читаются только заголовки"""
+        return scan_records(self._map, len(self._map))[0]
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __getitem__(self, index: int) -> ArchivedTranscript:
+        return ArchivedTranscript(self._map, self._offsets[index])
+
+    def __iter__(self) -> Iterator[ArchivedTranscript]:
+        for offset in self._offsets:
+            yield ArchivedTranscript(self._map, offset)
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "SegmentArchive":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m channel_collector.archive",
+        description="Сводка по архиву транскриптов или выгрузка в JSONL"
+    )
+    parser.add_argument("archive", help="Файл архива (.tsa)")
+    parser.add_argument("--jsonl", action="store_true",
+                        help="Выгрузить в stdout: одна строка на видео, с сегментами")
+    args = parser.parse_args(argv)
+
+    with SegmentArchive(args.archive) as archive:
+        if args.jsonl:
+            for record in archive:
+                print(json.dumps(dict(record.meta, segments=record.segments()), ensure_ascii=False))
+            return 0
+
+        segments = sum(record.count for record in archive)
+        size = os.path.getsize(args.archive)
+        print(f"Видео: {len(archive)}, сегментов: {segments}, "
+              f"размер: {size / 1024:.1f} КБ ({size / max(1, len(archive)) / 1024:.1f} КБ на видео)")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,312 @@
+"""
+Бенчмарки на локальном фейковом YouTube - без сети и без настоящих прокси
+
+    python -m channel_collector.benchmark --proxies 8 --videos 80
+    python -m channel_collector.benchmark listing full --json bench.json
+    python -m channel_collector.benchmark listing full --baseline bench.json
+    python -m channel_collector.benchmark full --errors 0.05 --timeouts 0.01
+
+fetch - масштабирование параллельной загрузки по числу прокси, listing -
+get_channel_videos, full - весь сбор через CollectionEngine (листинг,
+транскрипты, запись). Для listing и full считаются видео в секунду, вызовы
+Data API на видео и пик памяти. С --baseline результат сравнивается с
+прошлым прогоном, и просадка больше --tolerance даёт код выхода 1.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
+
+from .collector import YouTubeChannelCollector
+from .engine import CollectionEngine, CollectorConfig
+from .fake_server import API_PATH, FakeYouTubeServer, Faults
+from .fetcher import ConcurrentFetcher
+from .proxy import ProxyManager
+
+
+# Показатель -> True, если больше - лучше
+TRACKED = {
+    'videos_per_sec': True,
+    'api_calls_per_video': False,
+    'peak_mb': False,
+}
+
+
+class FakeTranscriptCollector(YouTubeChannelCollector):
+    """Коллектор, который берёт транскрипты (и Data API) с фейкового сервера"""
+
+    # Хост не обязан существовать: запрос уходит через прокси-сервер
+    transcript_url = "http://transcripts.fake/transcript"
+
+    def __init__(self, api_base: Optional[str] = None, timeout: float = 5):
+        super().__init__(api_key="benchmark")
+        self.timeout = timeout
+        # Без прокси транскрипты идут на тот же сервер, что и Data API
+        self.direct_url: Optional[str] = None
+        if api_base:
+            self.api_base = api_base
+            self.direct_url = api_base.rsplit(API_PATH, 1)[0] + "/transcript"
+
+    def get_transcript(self, video_id: str, proxies: Optional[Dict] = None) -> Optional[List[Dict]]:
+        response = self.session.get(
+            self.transcript_url if proxies or not self.direct_url else self.direct_url,
+            params={'v': video_id},
+            proxies=proxies,
+            timeout=self.timeout
+        )
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+
+
+def channel_ids(count: int) -> List[str]:
+    return [f"UCbench{i:017d}" for i in range(count)]
+
+
+def run_fetch(lanes: int, videos: int, delay_min: float, delay_max: float,
+              latency: float, max_concurrency: int) -> Dict:
+    """Один прогон: lanes прокси, videos видео"""
+    servers = [FakeYouTubeServer(latency=latency).start() for _ in range(lanes)]
+    try:
+        fetcher = ConcurrentFetcher(
+            FakeTranscriptCollector(),
+            [server.address for server in servers],
+            delay_min,
+            delay_max,
+            max_concurrency=max_concurrency,
+            long_pause_chance=0
+        )
+        jobs = [{'video_id': f"vid{i:05d}", 'title': f"Video {i}"} for i in range(videos)]
+
+        started = time.perf_counter()
+        fetched = sum(1 for result in fetcher.fetch(jobs) if result.transcript)
+        elapsed = time.perf_counter() - started
+
+        return {
+            'lanes': lanes,
+            'fetched': fetched,
+            'elapsed': elapsed,
+            'videos_per_sec': fetched / elapsed if elapsed else 0.0,
+            'per_proxy': [server.total_requests for server in servers],
+        }
+    finally:
+        for server in servers:
+            server.stop()
+
+
+def run_listing(channels: int, videos: int, latency: float, faults: Faults,
+                listing_workers: int = 1) -> Dict:
+    """Листинг каналов через get_channel_videos, listing_workers каналов одновременно"""
+    # Каждое 4-е видео короткое и отсеивается - на канале видео с запасом
+    with FakeYouTubeServer(latency=latency, videos_per_channel=videos * 2, faults=faults) as server:
+        collector = FakeTranscriptCollector(server.api_base)
+
+        def list_one(channel_id: str) -> Optional[int]:
+            try:
+                return len(collector.get_channel_videos(channel_id, max_results=videos, min_duration=10))
+            except Exception:
+                return None
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, listing_workers)) as pool:
+            counts = list(pool.map(list_one, channel_ids(channels)))
+        listed = sum(count for count in counts if count is not None)
+        errors = counts.count(None)
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        collector.close()
+
+        return {
+            'videos': listed,
+            'elapsed': elapsed,
+            'videos_per_sec': listed / elapsed if elapsed else 0.0,
+            'api_calls_per_video': server.api_requests / max(1, listed),
+            'peak_mb': peak / 1024 / 1024,
+            'errors': errors,
+            'injected': sum(server.injected.values()),
+        }
+
+
+def run_full(channels: int, videos: int, lanes: int, delay: float, latency: float,
+             max_concurrency: int, faults: Faults, concurrent: bool = True,
+             listing_workers: int = 1) -> Dict:
+    """Весь сбор: CollectionEngine с листингом, транскриптами и записью в JSONL"""
+    servers = [
+        FakeYouTubeServer(latency=latency, videos_per_channel=videos * 2,
+                          faults=Faults(**dict(vars(faults), seed=faults.seed + i))).start()
+        for i in range(max(1, lanes))
+    ]
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            proxy_manager = ProxyManager()
+            if lanes:
+                proxy_manager.set_proxies([server.address for server in servers])
+            # Ошибки здесь нарочные - прокси остывают недолго
+            proxy_manager.base_cooldown = 0.5
+            proxy_manager.max_cooldown = 2.0
+
+            config = CollectorConfig(
+                api_key="benchmark",
+                channel_ids=channel_ids(channels),
+                output_file=os.path.join(workdir, "bench.jsonl"),
+                output_format="jsonl",
+                video_count=videos,
+                min_duration=10,
+                delay_min=delay,
+                delay_max=delay,
+                max_backoff=max(delay * 4, 1.0),
+                concurrent=concurrent,
+                max_concurrency=max_concurrency,
+                pipeline=True,
+                listing_workers=listing_workers,
+                daily_quota=10 ** 9,
+                auto_resume_after=0
+            )
+            collector = FakeTranscriptCollector(servers[0].api_base)
+            engine = CollectionEngine(config, proxy_manager=proxy_manager, collector=collector)
+
+            tracemalloc.start()
+            started = time.perf_counter()
+            result = engine.run()
+            elapsed = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        collected = result.total_videos
+        return {
+            'videos': collected,
+            'elapsed': elapsed,
+            'videos_per_sec': collected / elapsed if elapsed else 0.0,
+            'api_calls_per_video': sum(server.api_requests for server in servers) / max(1, collected),
+            'peak_mb': peak / 1024 / 1024,
+            'errors': channels * videos - collected,
+            'injected': sum(sum(server.injected.values()) for server in servers),
+        }
+    finally:
+        for server in servers:
+            server.stop()
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Просадки относительно прошлого прогона"""
+    regressions = []
+    for name, stats in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for key, higher_is_better in TRACKED.items():
+            if key not in stats or not previous.get(key):
+                continue
+            change = (stats[key] - previous[key]) / previous[key]
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{name}.{key}: {previous[key]:.3f} -> {stats[key]:.3f} ({change:+.0%})")
+    return regressions
+
+
+def print_fetch(args: argparse.Namespace, results: Dict[str, Dict]):
+    lane_counts = []
+    lanes = 1
+    while lanes < args.proxies:
+        lane_counts.append(lanes)
+        lanes *= 2
+    lane_counts.append(args.proxies)
+
+    print(f"{'прокси':>7} {'видео':>6} {'время, с':>9} {'видео/с':>8} {'ускорение':>10}")
+
+    baseline = None
+    for lanes in lane_counts:
+        stats = run_fetch(lanes, args.videos, args.delay_min, args.delay_max,
+                          args.latency, args.max_concurrency)
+        baseline = baseline or stats['videos_per_sec']
+        speedup = stats['videos_per_sec'] / baseline if baseline else 0.0
+        print(f"{lanes:>7} {stats['fetched']:>6} {stats['elapsed']:>9.2f} "
+              f"{stats['videos_per_sec']:>8.2f} {speedup:>9.1f}x")
+        results[f"fetch-{lanes}"] = {'videos_per_sec': stats['videos_per_sec']}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m channel_collector.benchmark",
+        description="Бенчмарки сборщика на локальном фейковом YouTube"
+    )
+    parser.add_argument("suites", nargs="*", metavar="fetch|listing|full",
+                        help="Что мерить (по умолчанию fetch)")
+    parser.add_argument("--proxies", type=int, default=8, help="Максимум прокси (полос)")
+    parser.add_argument("--videos", type=int, default=80, help="Видео на прогон (listing, full - на канал)")
+    parser.add_argument("--channels", type=int, default=3, help="Каналов для listing и full")
+    parser.add_argument("--delay-min", type=float, default=0.2, help="Задержка min на полосу (сек)")
+    parser.add_argument("--delay-max", type=float, default=0.3, help="Задержка max на полосу (сек)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Задержка ответа сервера (сек)")
+    parser.add_argument("--max-concurrency", type=int, default=8, help="Общий лимит запросов")
+    parser.add_argument("--listing-workers", type=int, default=1,
+                        help="Каналов, листаемых одновременно (listing, full)")
+    parser.add_argument("--sequential", action="store_true",
+                        help="full без параллельного режима (один запрос за раз)")
+    parser.add_argument("--errors", type=float, default=0.0, help="Доля ответов 429")
+    parser.add_argument("--quota-errors", type=float, default=0.0, help="Доля ответов quotaExceeded")
+    parser.add_argument("--timeouts", type=float, default=0.0, help="Доля запросов без ответа")
+    parser.add_argument("--no-transcript", type=float, default=0.0, help="Доля видео без субтитров")
+    parser.add_argument("--seed", type=int, default=0, help="Зерно для ошибок")
+    parser.add_argument("--json", dest="json_file", help="Сохранить результаты в JSON")
+    parser.add_argument("--baseline", help="JSON прошлого прогона для сравнения")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Допустимая просадка относительно --baseline (доля)")
+    args = parser.parse_args(argv)
+    suites = args.suites or ["fetch"]
+    unknown = set(suites) - {"fetch", "listing", "full"}
+    if unknown:
+        parser.error(f"неизвестный бенчмарк: {', '.join(sorted(unknown))}")
+
+    faults = Faults(rate_limit=args.errors, quota=args.quota_errors, timeout=args.timeouts,
+                    no_transcript=args.no_transcript, seed=args.seed)
+    results: Dict[str, Dict] = {}
+
+    if "fetch" in suites:
+        print_fetch(args, results)
+
+    rows = []
+    if "listing" in suites:
+        results['listing'] = run_listing(args.channels, args.videos, args.latency, faults,
+                                         listing_workers=args.listing_workers)
+        rows.append('listing')
+    if "full" in suites:
+        name = "full-sequential" if args.sequential else "full"
+        results[name] = run_full(args.channels, args.videos, args.proxies, args.delay_min,
+                                 args.latency, args.max_concurrency, faults,
+                                 concurrent=not args.sequential,
+                                 listing_workers=args.listing_workers)
+        rows.append(name)
+
+    if rows:
+        print(f"{'прогон':<16} {'видео':>6} {'время, с':>9} {'видео/с':>8} "
+              f"{'API/видео':>10} {'пик, МБ':>8} {'ошибок':>7}")
+        for name in rows:
+            stats = results[name]
+            print(f"{name:<16} {stats['videos']:>6} {stats['elapsed']:>9.2f} {stats['videos_per_sec']:>8.1f} "
+                  f"{stats['api_calls_per_video']:>10.3f} {stats['peak_mb']:>8.1f} {stats['errors']:>7}")
+
+    if args.json_file:
+        with open(args.json_file, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"Просадка: {line}")
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
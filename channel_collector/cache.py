@@ -0,0 +1,138 @@
+"""
+Дисковый кэш транскриптов
+
+Сегменты хранятся сжатыми в SQLite по (video_id, language). Записи старше
+TTL не отдаются, а при превышении лимита размера удаляются давно не
+использованные (LRU).
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from typing import List, Dict, Optional
+
+
+class TranscriptCache:
+    """Кэш сегментов транскриптов с TTL и лимитом по размеру"""
+
+    def __init__(self, path: str, ttl: float = 7 * 24 * 3600,
+                 max_bytes: int = 512 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS transcripts (
+                video_id TEXT NOT NULL,
+                language TEXT NOT NULL,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (video_id, language)
+            );
+            CREATE INDEX IF NOT EXISTS transcripts_accessed ON transcripts (accessed_at);
+        """)
+        self._conn.commit()
+
+        with self._lock:
+            self._purge_expired()
+            self.total_bytes = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM transcripts"
+            ).fetchone()[0]
+
+    def get(self, video_id: str, language: str) -> Optional[List[Dict]]:
+        """Сегменты из кэша или None"""
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, size, created_at FROM transcripts WHERE video_id = ? AND language = ?",
+                (video_id, language)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            data, size, created_at = row
+
+            if now - created_at > self.ttl:
+                self._conn.execute(
+                    "DELETE FROM transcripts WHERE video_id = ? AND language = ?",
+                    (video_id, language)
+                )
+                self._conn.commit()
+                self.total_bytes -= size
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE transcripts SET accessed_at = ? WHERE video_id = ? AND language = ?",
+                (now, video_id, language)
+            )
+            self._conn.commit()
+            self.hits += 1
+
+        return json.loads(zlib.decompress(data))
+
+    def put(self, video_id: str, language: str, segments: List[Dict]):
+        """Сохранить сегменты"""
+        data = zlib.compress(
+            json.dumps(segments, ensure_ascii=False, separators=(',', ':')).encode('utf-8'),
+            6
+        )
+        now = time.time()
+
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT size FROM transcripts WHERE video_id = ? AND language = ?",
+                (video_id, language)
+            ).fetchone()
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?, ?, ?)",
+                (video_id, language, data, len(data), now, now)
+            )
+            self.total_bytes += len(data) - (old[0] if old else 0)
+
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+            self._conn.commit()
+
+    def _evict(self):
+        """Удалить давно не использованные записи до лимита"""
+        rows = self._conn.execute(
+            "SELECT video_id, language, size FROM transcripts ORDER BY accessed_at"
+        ).fetchall()
+        to_delete = []
+        excess = self.total_bytes - self.max_bytes
+
+        for video_id, language, size in rows:
+            if excess <= 0:
+                break
+            to_delete.append((video_id, language))
+            excess -= size
+            self.total_bytes -= size
+
+        self._conn.executemany(
+            "DELETE FROM transcripts WHERE video_id = ? AND language = ?", to_delete
+        )
+
+    def _purge_expired(self):
+        self._conn.execute(
+            "DELETE FROM transcripts WHERE created_at < ?", (time.time() - self.ttl,)
+        )
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,119 @@
+"""
+Контрольная точка задания в SQLite
+
+Хранит списки видео каналов и статус каждого видео, чтобы после остановки
+или сбоя продолжить с того же места, не перезапрашивая готовое.
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import List, Dict, Optional, Set
+
+
+class CheckpointStore:
+    """Статусы видео по (channel_id, video_id)"""
+
+    DONE = "done"
+    NO_TRANSCRIPT = "no_transcript"
+    FAILED = "failed"
+    FILTERED = "filtered"
+    DUPLICATE = "duplicate"
+    # Отсеяно по метаданным, транскрипт не запрашивался
+    SKIPPED = "skipped"
+
+    # Что не нужно повторять при продолжении
+    COMPLETED = (DONE, NO_TRANSCRIPT, FILTERED, DUPLICATE, SKIPPED)
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS channels (
+                channel_id TEXT PRIMARY KEY,
+                videos TEXT NOT NULL,
+                listed_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS videos (
+                channel_id TEXT NOT NULL,
+                video_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                error_class TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 1,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (channel_id, video_id)
+            );
+        """)
+        self._conn.commit()
+
+    def reset(self):
+        """Начать задание заново"""
+        with self._lock:
+            self._conn.execute("DELETE FROM channels")
+            self._conn.execute("DELETE FROM videos")
+            self._conn.commit()
+
+    def get_channel_videos(self, channel_id: str) -> Optional[List[Dict]]:
+        """Сохранённый список видео канала"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT videos FROM channels WHERE channel_id = ?", (channel_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_channel_videos(self, channel_id: str, videos: List[Dict]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO channels (channel_id, videos, listed_at) VALUES (?, ?, ?)",
+                (channel_id, json.dumps(videos, ensure_ascii=False), datetime.now().isoformat())
+            )
+            self._conn.commit()
+
+    def completed_videos(self, channel_id: str) -> Set[str]:
+        """video_id, которые уже не нужно загружать"""
+        placeholders = ",".join("?" * len(self.COMPLETED))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT video_id FROM videos WHERE channel_id = ? AND status IN ({placeholders})",
+                (channel_id, *self.COMPLETED)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def mark(self, channel_id: str, video_id: str, status: str,
+             error: Optional[Exception] = None):
+        """Записать статус видео"""
+        error_class = type(error).__name__ if error is not None else None
+        error_text = str(error)[:500] if error is not None else None
+
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO videos (channel_id, video_id, status, error_class, error, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (channel_id, video_id) DO UPDATE SET
+                    status = excluded.status,
+                    error_class = excluded.error_class,
+                    error = excluded.error,
+                    attempts = videos.attempts + 1,
+                    updated_at = excluded.updated_at
+                """,
+                (channel_id, video_id, status, error_class, error_text, datetime.now().isoformat())
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """Количество видео по статусам"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM videos GROUP BY status"
+            ).fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,238 @@
+"""
+Консольный режим: python -m channel_collector
+"""
+
+import argparse
+import signal
+import sys
+from typing import List, Optional
+
+from .engine import CollectionEngine, CollectorConfig, CollectorEvent
+
+
+def add_keyword_arguments(parser: argparse.ArgumentParser):
+    """Ключевые слова и отсев по метаданным"""
+    parser.add_argument("-k", "--keyword", dest="keywords", action="append", default=[],
+                        help="Ключевое слово или фраза (можно несколько раз или через запятую)")
+    parser.add_argument("--keyword-file",
+                        help="Файл со списком ключевых слов (по одному на строку)")
+    parser.add_argument("--whole-words", action="store_true",
+                        help="Искать только целые слова")
+    parser.add_argument("--prefilter-keywords", action="store_true",
+                        help="Не качать транскрипты видео, у которых слов нет в названии, описании и тегах")
+
+
+def add_language_arguments(parser: argparse.ArgumentParser):
+    """Выбор языка транскрипта"""
+    parser.add_argument("--language", dest="transcript_languages", action="append", default=[],
+                        help="Язык транскрипта по приоритету (можно несколько раз; по умолчанию en, ru, es, fr, de)")
+    parser.add_argument("--negotiate-language", action="store_true",
+                        help="Выбирать дорожку по списку субтитров: ручные раньше автоматических, "
+                             "любой язык в крайнем случае")
+    parser.add_argument("--prefer-generated", action="store_true",
+                        help="С --negotiate-language: автоматические субтитры раньше ручных")
+    parser.add_argument("--translate-to",
+                        help="Перевести транскрипт на этот язык силами YouTube (например en)")
+
+
+def add_api_arguments(parser: argparse.ArgumentParser):
+    """Ключи API, кэш каналов и учёт квоты"""
+    parser.add_argument("--api-key-file", required=True,
+                        help="Файл с API ключами (.txt, по одному на строку)")
+    parser.add_argument("--channel-cache", default="channels_cache.sqlite",
+                        help="Кэш каналов: плейлисты загрузок и @handle между запусками")
+    parser.add_argument("--quota-file", default="quota_usage.sqlite",
+                        help="Файл учёта квоты API между запусками")
+    parser.add_argument("--daily-quota", type=int, default=10000,
+                        help="Дневной лимит единиц квоты на ключ")
+
+
+def add_proxy_arguments(parser: argparse.ArgumentParser):
+    """Прокси и темп запросов транскриптов"""
+    parser.add_argument("--proxies", dest="proxy_file",
+                        help="Файл прокси")
+    parser.add_argument("--check-proxies", action="store_true",
+                        help="Проверить прокси перед стартом и убрать неработающие")
+    parser.add_argument("--delay-min", type=float, default=3,
+                        help="Задержка min (сек)")
+    parser.add_argument("--max-backoff", type=float, default=120,
+                        help="Предел замедления адаптивного темпа (сек)")
+    parser.add_argument("--max-concurrency", type=int, default=4,
+                        help="Общий лимит одновременных запросов транскриптов")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Аргументы командной строки"""
+    parser = argparse.ArgumentParser(
+        prog="python -m channel_collector",
+        description="Сбор транскриптов с YouTube каналов без GUI"
+    )
+    parser.add_argument("channels", nargs="+",
+                        help="ID каналов, @handle или ссылки на каналы (через пробел или запятую)")
+    add_api_arguments(parser)
+    parser.add_argument("-o", "--output", default="transcripts_output.txt",
+                        help="Куда сохранить файл")
+    parser.add_argument("--format", dest="output_format", default="auto",
+                        choices=["auto", "text", "jsonl", "archive"],
+                        help="Формат вывода (auto - по расширению файла)")
+    parser.add_argument("-n", "--count", type=int, default=100,
+                        help="Количество видео на канал")
+    parser.add_argument("--min-duration", type=int, default=10,
+                        help="Минимальная длительность (минут)")
+    add_keyword_arguments(parser)
+    add_language_arguments(parser)
+    parser.add_argument("--after", dest="published_after",
+                        help="Только видео, опубликованные не раньше даты ГГГГ-ММ-ДД")
+    parser.add_argument("--before", dest="published_before",
+                        help="Только видео, опубликованные не позже даты ГГГГ-ММ-ДД")
+    parser.add_argument("--captions-only", action="store_true",
+                        help="Только видео с субтитрами, загруженными автором (без автоматических)")
+    parser.add_argument("--audio-language", dest="audio_languages", action="append", default=[],
+                        help="Язык звука видео (en, ru; можно несколько раз)")
+    parser.add_argument("--checkpoint", dest="checkpoint_file",
+                        help="Файл контрольной точки (SQLite)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Продолжить прерванный запуск: пропустить готовое, повторить ошибки")
+    parser.add_argument("--cache", dest="cache_file",
+                        help="Файл кэша транскриптов (SQLite)")
+    parser.add_argument("--cache-ttl", type=float, default=7 * 24,
+                        help="Срок жизни кэша (часов)")
+    parser.add_argument("--cache-max-mb", type=float, default=512,
+                        help="Максимальный размер кэша (МБ)")
+    parser.add_argument("--sync-state", dest="sync_file",
+                        help="Файл состояния каналов: листать только новые видео")
+    parser.add_argument("--new-only", action="store_true",
+                        help="С --sync-state: обрабатывать только новые видео")
+    parser.add_argument("--index", dest="index_file",
+                        help="Полнотекстовый индекс (SQLite FTS5) для python -m channel_collector.search")
+    parser.add_argument("--no-dedup", action="store_true",
+                        help="Сохранять и почти одинаковые транскрипты (перезаливы, зеркала)")
+    parser.add_argument("--dedup-threshold", type=float, default=0.85,
+                        help="Порог сходства текста для дубликата (0-1)")
+    parser.add_argument("--dedup-file",
+                        help="Отпечатки между запусками: уже сохранённые видео не собираются повторно")
+    parser.add_argument("--quota-reserve", type=int, default=0,
+                        help="Сколько единиц квоты не трогать")
+    parser.add_argument("--quota-wait", action="store_true",
+                        help="Ждать сброса квоты вместо откладывания каналов")
+    add_proxy_arguments(parser)
+    parser.add_argument("--rotation", type=int, default=10,
+                        help="Ротация каждые N запросов")
+    parser.add_argument("--delay-max", type=float, default=10,
+                        help="Задержка max (сек, только с --fixed-delay)")
+    parser.add_argument("--fixed-delay", action="store_true",
+                        help="Случайная задержка min-max вместо адаптивного темпа")
+    parser.add_argument("--concurrent", action="store_true",
+                        help="Параллельная загрузка: полоса на каждый прокси")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Качать транскрипты, пока каналы ещё листаются")
+    parser.add_argument("--pipeline-queue", type=int, default=200,
+                        help="Размер очереди видео между листингом и загрузкой")
+    parser.add_argument("--listing-workers", type=int, default=1,
+                        help="Сколько каналов листать одновременно (с --pipeline и --queue)")
+    parser.add_argument("--queue", dest="queue_file",
+                        help="Файл общей очереди: транскрипты качают рабочие (python -m channel_collector.worker)")
+    parser.add_argument("--queue-port", type=int,
+                        help="Открыть очередь рабочим с других машин на http://0.0.0.0:PORT")
+    parser.add_argument("--queue-token", help="Токен, который рабочие передают с --token (обязателен с --queue-port)")
+    parser.add_argument("--lease", type=float, default=120,
+                        help="Аренда задания рабочим (сек): потом оно возвращается в очередь")
+    parser.add_argument("--max-attempts", type=int, default=3,
+                        help="Попыток на видео в общей очереди до ошибки")
+    parser.add_argument("--metrics", dest="metrics_file",
+                        help="Сохранить метрики запуска (время вызовов по прокси и методам API) в JSON")
+    parser.add_argument("--metrics-port", type=int,
+                        help="Отдавать метрики в формате Prometheus на http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--auto-resume", type=float, default=60,
+                        help="Снимать паузу через N секунд (0 - сразу)")
+    return parser
+
+
+def print_event(event: CollectorEvent):
+    """Печать событий движка в stderr"""
+    if event.kind in ("log", "paused", "resumed"):
+        print(event.format(), file=sys.stderr, flush=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    try:
+        api_keys = CollectorConfig.read_api_keys(args.api_key_file)
+    except Exception as e:
+        print(f"Не удалось загрузить API ключ: {e}", file=sys.stderr)
+        return 2
+
+    config = CollectorConfig(
+        api_key=api_keys[0],
+        api_keys=api_keys,
+        channel_ids=CollectorConfig.parse_channels(','.join(args.channels)),
+        output_file=args.output,
+        output_format=args.output_format,
+        checkpoint_file=args.checkpoint_file,
+        resume=args.resume,
+        cache_file=args.cache_file,
+        cache_ttl_hours=args.cache_ttl,
+        cache_max_mb=args.cache_max_mb,
+        channel_cache=args.channel_cache,
+        sync_file=args.sync_file,
+        new_only=args.new_only,
+        index_file=args.index_file,
+        dedup=not args.no_dedup,
+        dedup_threshold=args.dedup_threshold,
+        dedup_file=args.dedup_file,
+        quota_file=args.quota_file,
+        daily_quota=args.daily_quota,
+        quota_reserve=args.quota_reserve,
+        quota_wait=args.quota_wait,
+        video_count=args.count,
+        min_duration=args.min_duration,
+        keyword=",".join(args.keywords),
+        keyword_file=args.keyword_file,
+        whole_words=args.whole_words,
+        prefilter_keywords=args.prefilter_keywords,
+        transcript_languages=args.transcript_languages,
+        negotiate_language=args.negotiate_language,
+        prefer_generated=args.prefer_generated,
+        translate_to=args.translate_to,
+        published_after=args.published_after,
+        published_before=args.published_before,
+        captions_only=args.captions_only,
+        audio_languages=args.audio_languages,
+        proxy_file=args.proxy_file,
+        rotation_interval=args.rotation,
+        check_proxies=args.check_proxies,
+        delay_min=args.delay_min,
+        delay_max=args.delay_max,
+        adaptive_delay=not args.fixed_delay,
+        max_backoff=args.max_backoff,
+        concurrent=args.concurrent,
+        max_concurrency=args.max_concurrency,
+        pipeline=args.pipeline,
+        pipeline_queue=args.pipeline_queue,
+        listing_workers=args.listing_workers,
+        queue_file=args.queue_file,
+        queue_port=args.queue_port,
+        queue_token=args.queue_token,
+        lease_seconds=args.lease,
+        max_attempts=args.max_attempts,
+        metrics_file=args.metrics_file,
+        metrics_port=args.metrics_port,
+        auto_resume_after=args.auto_resume
+    )
+
+    try:
+        engine = CollectionEngine(config, on_event=print_event)
+    except Exception as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    # Ctrl+C - мягкая остановка с сохранением собранного
+    signal.signal(signal.SIGINT, lambda *_: engine.stop())
+
+    try:
+        result = engine.run()
+    except Exception as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    return 0 if result.total_videos else 1
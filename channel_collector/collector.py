@@ -0,0 +1,421 @@
+"""
+Клиент YouTube Data API и загрузка транскриптов
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Set, Tuple, Any, Iterator
+import requests
+from requests.adapters import HTTPAdapter
+
+from .keys import ApiKeyPool
+from .languages import DEFAULT_LANGUAGES, LanguagePolicy
+from .metrics import Metrics, proxy_label
+from .quota import MAX_BATCH, QUOTA_COSTS, QuotaExceededError, QuotaMeter
+from .resolver import ChannelDirectory
+
+
+API_BASE = "https://www.googleapis.com/youtube/v3"
+
+# Причины 403, означающие исчерпанную квоту ключа
+QUOTA_REASONS = ('quotaExceeded', 'dailyLimitExceeded', 'rateLimitExceeded',
+                 'userRateLimitExceeded')
+
+
+class YouTubeChannelCollector:
+    """Сбор транскриптов с YouTube каналов"""
+    
+    # Адрес Data API и таймаут запроса (бенчмарк подменяет на локальный сервер)
+    api_base = API_BASE
+    timeout = 30
+    # Запрашивать следующую страницу плейлиста параллельно с videos.list
+    prefetch_pages = True
+    
+    def __init__(self, api_key: str, quota: Optional[QuotaMeter] = None,
+                 key_pool: Optional[ApiKeyPool] = None,
+                 metrics: Optional[Metrics] = None):
+        self.api_key = api_key
+        self.quota = quota
+        self.key_pool = key_pool
+        # Время и исход каждого сетевого вызова
+        self.metrics = metrics
+        # Кэш плейлистов загрузок: channels.list один раз на канал
+        self.directory: Optional[ChannelDirectory] = None
+        # Приоритет языков транскрипта
+        self.languages = list(DEFAULT_LANGUAGES)
+        # Выбор дорожки по списку субтитров видео (None - первый язык из languages)
+        self.language_policy: Optional[LanguagePolicy] = None
+        # Видео -> почему субтитров нет (имя исключения); ведётся, только если задан словарь
+        self.missing_reasons: Optional[Dict[str, str]] = None
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        })
+        # Клиенты транскриптов: keep-alive сессия на каждый прокси
+        self._transcript_clients: Dict[Optional[str], Tuple[Any, threading.Lock]] = {}
+        self._transcript_sessions: List[requests.Session] = []
+        self._clients_lock = threading.Lock()
+    
+    def api_get(self, endpoint: str, params: Dict, proxies: Optional[Dict] = None) -> Dict:
+        """Вызов YouTube Data API с учётом квоты
+        
+        С пулом ключей вызовы распределяются по ключам, а при quotaExceeded
+        запрос повторяется со следующим ключом.
+        """
+        cost = QUOTA_COSTS.get(endpoint, 1)
+        
+        if not self.key_pool:
+            return self._api_call(self.api_key, endpoint, params, proxies, cost)
+        
+        last_error = None
+        for _ in range(len(self.key_pool.keys)):
+            api_key = self.key_pool.acquire(cost, self.quota)
+            try:
+                return self._api_call(api_key, endpoint, params, proxies, cost)
+            except QuotaExceededError as e:
+                # Моментальная смена ключа!
+                self.key_pool.report_exhausted(api_key, e.reason)
+                last_error = e
+        
+        raise last_error or QuotaExceededError("Нет API ключей")
+    
+    def _api_call(self, api_key: str, endpoint: str, params: Dict,
+                  proxies: Optional[Dict], cost: int) -> Dict:
+        if self.quota and not self.quota.can_afford(api_key, cost):
+            raise QuotaExceededError(
+                f"Квота ключа на сегодня исчерпана ({self.quota.used(api_key)} ед.)"
+            )
+        
+        started = time.monotonic()
+        status = "error"
+        try:
+            response = self.session.get(
+                f"{self.api_base}/{endpoint}",
+                params={**params, 'key': api_key},
+                proxies=proxies,
+                timeout=self.timeout
+            )
+            status = str(response.status_code)
+        finally:
+            if self.metrics:
+                self.metrics.observe('api_request_seconds', time.monotonic() - started,
+                                     endpoint=endpoint, proxy=proxy_label(proxies))
+                self.metrics.inc('api_requests', endpoint=endpoint, status=status)
+        
+        # Google списывает единицы и за неудачные запросы
+        if self.quota:
+            self.quota.charge(api_key, endpoint, cost)
+        
+        if response.status_code == 403:
+            reason = self._error_reason(response)
+            if reason in QUOTA_REASONS:
+                if self.quota and reason in ('quotaExceeded', 'dailyLimitExceeded'):
+                    self.quota.mark_exhausted(api_key)
+                raise QuotaExceededError(f"YouTube API: {reason}", reason)
+        
+        response.raise_for_status()
+        return response.json()
+    
+    @staticmethod
+    def _error_reason(response: requests.Response) -> Optional[str]:
+        """Причина ошибки из тела ответа API"""
+        try:
+            errors = response.json()['error']['errors']
+            return errors[0].get('reason')
+        except Exception:
+            return None
+    
+    def get_uploads_playlist(self, channel_id: str, proxies: Optional[Dict] = None) -> str:
+        """Получить ID плейлиста загрузок канала"""
+        if self.directory:
+            uploads_playlist = self.directory.uploads_playlist(channel_id)
+            if uploads_playlist:
+                return uploads_playlist
+        
+        data = self.api_get('channels', {
+            'part': 'contentDetails',
+            'id': channel_id
+        }, proxies)
+        
+        if 'items' not in data or len(data['items']) == 0:
+            raise Exception(f"Канал {channel_id} не найден")
+        
+        if self.directory:
+            self.directory.save(data['items'][:1])
+        
+        return data['items'][0]['contentDetails']['relatedPlaylists']['uploads']
+    
+    def get_channel_videos(self, channel_id: str, max_results: int = 50, 
+                          min_duration: int = 0, proxies: Optional[Dict] = None,
+                          uploads_playlist: Optional[str] = None,
+                          known_ids: Optional[Set[str]] = None,
+                          since: Optional[str] = None,
+                          cursor: Optional[Dict] = None) -> List[Dict]:
+        """Получить список видео канала через YouTube Data API
+        
+        known_ids / since - инкрементальный режим: листание останавливается
+        на первом уже известном видео или видео не новее since (publishedAt),
+        детали запрашиваются только для новых видео. В cursor записывается
+        самое свежее видео плейлиста, включая отсеянные по длительности.
+        """
+        videos = []
+        for page in self.iter_channel_videos(channel_id, max_results, min_duration, proxies,
+                                             uploads_playlist, known_ids, since, cursor):
+            videos.extend(page)
+        return videos
+    
+    def iter_channel_videos(self, channel_id: str, max_results: int = 50, 
+                            min_duration: int = 0, proxies: Optional[Dict] = None,
+                            uploads_playlist: Optional[str] = None,
+                            known_ids: Optional[Set[str]] = None,
+                            since: Optional[str] = None,
+                            cursor: Optional[Dict] = None) -> Iterator[List[Dict]]:
+        """То же, что get_channel_videos, но видео отдаются по страницам
+        
+        Первые видео можно отправлять на загрузку транскриптов, пока
+        следующие страницы плейлиста ещё не запрошены.
+        """
+        # Следующая страница плейлиста качается, пока идёт videos.list текущей
+        prefetch = ThreadPoolExecutor(max_workers=1) if self.prefetch_pages else None
+        
+        try:
+            # Получаем uploads playlist ID
+            if not uploads_playlist:
+                uploads_playlist = self.get_uploads_playlist(channel_id, proxies)
+            
+            # Получаем видео из playlist
+            found = 0
+            next_page_token = None
+            upcoming = None
+            
+            while found < max_results:
+                # Страница всегда полная: 50 элементов стоят столько же, сколько 1
+                params = {
+                    'part': 'contentDetails',
+                    'playlistId': uploads_playlist,
+                    'maxResults': MAX_BATCH
+                }
+                
+                if next_page_token:
+                    params['pageToken'] = next_page_token
+                
+                if upcoming is not None:
+                    data = upcoming.result()
+                    upcoming = None
+                else:
+                    data = self.api_get('playlistItems', params, proxies)
+                
+                video_ids = []
+                reached_known = False
+                
+                for item in data.get('items', []):
+                    details = item['contentDetails']
+                    published = details.get('videoPublishedAt')
+                    
+                    if cursor is not None and published and published > (cursor.get('newest_published_at') or ''):
+                        cursor['newest_published_at'] = published
+                        cursor['newest_video_id'] = details['videoId']
+                    
+                    if known_ids and details['videoId'] in known_ids:
+                        reached_known = True
+                        break
+                    if since and published and published <= since:
+                        reached_known = True
+                        break
+                    
+                    video_ids.append(details['videoId'])
+                
+                if not video_ids:
+                    break
+                
+                next_page_token = data.get('nextPageToken')
+                
+                # Заранее - только страницу, которая точно понадобится: квота не тратится зря
+                if (prefetch and next_page_token and not reached_known
+                        and found + len(video_ids) < max_results):
+                    upcoming = prefetch.submit(
+                        self.api_get, 'playlistItems', dict(params, pageToken=next_page_token), proxies
+                    )
+                
+                # Получаем детали видео (duration, title) - до 50 id за вызов
+                video_data = self.api_get('videos', {
+                    'part': 'contentDetails,snippet',
+                    'id': ','.join(video_ids)
+                }, proxies)
+                
+                page = []
+                for item in video_data.get('items', []):
+                    duration = self._parse_duration(item['contentDetails']['duration'])
+                    
+                    if duration >= min_duration:
+                        snippet = item['snippet']
+                        page.append({
+                            'video_id': item['id'],
+                            'title': snippet['title'],
+                            'duration': duration,
+                            'published_at': snippet['publishedAt'],
+                            # Метаданные для отсева до загрузки транскрипта
+                            'description': snippet.get('description', ''),
+                            'tags': snippet.get('tags', []),
+                            'caption': item['contentDetails'].get('caption') == 'true',
+                            'language': snippet.get('defaultAudioLanguage') or snippet.get('defaultLanguage')
+                        })
+                
+                page = page[:max_results - found]
+                found += len(page)
+                if page:
+                    yield page
+                
+                if not next_page_token or reached_known:
+                    break
+        
+        except QuotaExceededError:
+            raise
+        
+        except Exception as e:
+            raise Exception(f"Ошибка получения видео канала {channel_id}: {e}")
+        
+        finally:
+            if prefetch:
+                prefetch.shutdown(wait=False)
+    
+    def _parse_duration(self, duration_str: str) -> int:
+        """Парсинг ISO 8601 duration в минуты"""
+        import re
+        
+        pattern = r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?'
+        match = re.match(pattern, duration_str)
+        
+        if not match:
+            return 0
+        
+        hours = int(match.group(1) or 0)
+        minutes = int(match.group(2) or 0)
+        seconds = int(match.group(3) or 0)
+        
+        return hours * 60 + minutes + (1 if seconds > 30 else 0)
+    
+    def language_key(self) -> str:
+        """Языковая часть ключа кэша транскриптов"""
+        if self.language_policy:
+            return self.language_policy.key()
+        return ','.join(self.languages)
+    
+    def get_transcript(self, video_id: str, proxies: Optional[Dict] = None) -> Optional[List[Dict]]:
+        """Получить транскрипт видео
+        
+        None - у видео нет субтитров. Сетевые ошибки и блокировки
+        пробрасываются, чтобы их можно было повторить позже.
+        """
+        from youtube_transcript_api import (
+            YouTubeTranscriptApi,
+            NoTranscriptFound,
+            TranscriptsDisabled,
+            VideoUnavailable,
+        )
+        
+        languages = self.languages
+        started = time.monotonic()
+        outcome = "ok"
+        
+        try:
+            # Получаем транскрипт (приоритет английскому)
+            if hasattr(YouTubeTranscriptApi, 'get_transcript'):
+                # youtube-transcript-api 0.6: сессию библиотека создаёт сама
+                if self.language_policy:
+                    tracks = YouTubeTranscriptApi.list_transcripts(video_id, proxies=proxies)
+                    return self.fetch_track(tracks)
+                return YouTubeTranscriptApi.get_transcript(
+                    video_id,
+                    languages=languages,
+                    proxies=proxies
+                )
+            
+            # youtube-transcript-api >= 1.0: своя сессия через выбранный прокси
+            api, lock = self.transcript_client(proxies)
+            with lock:
+                # Ожидание блокировки - не сеть, его не считаем
+                started = time.monotonic()
+                if self.language_policy:
+                    return self.fetch_track(api.list(video_id))
+                return api.fetch(video_id, languages=languages).to_raw_data()
+        
+        except (NoTranscriptFound, TranscriptsDisabled, VideoUnavailable) as e:
+            outcome = "none"
+            if self.missing_reasons is not None:
+                self.missing_reasons[video_id] = type(e).__name__
+            return None
+        
+        except Exception as e:
+            outcome = type(e).__name__
+            raise
+        
+        finally:
+            if self.metrics:
+                self.metrics.observe('transcript_request_seconds', time.monotonic() - started,
+                                     proxy=proxy_label(proxies), outcome=outcome)
+    
+    def fetch_track(self, tracks) -> Optional[List[Dict]]:
+        """Выбрать дорожку по политике языков и скачать её"""
+        choice = self.language_policy.choose(tracks)
+        if choice is None:
+            return None
+        
+        track, source = choice
+        fetched = track.fetch()
+        
+        if self.metrics:
+            self.metrics.inc('transcript_tracks', language=track.language_code,
+                             kind="generated" if source.is_generated else "manual",
+                             translated="yes" if track is not source else "no")
+        
+        # 1.x отдаёт FetchedTranscript, 0.6 - список словарей
+        return fetched.to_raw_data() if hasattr(fetched, 'to_raw_data') else fetched
+    
+    def transcript_client(self, proxies: Optional[Dict] = None) -> Tuple[Any, threading.Lock]:
+        """Клиент транскриптов для прокси
+        
+        Сессия с keep-alive создаётся один раз на прокси, так что TLS
+        рукопожатие и consent-cookie не повторяются для каждого видео.
+        Клиент не потокобезопасен, поэтому к нему прилагается блокировка.
+        """
+        from youtube_transcript_api import YouTubeTranscriptApi
+        
+        key = proxies.get('https') if proxies else None
+        
+        with self._clients_lock:
+            client = self._transcript_clients.get(key)
+            
+            if client is None:
+                session = requests.Session()
+                session.headers.update(self.session.headers)
+                adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                
+                if proxies:
+                    session.proxies.update(proxies)
+                
+                client = (YouTubeTranscriptApi(http_client=session), threading.Lock())
+                self._transcript_clients[key] = client
+                self._transcript_sessions.append(session)
+        
+        return client
+    
+    def close(self):
+        """Закрыть все HTTP сессии"""
+        with self._clients_lock:
+            for session in self._transcript_sessions:
+                session.close()
+            self._transcript_sessions.clear()
+            self._transcript_clients.clear()
+        self.session.close()
+    
+    def format_transcript(self, transcript: List[Dict]) -> str:
+        """Форматировать транскрипт в текст"""
+        lines = []
+        for entry in transcript:
+            text = entry.get('text', '')
+            lines.append(text)
+        return ' '.join(lines)
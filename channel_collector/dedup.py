@@ -0,0 +1,180 @@
+"""
+Поиск дубликатов транскриптов: точных и почти точных
+
+Текст нормализуется (регистр, пунктуация, пробелы), режется на шинглы
+по 5 слов, и по ним считается MinHash-подпись. Одна хэш-функция на шингл
+раскладывается по корзинам (one permutation hashing), так что подпись
+стоит один хэш на шингл. Кандидаты ищутся по полосам подписи (LSH),
+сходство - по доле совпавших корзин. Перезаливы и зеркала с тем же
+текстом ловятся до записи в файл.
+"""
+
+import hashlib
+import re
+import sqlite3
+import struct
+import threading
+from typing import List, Optional, Tuple
+
+
+# Корзин в подписи и полос для LSH: 16 полос по 8 корзин
+BINS = 128
+BANDS = 16
+ROWS = BINS // BANDS
+SHINGLE_WORDS = 5
+
+_EMPTY = (1 << 64) - 1
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize(text: str) -> List[str]:
+    """Слова текста без регистра и пунктуации"""
+    return _WORD.findall(text.casefold())
+
+
+def digest(words: List[str]) -> str:
+    """Отпечаток точного совпадения"""
+    return hashlib.sha1(' '.join(words).encode('utf-8')).hexdigest()
+
+
+def signature(words: List[str]) -> List[int]:
+    """MinHash-подпись по шинглам из SHINGLE_WORDS слов"""
+    bins = [_EMPTY] * BINS
+    count = max(1, len(words) - SHINGLE_WORDS + 1)
+
+    for i in range(count):
+        shingle = ' '.join(words[i:i + SHINGLE_WORDS]).encode('utf-8')
+        value = int.from_bytes(hashlib.blake2b(shingle, digest_size=8).digest(), 'little')
+        index = value % BINS
+        value //= BINS
+        if value < bins[index]:
+            bins[index] = value
+
+    # Пустые корзины (короткий текст) берут значение соседа справа -
+    # иначе два разных коротких текста совпадали бы по пустым корзинам
+    for i in range(BINS):
+        if bins[i] == _EMPTY:
+            for step in range(1, BINS):
+                neighbour = bins[(i + step) % BINS]
+                if neighbour != _EMPTY:
+                    bins[i] = neighbour + step
+                    break
+
+    return bins
+
+
+def similarity(first: List[int], second: List[int]) -> float:
+    """Оценка сходства Жаккара по подписям"""
+    return sum(1 for a, b in zip(first, second) if a == b) / BINS
+
+
+def _band_keys(bins: List[int]) -> List[str]:
+    return [
+        hashlib.sha1(struct.pack(f"<{ROWS}Q", *bins[band * ROWS:(band + 1) * ROWS])).hexdigest()[:16]
+        for band in range(BANDS)
+    ]
+
+
+class FingerprintStore:
+    """Отпечатки сохранённых транскриптов (в памяти или в файле между запусками)"""
+
+    def __init__(self, path: str = ":memory:", threshold: float = 0.85):
+        self.path = path
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                video_id TEXT PRIMARY KEY,
+                channel_id TEXT,
+                digest TEXT NOT NULL,
+                signature BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS fingerprints_digest ON fingerprints (digest);
+            CREATE TABLE IF NOT EXISTS bands (
+                band INTEGER NOT NULL,
+                key TEXT NOT NULL,
+                video_id TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS bands_key ON bands (band, key);
+            CREATE TABLE IF NOT EXISTS duplicates (
+                video_id TEXT PRIMARY KEY,
+                original TEXT NOT NULL,
+                similarity REAL NOT NULL
+            );
+        """)
+        self._conn.commit()
+
+    def has_video(self, video_id: str) -> bool:
+        """Видео уже сохранено или отброшено как дубликат (в этом или прошлых запусках)"""
+        with self._lock:
+            return self._conn.execute(
+                """
+                SELECT 1 FROM fingerprints WHERE video_id = ?
+                UNION ALL
+                SELECT 1 FROM duplicates WHERE video_id = ?
+                """,
+                (video_id, video_id)
+            ).fetchone() is not None
+
+    def check_and_add(self, channel_id: str, video_id: str,
+                      text: str) -> Optional[Tuple[str, float]]:
+        """Найти дубликат текста; если его нет - запомнить отпечаток
+
+        Возвращает (video_id оригинала, сходство) или None.
+        """
+        words = normalize(text)
+        exact = digest(words)
+        bins = signature(words)
+        keys = _band_keys(bins)
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT video_id FROM fingerprints WHERE digest = ? AND video_id != ? LIMIT 1",
+                (exact, video_id)
+            ).fetchone()
+            if row:
+                return self._mark_duplicate(video_id, row[0], 1.0)
+
+            candidates = set()
+            for band, key in enumerate(keys):
+                for (candidate,) in self._conn.execute(
+                    "SELECT video_id FROM bands WHERE band = ? AND key = ?", (band, key)
+                ):
+                    if candidate != video_id:
+                        candidates.add(candidate)
+
+            best: Optional[Tuple[str, float]] = None
+            for candidate in candidates:
+                raw = self._conn.execute(
+                    "SELECT signature FROM fingerprints WHERE video_id = ?", (candidate,)
+                ).fetchone()[0]
+                score = similarity(bins, list(struct.unpack(f"<{BINS}Q", raw)))
+                if score >= self.threshold and (best is None or score > best[1]):
+                    best = (candidate, score)
+
+            if best:
+                return self._mark_duplicate(video_id, *best)
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fingerprints (video_id, channel_id, digest, signature) VALUES (?, ?, ?, ?)",
+                (video_id, channel_id, exact, struct.pack(f"<{BINS}Q", *bins))
+            )
+            self._conn.executemany(
+                "INSERT INTO bands (band, key, video_id) VALUES (?, ?, ?)",
+                [(band, key, video_id) for band, key in enumerate(keys)]
+            )
+            self._conn.commit()
+            return None
+
+    def _mark_duplicate(self, video_id: str, original: str, score: float) -> Tuple[str, float]:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO duplicates (video_id, original, similarity) VALUES (?, ?, ?)",
+            (video_id, original, score)
+        )
+        self._conn.commit()
+        return original, score
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,1287 @@
+"""
+Движок сбора транскриптов без зависимости от GUI
+
+Весь сбор идёт через CollectionEngine: настройки приходят в CollectorConfig,
+а всё, что раньше писалось в лог окна, отдаётся в callback как CollectorEvent.
+"""
+
+import queue
+import threading
+import time
+import random
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Dict, Optional, Callable, Any, Set
+
+from .cache import TranscriptCache
+from .checkpoint import CheckpointStore
+from .collector import YouTubeChannelCollector
+from .dedup import FingerprintStore
+from .fetcher import ConcurrentFetcher, FetchResult
+from .index import TranscriptIndex
+from .keys import ApiKeyPool
+from .languages import configure_languages
+from .matcher import KeywordMatcher, MatchReport, read_keywords
+from .metrics import Metrics
+from .pacing import THROTTLED, PacingController
+from .prefilter import VideoFilter
+from .proxy import ProxyManager
+from .quota import DEFAULT_DAILY_QUOTA, QuotaExceededError, QuotaMeter, estimate_listing_cost, seconds_until_reset
+from .resolver import ID, ChannelDirectory, ChannelResolver, parse_channel_ref
+from .sync import ChannelSyncStore
+from .workqueue import JobQueue, JobResult, QueueServer
+from .writer import TranscriptWriter, open_writer
+
+
+LOG_ICONS = {
+    "INFO": "ℹ️",
+    "SUCCESS": "✅",
+    "ERROR": "❌",
+    "WARNING": "⚠️",
+    "PROXY": "🌐"
+}
+
+# Сколько координатор ждёт рабочих после конца очереди, прежде чем закрыть HTTP
+QUEUE_CLOSE_GRACE = 5
+
+
+@dataclass
+class CollectorConfig:
+    """Настройки одного запуска сбора"""
+
+    api_key: str
+    # ID каналов, @handle или ссылки на каналы
+    channel_ids: List[str]
+    # Несколько ключей: вызовы API распределяются между ними
+    api_keys: List[str] = field(default_factory=list)
+    output_file: str = "transcripts_output.txt"
+    # text | jsonl | archive | auto (по расширению файла: .jsonl, .tsa)
+    output_format: str = "auto"
+    fsync_every: int = 10
+    # Контрольная точка: продолжить прерванный запуск
+    checkpoint_file: Optional[str] = None
+    resume: bool = False
+    # Дисковый кэш транскриптов
+    cache_file: Optional[str] = None
+    cache_ttl_hours: float = 7 * 24
+    cache_max_mb: float = 512
+    # Кэш каналов: плейлисты загрузок и handle -> ID между запусками
+    channel_cache: Optional[str] = None
+    # Инкрементальная синхронизация каналов (high-water mark по publishedAt)
+    sync_file: Optional[str] = None
+    new_only: bool = False
+    # Полнотекстовый индекс всех скачанных транскриптов (до фильтра по словам)
+    index_file: Optional[str] = None
+    # Дубликаты: почти одинаковый текст (перезаливы, зеркала) не сохраняется
+    dedup: bool = True
+    dedup_threshold: float = 0.85
+    # Файл отпечатков: не собирать повторно видео из прошлых запусков
+    dedup_file: Optional[str] = None
+    # Учёт квоты Data API: файл счётчика, дневной лимит, неприкосновенный резерв
+    quota_file: Optional[str] = None
+    daily_quota: int = DEFAULT_DAILY_QUOTA
+    quota_reserve: int = 0
+    # Ждать сброса квоты вместо того, чтобы откладывать оставшиеся каналы
+    quota_wait: bool = False
+    video_count: int = 100
+    min_duration: int = 10
+    # Ключевые слова: через запятую, списком или файлом (по одному на строку)
+    keyword: str = ""
+    keywords: List[str] = field(default_factory=list)
+    keyword_file: Optional[str] = None
+    # Совпадение только целым словом: META не найдётся в metaverse
+    whole_words: bool = False
+    # Отсев до загрузки транскрипта по метаданным videos.list:
+    # слова в названии, описании или тегах
+    prefilter_keywords: bool = False
+    # Диапазон дат публикации ГГГГ-ММ-ДД (включительно)
+    published_after: Optional[str] = None
+    published_before: Optional[str] = None
+    # Только видео с загруженными автором субтитрами (contentDetails.caption)
+    captions_only: bool = False
+    # Языки звука (defaultAudioLanguage), видео без указанного языка не отсеиваются
+    audio_languages: List[str] = field(default_factory=list)
+    # Языки транскрипта по приоритету (пусто - en, ru, es, fr, de)
+    transcript_languages: List[str] = field(default_factory=list)
+    # Разбирать список дорожек видео: ручные раньше автоматических, любой язык
+    # в крайнем случае
+    negotiate_language: bool = False
+    prefer_generated: bool = False
+    # Перевод дорожки на этот язык силами YouTube (включает разбор дорожек)
+    translate_to: Optional[str] = None
+    proxy_file: Optional[str] = None
+    rotation_interval: int = 10
+    delay_min: float = 3
+    delay_max: float = 10
+    # Адаптивный темп на прокси: delay_min - нижняя граница, max_backoff - верхняя
+    adaptive_delay: bool = True
+    max_backoff: float = 120
+    # Параллельный режим: полоса на каждый прокси
+    concurrent: bool = False
+    max_concurrency: int = 4
+    # Конвейер: транскрипты качаются, пока каналы ещё листаются
+    pipeline: bool = False
+    # Размер очереди видео между листингом и загрузкой
+    pipeline_queue: int = 200
+    # Каналов, листаемых одновременно (конвейер и общая очередь)
+    listing_workers: int = 1
+    # Общая очередь: транскрипты качают рабочие (python -m channel_collector.worker)
+    queue_file: Optional[str] = None
+    # HTTP-доступ к очереди для рабочих с других машин
+    queue_port: Optional[int] = None
+    queue_token: Optional[str] = None
+    # Аренда задания рабочим (сек) и число попыток до ошибки
+    lease_seconds: float = 120
+    max_attempts: int = 3
+    # Проверить прокси перед стартом и убрать неработающие
+    check_proxies: bool = False
+    # Метрики запуска: итог в JSON и /metrics для Prometheus во время работы
+    metrics_file: Optional[str] = None
+    metrics_port: Optional[int] = None
+    # Через сколько секунд снимать паузу без оператора (None - ждать вручную)
+    auto_resume_after: Optional[float] = None
+
+    @staticmethod
+    def parse_channels(text: str) -> List[str]:
+        """Разобрать список каналов через запятую"""
+        return [ch.strip() for ch in text.split(',') if ch.strip()]
+
+    def watchlist(self) -> List[str]:
+        """Все ключевые слова запуска"""
+        words = self.parse_channels(self.keyword) + list(self.keywords)
+        if self.keyword_file:
+            words += read_keywords(self.keyword_file)
+        return words
+
+    @staticmethod
+    def read_api_keys(file_path: str) -> List[str]:
+        """Прочитать API ключи из файла (по одному на строку)"""
+        keys = ApiKeyPool.read_keys(file_path)
+        if not keys:
+            raise Exception(f"В файле {file_path} нет API ключей")
+        return keys
+
+
+@dataclass
+class CollectorEvent:
+    """Событие движка: сообщение лога, статус или результат"""
+
+    kind: str  # log | status | paused | resumed | channel | planned | video | transcript | finished
+    message: str = ""
+    level: str = "INFO"
+    data: Dict[str, Any] = field(default_factory=dict)
+    timestamp: datetime = field(default_factory=datetime.now)
+
+    def format(self) -> str:
+        """Строка в формате лога GUI"""
+        icon = LOG_ICONS.get(self.level, "ℹ️")
+        return f"[{self.timestamp.strftime('%H:%M:%S')}] {icon} {self.message}"
+
+
+@dataclass
+class CollectionResult:
+    """Итог запуска"""
+
+    total_videos: int = 0
+    output_file: Optional[str] = None
+    stopped: bool = False
+
+
+class CollectionEngine:
+    """Сбор транскриптов по списку каналов"""
+
+    def __init__(self, config: CollectorConfig,
+                 proxy_manager: Optional[ProxyManager] = None,
+                 collector: Optional[YouTubeChannelCollector] = None,
+                 on_event: Optional[Callable[[CollectorEvent], None]] = None,
+                 stop_event: Optional[threading.Event] = None):
+        self.config = config
+        self.proxy_manager = proxy_manager or ProxyManager()
+        self.collector = collector or YouTubeChannelCollector(config.api_key)
+        self.on_event = on_event
+        self.stop_event = stop_event or threading.Event()
+        self.result = CollectionResult()
+        # Запись результатов из потока листинга (кэш) и из основного потока
+        self._output_lock = threading.Lock()
+        self.writer: Optional[TranscriptWriter] = None
+        self.checkpoint: Optional[CheckpointStore] = None
+        self.cache: Optional[TranscriptCache] = None
+        self.sync_store: Optional[ChannelSyncStore] = None
+        self.directory: Optional[ChannelDirectory] = None
+        self.index: Optional[TranscriptIndex] = None
+        self.fingerprints: Optional[FingerprintStore] = None
+        self.work_queue: Optional[JobQueue] = None
+        self.queue_server: Optional[QueueServer] = None
+        # video_id, уже взятые в работу в этом запуске
+        self.seen_videos: Set[str] = set()
+        self.duplicate_ids = 0
+        self.duplicate_texts = 0
+        self.metrics = Metrics()
+        self.collector.metrics = self.metrics
+        configure_languages(
+            self.collector,
+            config.transcript_languages,
+            negotiate=config.negotiate_language,
+            manual_first=not config.prefer_generated,
+            translate_to=config.translate_to
+        )
+        self.quota = QuotaMeter(
+            config.quota_file or ":memory:",
+            daily_limit=config.daily_quota,
+            reserve=config.quota_reserve
+        )
+        if getattr(self.collector, 'quota', None) is None:
+            self.collector.quota = self.quota
+
+        self.key_pool = getattr(self.collector, 'key_pool', None)
+        if self.key_pool is None:
+            self.key_pool = ApiKeyPool(config.api_keys or [config.api_key])
+            self.collector.key_pool = self.key_pool
+        self.fetcher: Optional[ConcurrentFetcher] = None
+        self.pacing: Optional[PacingController] = None
+        if config.adaptive_delay:
+            self.pacing = PacingController(config.delay_min, config.max_backoff)
+
+        watchlist = config.watchlist()
+        self.matcher = KeywordMatcher(watchlist, whole_words=config.whole_words) if watchlist else None
+        self.video_filter = VideoFilter(
+            self.matcher if config.prefilter_keywords else None,
+            published_after=config.published_after,
+            published_before=config.published_before,
+            captions_only=config.captions_only,
+            languages=config.audio_languages
+        )
+        # Итоги по словам: в скольких видео найдено и сколько раз
+        self.keyword_videos: Dict[str, int] = {}
+        self.keyword_hits: Dict[str, int] = {}
+
+        if proxy_manager is None and config.proxy_file:
+            self.proxy_manager.load_proxies(config.proxy_file)
+        self.proxy_manager.rotation_interval = config.rotation_interval
+
+    def emit(self, kind: str, message: str = "", level: str = "INFO", **data):
+        """Отправить событие подписчику"""
+        if self.on_event:
+            self.on_event(CollectorEvent(kind, message, level, data))
+
+    def log(self, message: str, level: str = "INFO"):
+        """Сообщение в лог"""
+        self.emit("log", message, level)
+
+    def stop(self):
+        """Попросить движок остановиться"""
+        self.stop_event.set()
+
+    def resume(self):
+        """Снять паузу"""
+        self.proxy_manager.resume()
+        self.emit("resumed", "Работа возобновлена", "SUCCESS")
+
+    def sleep(self, seconds: float, reason: str = "delay"):
+        """Задержка, прерываемая остановкой"""
+        started = time.monotonic()
+        self.stop_event.wait(seconds)
+        self.metrics.observe('sleep_seconds', time.monotonic() - started, reason=reason)
+
+    def smart_delay(self, proxy: Optional[str] = None):
+        """Умная задержка"""
+        if self.pacing:
+            self.sleep(self.pacing.get(proxy).delay())
+            return
+
+        delay = random.uniform(self.config.delay_min, self.config.delay_max)
+
+        # Иногда длинная пауза
+        if random.random() < 0.05:
+            delay += random.uniform(10, 30)
+
+        self.sleep(delay)
+
+    def pace(self, proxy: Optional[str], error: Optional[Exception] = None,
+             transcript: Any = None):
+        """Сообщить регулятору темпа исход запроса"""
+        if not self.pacing:
+            return
+
+        if self.pacing.record(proxy, error, transcript) == THROTTLED:
+            interval = self.pacing.get(proxy).interval
+            self.log(f"YouTube просит притормозить ({proxy or 'direct'}): интервал {interval:.1f} с", "WARNING")
+
+    def wait_if_paused(self, announce: bool = False):
+        """Ждать, пока ProxyManager на паузе"""
+        if not self.proxy_manager.paused:
+            return
+
+        if announce:
+            if self.proxy_manager.proxies:
+                wait = self.proxy_manager.seconds_until_available()
+                self.log(f"⏸ ПАУЗА: все прокси на остывании, первый освободится через {wait:.0f} с", "ERROR")
+            else:
+                self.log("⏸ ПАУЗА: 3 ошибки подряд! Смените прокси и нажмите 'Продолжить'", "ERROR")
+        self.emit("paused", "⏸ ПАУЗА - Ожидание оператора", "WARNING")
+
+        paused_at = time.monotonic()
+        while self.proxy_manager.paused and not self.stop_event.is_set():
+            timeout = self.config.auto_resume_after
+            if timeout is not None and time.monotonic() - paused_at >= timeout:
+                self.resume()
+                break
+            self.sleep(1, reason="pause")
+
+    def run(self) -> CollectionResult:
+        """Запустить сбор и сохранить результаты"""
+        config = self.config
+        # Один канал, вставленный дважды, листается один раз
+        channels = list(dict.fromkeys(config.channel_ids))
+        self.result = CollectionResult()
+        self.writer = None
+        self.checkpoint = None
+        self.cache = None
+        self.sync_store = None
+        self.directory = None
+        self.index = None
+        self.fingerprints = None
+        self.fetcher = None
+        self.work_queue = None
+        self.queue_server = None
+
+        # До открытия файлов: при ошибке здесь не должно остаться обнулённой
+        # контрольной точки и пустого файла вывода. Без токена любой, кто
+        # достучится до порта очереди, сдаст свои "транскрипты" в файл вывода
+        if config.queue_file and config.queue_port is not None and not config.queue_token:
+            raise Exception("Для --queue-port нужен --queue-token")
+        if config.check_proxies and self.proxy_manager.proxies:
+            self.preflight_proxies()
+
+        started = time.monotonic()
+        try:
+            if config.queue_file:
+                self.open_work_queue()
+
+            self.checkpoint = self.open_checkpoint()
+            if config.cache_file:
+                self.cache = TranscriptCache(
+                    config.cache_file,
+                    ttl=config.cache_ttl_hours * 3600,
+                    max_bytes=int(config.cache_max_mb * 1024 * 1024)
+                )
+            if config.sync_file:
+                self.sync_store = ChannelSyncStore(config.sync_file)
+            self.directory = ChannelDirectory(config.channel_cache or ":memory:")
+            self.collector.directory = self.directory
+            if config.index_file:
+                self.index = TranscriptIndex(config.index_file)
+            if config.dedup or config.dedup_file:
+                self.fingerprints = FingerprintStore(config.dedup_file or ":memory:", config.dedup_threshold)
+            self.writer = open_writer(
+                config.output_file,
+                config.output_format,
+                append=self.checkpoint is not None and config.resume,
+                fsync_every=config.fsync_every
+            )
+
+            if (config.concurrent or config.pipeline) and not self.work_queue:
+                self.fetcher = ConcurrentFetcher(
+                    self.collector,
+                    self.proxy_manager.proxies,
+                    config.delay_min,
+                    config.delay_max,
+                    # Конвейер без параллельного режима - по одному запросу за раз
+                    max_concurrency=config.max_concurrency if config.concurrent else 1,
+                    stop_event=self.stop_event,
+                    proxy_manager=self.proxy_manager,
+                    pacing=self.pacing,
+                    metrics=self.metrics
+                )
+                mode = "Параллельный режим" if config.concurrent else "Конвейер"
+                if config.concurrent and config.pipeline:
+                    mode += " с конвейером"
+                self.log(
+                    f"{mode}: {len(self.fetcher.lanes)} полос, "
+                    f"до {self.fetcher.max_concurrency} запросов одновременно",
+                    "INFO"
+                )
+
+            if len(channels) < len(config.channel_ids):
+                self.log(f"Повторяющиеся каналы убраны: {len(config.channel_ids) - len(channels)}", "INFO")
+
+            if config.metrics_port is not None:
+                port = self.metrics.serve(config.metrics_port)
+                self.log(f"Метрики Prometheus: http://127.0.0.1:{port}/metrics", "INFO")
+
+            channels = self.resolve_channels(channels)
+            self.log(f"Начало сбора с {len(channels)} каналов", "INFO")
+            self.plan_quota(channels)
+
+            self.collect_channels(channels)
+        finally:
+            self.metrics.observe('phase_seconds', time.monotonic() - started, phase="run")
+            if self.writer:
+                self.writer.close()
+            if self.queue_server:
+                self.queue_server.stop()
+                self.queue_server = None
+            if self.work_queue:
+                self.log_queue_stats()
+                self.work_queue.close()
+                self.work_queue = None
+            if self.checkpoint:
+                self.checkpoint.close()
+            if self.sync_store:
+                self.sync_store.close()
+            if self.directory:
+                self.directory.close()
+            self.collector.directory = None
+            if self.index:
+                self.log(f"Индекс {self.config.index_file}: {self.index.count()} видео", "INFO")
+                self.index.close()
+            if self.fingerprints:
+                self.fingerprints.close()
+            if self.duplicate_ids or self.duplicate_texts:
+                self.log(
+                    f"Дубликаты: повторных видео {self.duplicate_ids}, "
+                    f"почти одинаковых текстов {self.duplicate_texts}",
+                    "INFO"
+                )
+            if self.cache:
+                self.cache.close()
+                self.log(f"Кэш: попаданий {self.cache.hits}, промахов {self.cache.misses}", "INFO")
+            if self.video_filter.total_skipped:
+                self.log(
+                    f"Не запрошено транскриптов благодаря отсеву по метаданным: "
+                    f"{self.video_filter.total_skipped} из {self.video_filter.checked} "
+                    f"({self.video_filter.summary()})",
+                    "SUCCESS"
+                )
+            self.log_quota_usage()
+            if self.pacing:
+                for line in self.pacing.summary():
+                    self.log(f"Темп {line}", "INFO")
+            self.log_metrics()
+            self.metrics.stop_server()
+            self.collector.close()
+
+        return self.finish()
+
+    def collect_channels(self, channels: List[str]):
+        """Пройти по всем каналам"""
+        if self.work_queue:
+            self.collect_distributed(channels)
+        elif self.config.pipeline:
+            self.collect_pipelined(channels)
+        else:
+            self.walk_channels(channels, self.process_channel)
+
+    def walk_channels(self, channels: List[str],
+                      process: Callable[[str, Optional[Dict]], None],
+                      channel_delay: bool = True, workers: int = 1):
+        """Цикл по каналам: пауза, прокси, квота и ошибки; работа с каналом - в process
+
+        workers > 1 - каналы листаются параллельно (без задержки между каналами):
+        время листинга пачки упирается в квоту, а не в задержку ответов API.
+        """
+        pending = deque(enumerate(channels))
+
+        if workers > 1 and len(channels) > 1:
+            self.walk_parallel(channels, pending, process, workers)
+            return
+
+        while pending:
+            channel_index, channel_id = pending.popleft()
+
+            if not self.visit_channel(channels, channel_index, channel_id, process, pending):
+                break
+
+            # Задержка между каналами
+            if channel_delay and channel_index < len(channels) - 1:
+                if self.pacing:
+                    self.smart_delay(self.proxy_manager.get_current_proxy())
+                else:
+                    self.sleep(random.uniform(5, 15), reason="channel")
+
+    def walk_parallel(self, channels: List[str], pending: "deque",
+                      process: Callable[[str, Optional[Dict]], None], workers: int):
+        """Несколько потоков берут каналы из общей очереди"""
+        halted = threading.Event()
+
+        def work():
+            while not halted.is_set():
+                try:
+                    channel_index, channel_id = pending.popleft()
+                except IndexError:
+                    return
+                if not self.visit_channel(channels, channel_index, channel_id, process, pending):
+                    halted.set()
+
+        self.log(f"Листинг каналов в {min(workers, len(channels))} потоков", "INFO")
+        threads = [
+            threading.Thread(target=work, name=f"listing-{i + 1}", daemon=True)
+            for i in range(min(workers, len(channels)))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def visit_channel(self, channels: List[str], channel_index: int, channel_id: str,
+                      process: Callable[[str, Optional[Dict]], None], pending: "deque") -> bool:
+        """Один канал; False - обход каналов пора прекратить"""
+        if self.stop_event.is_set():
+            return False
+
+        # Проверка паузы
+        self.wait_if_paused(announce=True)
+
+        if self.stop_event.is_set():
+            return False
+
+        self.log(f"Обработка канала: {channel_id}", "INFO")
+        self.emit("channel", channel_id=channel_id, index=channel_index + 1, total=len(channels))
+
+        try:
+            # Получаем прокси
+            proxies = self.proxy_manager.get_proxy_dict()
+
+            if proxies:
+                self.log(f"Используем прокси: {self.proxy_manager.get_current_proxy()}", "PROXY")
+
+            process(channel_id, proxies)
+
+        except QuotaExceededError as e:
+            self.log(f"⛔ Квота API: {e}", "ERROR")
+
+            if self.wait_for_quota():
+                pending.appendleft((channel_index, channel_id))
+                return True
+
+            self.log(f"Отложено до сброса квоты каналов: {len(pending) + 1}", "WARNING")
+            return False
+
+        except Exception as e:
+            self.log(f"❌ Ошибка канала {channel_id}: {e}", "ERROR")
+
+            action = self.proxy_manager.report_error()
+
+            if action == "rotate":
+                self.log("Смена прокси...", "PROXY")
+
+        return True
+
+    def process_channel(self, channel_id: str, proxies: Optional[Dict]):
+        """Листинг канала целиком, затем загрузка транскриптов"""
+        # Получаем видео канала
+        videos = self.channel_listing(channel_id, proxies)
+
+        self.log(f"Найдено {len(videos)} видео", "SUCCESS")
+
+        # Пропускаем уже обработанные при продолжении
+        if self.checkpoint:
+            completed = self.checkpoint.completed_videos(channel_id)
+            if completed:
+                videos = [v for v in videos if v['video_id'] not in completed]
+                self.log(f"Уже обработано ранее: {len(completed)}, осталось: {len(videos)}", "INFO")
+
+        videos = self.prefilter(channel_id, self.claim_videos(videos))
+
+        # Сначала то, что уже есть в кэше - без сети и задержек
+        videos = self.take_cached(channel_id, videos)
+
+        # Обрабатываем каждое видео
+        if self.fetcher:
+            self.fetch_concurrent(channel_id, videos)
+        else:
+            self.fetch_sequential(channel_id, videos)
+
+    def channel_listing(self, channel_id: str, proxies: Optional[Dict],
+                        on_page: Optional[Callable[[List[Dict]], None]] = None) -> List[Dict]:
+        """Список видео канала: из контрольной точки или через API"""
+        videos = self.checkpoint.get_channel_videos(channel_id) if self.checkpoint else None
+
+        if videos is None:
+            self.reserve_quota(channel_id)
+            started = time.monotonic()
+            videos = self.list_channel(channel_id, proxies, on_page)
+            elapsed = time.monotonic() - started
+
+            # Время листинга - это много страниц API, а не задержка прокси:
+            # в оценку прокси оно не идёт
+            self.proxy_manager.report_success()
+            self.metrics.observe('phase_seconds', elapsed, phase="listing")
+
+            if self.checkpoint:
+                self.checkpoint.save_channel_videos(channel_id, videos)
+
+        return videos
+
+    def collect_pipelined(self, channels: List[str]):
+        """Листинг каналов в фоне, транскрипты качаются по мере появления видео"""
+        jobs: "queue.Queue[Optional[Dict]]" = queue.Queue(maxsize=max(1, self.config.pipeline_queue))
+
+        def produce():
+            try:
+                self.walk_channels(
+                    channels,
+                    lambda channel_id, proxies: self.stream_channel(channel_id, proxies, jobs),
+                    channel_delay=False,
+                    workers=self.config.listing_workers
+                )
+            except Exception as e:
+                self.log(f"❌ Ошибка листинга: {e}", "ERROR")
+            finally:
+                # Метка конца очереди, иначе полосы ждут новых видео вечно
+                self.enqueue(jobs, None)
+
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+
+        for idx, fetched in enumerate(self.fetcher.fetch_stream(jobs), 1):
+            self.handle_fetched(fetched.video['channel_id'], fetched, f"{idx}")
+
+        producer.join()
+
+    def stream_channel(self, channel_id: str, proxies: Optional[Dict],
+                       jobs: "queue.Queue[Optional[Dict]]"):
+        """Отправлять видео канала в очередь загрузки страница за страницей"""
+        completed = self.checkpoint.completed_videos(channel_id) if self.checkpoint else set()
+        sent = set()
+
+        def dispatch(videos: List[Dict]):
+            videos = [v for v in videos if v['video_id'] not in completed and v['video_id'] not in sent]
+            sent.update(v['video_id'] for v in videos)
+            videos = self.prefilter(channel_id, self.claim_videos(videos))
+
+            for video in self.take_cached(channel_id, videos):
+                if not self.enqueue(jobs, dict(video, channel_id=channel_id)):
+                    break
+
+        videos = self.channel_listing(channel_id, proxies, on_page=dispatch)
+        self.log(f"Найдено {len(videos)} видео ({channel_id})", "SUCCESS")
+
+        # Остаток: листинг из контрольной точки или известные видео при инкрементальном листинге
+        dispatch(videos)
+
+        if completed:
+            self.log(f"Уже обработано ранее: {len(completed)}", "INFO")
+
+    def open_work_queue(self):
+        """Очередь заданий для рабочих и, если задан порт, HTTP-доступ к ней"""
+        config = self.config
+        self.work_queue = JobQueue(config.queue_file, config.lease_seconds, config.max_attempts)
+        if not config.resume:
+            self.work_queue.reset()
+        # Рабочие не уходят, пока координатор не закончит листинг
+        self.work_queue.set_finished(False)
+
+        if config.queue_port is not None:
+            self.queue_server = QueueServer(self.work_queue, config.queue_port, host="0.0.0.0",
+                                            token=config.queue_token).start()
+            self.log(f"Очередь для рабочих: http://0.0.0.0:{self.queue_server.port}", "INFO")
+        else:
+            self.log(f"Очередь для рабочих: {config.queue_file}", "INFO")
+
+    def collect_distributed(self, channels: List[str]):
+        """Координатор: листинг здесь, транскрипты качают рабочие через общую очередь"""
+        listing_done = threading.Event()
+
+        def produce():
+            try:
+                self.walk_channels(channels, self.enqueue_channel, channel_delay=False,
+                                   workers=self.config.listing_workers)
+            except Exception as e:
+                self.log(f"❌ Ошибка листинга: {e}", "ERROR")
+            finally:
+                listing_done.set()
+
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+
+        handled = 0
+        while not self.stop_event.is_set():
+            results = self.work_queue.take_results()
+            for job_result in results:
+                handled += 1
+                self.handle_job_result(job_result, f"{handled}")
+
+            if not results:
+                if listing_done.is_set() and self.work_queue.unfinished() == 0:
+                    break
+                self.sleep(1, reason="queue")
+
+        # Рабочий мог сдать итог между take_results и проверкой unfinished
+        while True:
+            results = self.work_queue.take_results()
+            if not results:
+                break
+            for job_result in results:
+                handled += 1
+                self.handle_job_result(job_result, f"{handled}")
+
+        producer.join()
+        # После остановки рабочие доделают выданное; итоги заберёт следующий запуск с resume
+        self.work_queue.set_finished()
+        if self.queue_server and not self.stop_event.is_set():
+            # Рабочие по HTTP узнают о конце очереди из ответа lease - дать им спросить
+            self.sleep(QUEUE_CLOSE_GRACE, reason="queue")
+
+    def enqueue_channel(self, channel_id: str, proxies: Optional[Dict]):
+        """Листинг канала в общую очередь"""
+        videos = self.channel_listing(channel_id, proxies)
+
+        if self.checkpoint:
+            completed = self.checkpoint.completed_videos(channel_id)
+            videos = [v for v in videos if v['video_id'] not in completed]
+
+        videos = self.take_cached(channel_id, self.prefilter(channel_id, self.claim_videos(videos)))
+        added = self.work_queue.put(channel_id, videos)
+        self.log(f"В очередь ({channel_id}): {added} видео", "SUCCESS")
+
+    def handle_job_result(self, job_result: JobResult, progress: str):
+        """Итог рабочего: сохранить транскрипт или отметить в контрольной точке"""
+        channel_id = job_result.channel_id
+        video = job_result.video
+        self.log(f"[{progress}] {video['title']} ({job_result.worker})", "INFO")
+
+        if job_result.status == CheckpointStore.DONE and job_result.transcript:
+            self.store_cached(video, job_result.transcript)
+            self.accept_transcript(channel_id, video, job_result.transcript)
+        elif job_result.status == CheckpointStore.FAILED:
+            self.log(f"❌ Ошибка ({job_result.worker}): {job_result.error}", "ERROR")
+            self.record(channel_id, video, CheckpointStore.FAILED, Exception(job_result.error))
+        else:
+            self.log(f"⚠️ Транскрипт недоступен", "WARNING")
+            self.record(channel_id, video, CheckpointStore.NO_TRANSCRIPT)
+
+    def log_queue_stats(self):
+        """Итог общей очереди: задания по статусам и возвраты после пропавших рабочих"""
+        stats = self.work_queue.stats()
+        summary = ", ".join(f"{status}: {count}" for status, count in sorted(stats['statuses'].items()))
+        self.log(f"Очередь: {summary or 'пусто'}; возвращено после истёкшей аренды: {stats['requeued']}", "INFO")
+
+    def prefilter(self, channel_id: str, videos: List[Dict]) -> List[Dict]:
+        """Отсеять видео по метаданным, не запрашивая транскрипты"""
+        if not self.video_filter.active or not videos:
+            return videos
+
+        kept, skipped = self.video_filter.split(videos)
+        for video, reason in skipped:
+            self.metrics.inc('prefiltered', reason=reason)
+            self.record(channel_id, video, CheckpointStore.SKIPPED)
+
+        if skipped:
+            self.log(f"Отсеяно по метаданным: {len(skipped)}, загрузить: {len(kept)}", "INFO")
+
+        return kept
+
+    def claim_videos(self, videos: List[Dict]) -> List[Dict]:
+        """Оставить видео, которые ещё не встречались в других каналах и запусках"""
+        fresh = []
+        with self._output_lock:
+            for video in videos:
+                video_id = video['video_id']
+                if video_id in self.seen_videos:
+                    continue
+                if self.fingerprints and self.fingerprints.has_video(video_id):
+                    continue
+                self.seen_videos.add(video_id)
+                fresh.append(video)
+
+            skipped = len(videos) - len(fresh)
+            self.duplicate_ids += skipped
+
+        if skipped:
+            self.log(f"Уже встречались в других каналах или запусках: {skipped}", "INFO")
+
+        # Каждое взятое видео потом получит итоговый статус в record
+        if fresh:
+            self.emit("planned", count=len(fresh))
+
+        return fresh
+
+    def enqueue(self, jobs: "queue.Queue[Optional[Dict]]", job: Optional[Dict]) -> bool:
+        """Положить задание в ограниченную очередь, не зависая при остановке"""
+        while not self.stop_event.is_set():
+            try:
+                jobs.put(job, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def resolve_channels(self, refs: List[str]) -> List[str]:
+        """@handle и ссылки -> ID; плейлисты загрузок неизвестных каналов - пачками"""
+        resolver = ChannelResolver(self.collector, self.directory)
+        proxies = self.proxy_manager.get_proxy_dict()
+
+        try:
+            channels, failures = resolver.resolve(refs, proxies)
+        except QuotaExceededError as e:
+            # Без квоты остаются только готовые ID, остальное - в следующий запуск
+            self.log(f"⛔ Квота API при поиске каналов: {e}", "ERROR")
+            channels = list(dict.fromkeys(
+                parse_channel_ref(ref)[1] for ref in refs if self.is_channel_id(ref)
+            ))
+            failures = {}
+
+        for ref, reason in failures.items():
+            self.log(f"Канал {ref}: {reason}, пропущен", "WARNING")
+
+        cached = sum(1 for channel_id in channels if self.directory.uploads_playlist(channel_id))
+        try:
+            missing = resolver.prefetch(channels, proxies)
+        except Exception as e:
+            # Не страшно: плейлист канала запросится перед его листингом
+            self.log(f"Не удалось заранее получить плейлисты каналов: {e}", "WARNING")
+            missing = []
+
+        for channel_id in missing:
+            self.log(f"Канал {channel_id} не найден, пропущен", "WARNING")
+
+        if resolver.api_calls:
+            self.log(
+                f"Каналы: {len(channels)}, плейлисты из кэша: {cached}, "
+                f"запросов channels.list: {resolver.api_calls}",
+                "INFO"
+            )
+
+        return [channel_id for channel_id in channels if channel_id not in missing]
+
+    @staticmethod
+    def is_channel_id(ref: str) -> bool:
+        try:
+            return parse_channel_ref(ref)[0] == ID
+        except Exception:
+            return False
+
+    def preflight_proxies(self):
+        """Параллельная проверка прокси перед стартом"""
+        total = len(self.proxy_manager.proxies)
+        self.log(f"Проверка {total} прокси...", "PROXY")
+
+        alive, dead = self.proxy_manager.check_proxies()
+
+        for proxy in dead:
+            self.log(f"Прокси не отвечает, исключён: {proxy}", "WARNING")
+        self.log(f"Рабочих прокси: {len(alive)} из {total}", "SUCCESS" if alive else "ERROR")
+
+        if not alive:
+            raise Exception("Ни один прокси не прошёл проверку")
+
+    def sync_state(self, channel_id: str) -> Optional[Dict]:
+        """Сохранённое состояние канала, если оно подходит к текущим настройкам"""
+        if not self.sync_store:
+            return None
+
+        state = self.sync_store.get(channel_id)
+        if (state and state['max_results'] >= self.config.video_count
+                and state['min_duration'] == self.config.min_duration
+                and self.covers_cutoff(state['listed_after'])):
+            return state
+        return None
+
+    def covers_cutoff(self, listed_after: Optional[str]) -> bool:
+        """Список, листанный до listed_after, не короче нужного сейчас"""
+        cutoff = self.video_filter.published_after
+        return listed_after is None or (cutoff is not None and listed_after <= cutoff)
+
+    def estimate_channel_cost(self, channel_id: str) -> int:
+        """Оценка единиц квоты на листинг канала"""
+        if self.checkpoint and self.checkpoint.get_channel_videos(channel_id) is not None:
+            return 0
+        if self.sync_state(channel_id):
+            return estimate_listing_cost(self.config.video_count, incremental=True)
+        uploads_known = self.directory is not None and self.directory.uploads_playlist(channel_id) is not None
+        return estimate_listing_cost(self.config.video_count, uploads_known=uploads_known)
+
+    def plan_quota(self, channels: List[str]):
+        """Оценить расход квоты на весь запуск"""
+        costs = [self.estimate_channel_cost(channel_id) for channel_id in channels]
+        total = sum(costs)
+        remaining = self.key_pool.remaining(self.quota)
+        limit = self.quota.daily_limit * len(self.key_pool.keys)
+
+        self.log(
+            f"План квоты: ~{total} ед. на листинг, доступно {remaining} из {limit} "
+            f"(ключей: {len(self.key_pool.keys)})",
+            "INFO"
+        )
+
+        if total > remaining:
+            affordable = 0
+            budget = remaining
+            for cost in costs:
+                if cost > budget:
+                    break
+                budget -= cost
+                affordable += 1
+            self.log(
+                f"Квоты хватит примерно на {affordable} из {len(channels)} каналов, "
+                f"остальные будут {'ждать сброса' if self.config.quota_wait else 'отложены'}",
+                "WARNING"
+            )
+
+    def reserve_quota(self, channel_id: str):
+        """Проверить остаток квоты до начала листинга канала"""
+        cost = self.estimate_channel_cost(channel_id)
+        remaining = self.key_pool.remaining(self.quota)
+
+        if cost > remaining:
+            raise QuotaExceededError(
+                f"на канал {channel_id} нужно ~{cost} ед., осталось {remaining}"
+            )
+
+    def wait_for_quota(self) -> bool:
+        """Дождаться сброса квоты, если так настроено"""
+        if not self.config.quota_wait:
+            return False
+
+        wait = seconds_until_reset() + 60
+        self.log(f"Ожидание сброса квоты: {wait / 3600:.1f} ч", "WARNING")
+        self.emit("paused", "⏸ Ожидание сброса квоты API", "WARNING")
+        self.sleep(wait, reason="quota")
+
+        return not self.stop_event.is_set()
+
+    def log_quota_usage(self):
+        """Итог расхода квоты за сутки"""
+        for api_key in self.key_pool.keys:
+            usage = self.quota.usage_by_endpoint(api_key)
+            if not usage:
+                continue
+
+            details = ", ".join(
+                f"{endpoint}: {stats['units']}" for endpoint, stats in sorted(usage.items())
+                if not endpoint.startswith('_')
+            )
+            self.log(
+                f"Квота {ApiKeyPool.label(api_key)} за сегодня: {self.quota.used(api_key)} ед. ({details})",
+                "INFO"
+            )
+
+    def log_metrics(self):
+        """Итог по времени: где шёл запуск и какие вызовы медленные"""
+        metrics = self.metrics
+        run = metrics.total('phase_seconds', phase="run")
+        listing = metrics.total('phase_seconds', phase="listing")
+        api = metrics.total('api_request_seconds')
+        transcripts = metrics.total('transcript_request_seconds')
+        sleeps = metrics.total('sleep_seconds')
+        lanes = metrics.total('lane_wait_seconds')
+
+        self.log(
+            f"Время запуска {run.sum:.0f} с: листинг {listing.sum:.1f} с, "
+            f"API {api.count} запросов за {api.sum:.1f} с, "
+            f"транскрипты {transcripts.count} за {transcripts.sum:.1f} с, "
+            f"паузы {sleeps.sum:.0f} с" + (f", ожидание полос {lanes.sum:.0f} с" if lanes.count else ""),
+            "INFO"
+        )
+
+        for name, label, title in (('api_request_seconds', 'endpoint', "API"),
+                                   ('transcript_request_seconds', 'proxy', "Транскрипты")):
+            for value, histogram in sorted(metrics.grouped(name, by=label).items()):
+                self.log(
+                    f"{title} {value}: {histogram.count} за {histogram.sum:.1f} с, "
+                    f"p50 {histogram.quantile(0.5):.2f} с, p95 {histogram.quantile(0.95):.2f} с, "
+                    f"max {histogram.max:.2f} с",
+                    "INFO"
+                )
+
+        if self.config.metrics_file:
+            try:
+                self.metrics.write_json(self.config.metrics_file)
+                self.log(f"Метрики сохранены в: {self.config.metrics_file}", "INFO")
+            except OSError as e:
+                self.log(f"Не удалось сохранить метрики: {e}", "WARNING")
+
+    def page_videos(self, on_page: Optional[Callable[[List[Dict]], None]],
+                    channel_id: str, **kwargs) -> List[Dict]:
+        """Листинг канала; on_page получает каждую страницу сразу после запроса"""
+        if on_page is None:
+            return self.collector.get_channel_videos(channel_id, **kwargs)
+
+        videos = []
+        for page in self.collector.iter_channel_videos(channel_id, **kwargs):
+            on_page(page)
+            videos.extend(page)
+        return videos
+
+    def list_channel(self, channel_id: str, proxies: Optional[Dict],
+                     on_page: Optional[Callable[[List[Dict]], None]] = None) -> List[Dict]:
+        """Список видео канала, инкрементально если есть сохранённое состояние"""
+        config = self.config
+        # Плейлист загрузок идёт от новых к старым: старше published_after листать незачем
+        cutoff = self.video_filter.published_after
+
+        if not self.sync_store:
+            return self.page_videos(
+                on_page,
+                channel_id,
+                max_results=config.video_count,
+                min_duration=config.min_duration,
+                proxies=proxies,
+                since=cutoff
+            )
+
+        state = self.sync_state(channel_id)
+
+        if state:
+            uploads_playlist = state['uploads_playlist']
+            known = state['videos']
+            cursor = {
+                'newest_published_at': state['newest_published_at'],
+                'newest_video_id': state['newest_video_id'],
+            }
+            known_ids = {v['video_id'] for v in known}
+            if state['newest_video_id']:
+                known_ids.add(state['newest_video_id'])
+
+            new_videos = self.page_videos(
+                on_page,
+                channel_id,
+                max_results=config.video_count,
+                min_duration=config.min_duration,
+                proxies=proxies,
+                uploads_playlist=uploads_playlist,
+                known_ids=known_ids,
+                since=max(filter(None, (state['newest_published_at'], cutoff)), default=None),
+                cursor=cursor
+            )
+            self.log(f"Новых видео с {state['synced_at'][:16]}: {len(new_videos)}", "INFO")
+
+            new_ids = {v['video_id'] for v in new_videos}
+            videos = new_videos + [v for v in known if v['video_id'] not in new_ids]
+            videos.sort(key=lambda v: v['published_at'], reverse=True)
+            videos = videos[:config.video_count]
+        else:
+            uploads_playlist = self.collector.get_uploads_playlist(channel_id, proxies)
+            cursor = {}
+            videos = new_videos = self.page_videos(
+                on_page,
+                channel_id,
+                max_results=config.video_count,
+                min_duration=config.min_duration,
+                proxies=proxies,
+                uploads_playlist=uploads_playlist,
+                since=cutoff,
+                cursor=cursor
+            )
+
+        self.sync_store.save(channel_id, uploads_playlist, videos,
+                             config.video_count, config.min_duration, cursor, listed_after=cutoff)
+
+        return new_videos if config.new_only else videos
+
+    def fetch_sequential(self, channel_id: str, videos: List[Dict]):
+        """Транскрипты по одному, с ротацией через ProxyManager"""
+        for idx, video in enumerate(videos, 1):
+            if self.stop_event.is_set():
+                break
+
+            # Проверка паузы
+            self.wait_if_paused()
+
+            if self.stop_event.is_set():
+                break
+
+            self.log(f"[{idx}/{len(videos)}] {video['title']}", "INFO")
+
+            proxy = self.proxy_manager.get_current_proxy()
+
+            try:
+                # Получаем прокси
+                proxies = self.proxy_manager.get_proxy_dict()
+
+                # Получаем транскрипт
+                started = time.monotonic()
+                transcript = self.collector.get_transcript(
+                    video['video_id'],
+                    proxies=proxies
+                )
+                latency = time.monotonic() - started
+                self.pace(proxy, transcript=transcript)
+
+                if transcript:
+                    self.store_cached(video, transcript)
+                    self.accept_transcript(channel_id, video, transcript)
+                    self.proxy_manager.report_success(latency=latency)
+                else:
+                    self.log(f"⚠️ Транскрипт недоступен", "WARNING")
+                    self.record(channel_id, video, CheckpointStore.NO_TRANSCRIPT)
+
+                # Задержка
+                if idx < len(videos):
+                    self.smart_delay(self.proxy_manager.get_current_proxy())
+
+            except Exception as e:
+                self.log(f"❌ Ошибка: {e}", "ERROR")
+                self.record(channel_id, video, CheckpointStore.FAILED, e)
+                self.pace(proxy, error=e)
+
+                action = self.proxy_manager.report_error()
+
+                if action == "rotate":
+                    self.log("Смена прокси...", "PROXY")
+
+                if self.pacing:
+                    self.smart_delay(self.proxy_manager.get_current_proxy())
+                else:
+                    self.sleep(random.uniform(2, 5), reason="backoff")
+
+    def fetch_concurrent(self, channel_id: str, videos: List[Dict]):
+        """Транскрипты параллельно через полосы прокси"""
+        for idx, fetched in enumerate(self.fetcher.fetch(videos), 1):
+            self.handle_fetched(channel_id, fetched, f"{idx}/{len(videos)}")
+
+    def handle_fetched(self, channel_id: str, fetched: FetchResult, progress: str):
+        """Обработать результат полосы: сохранить, отметить ошибку или отсутствие"""
+        video = fetched.video
+        self.log(f"[{progress}] {video['title']} ({fetched.lane.name})", "INFO")
+
+        if fetched.error is not None:
+            self.log(f"❌ Ошибка ({fetched.lane.name}): {fetched.error}", "ERROR")
+            self.record(channel_id, video, CheckpointStore.FAILED, fetched.error)
+        elif fetched.transcript:
+            self.store_cached(video, fetched.transcript)
+            self.accept_transcript(channel_id, video, fetched.transcript)
+        else:
+            self.log(f"⚠️ Транскрипт недоступен", "WARNING")
+            self.record(channel_id, video, CheckpointStore.NO_TRANSCRIPT)
+
+    def take_cached(self, channel_id: str, videos: List[Dict]) -> List[Dict]:
+        """Обработать видео из кэша, вернуть те, что нужно скачать"""
+        if not self.cache:
+            return videos
+
+        language = self.collector.language_key()
+        missing = []
+
+        for video in videos:
+            if self.stop_event.is_set():
+                break
+
+            transcript = self.cache.get(video['video_id'], language)
+            if transcript is None:
+                missing.append(video)
+            else:
+                self.accept_transcript(channel_id, video, transcript)
+
+        cached = len(videos) - len(missing)
+        if cached:
+            self.log(f"Из кэша: {cached}, загрузить: {len(missing)}", "INFO")
+
+        return missing
+
+    def store_cached(self, video: Dict, transcript: List[Dict]):
+        """Положить скачанный транскрипт в кэш"""
+        if self.cache:
+            self.cache.put(video['video_id'], self.collector.language_key(), transcript)
+
+    def open_checkpoint(self) -> Optional[CheckpointStore]:
+        """Открыть контрольную точку, если она включена"""
+        config = self.config
+        path = config.checkpoint_file
+        if not path and config.resume:
+            path = f"{config.output_file}.checkpoint.sqlite"
+        if not path:
+            return None
+
+        checkpoint = CheckpointStore(path)
+
+        if config.resume:
+            stats = checkpoint.stats()
+            if stats:
+                summary = ", ".join(f"{status}: {count}" for status, count in sorted(stats.items()))
+                self.log(f"Продолжаем с контрольной точки {path} ({summary})", "INFO")
+        else:
+            checkpoint.reset()
+
+        return checkpoint
+
+    def record(self, channel_id: str, video: Dict, status: str,
+               error: Optional[Exception] = None):
+        """Отметить видео в контрольной точке"""
+        self.metrics.inc('videos', status=status)
+        self.emit("video", status=status, channel_id=channel_id, video_id=video['video_id'])
+        if self.checkpoint:
+            self.checkpoint.mark(channel_id, video['video_id'], status, error)
+
+    def accept_transcript(self, channel_id: str, video: Dict, transcript: List[Dict]) -> bool:
+        """Отфильтровать транскрипт по ключевому слову и сохранить"""
+        text = self.collector.format_transcript(transcript)
+
+        # В индекс идёт всё скачанное: новый вопрос - без повторного сбора
+        if self.index:
+            self.index.add(channel_id, video, transcript)
+
+        # Фильтрация по ключевым словам - один проход по всему списку
+        report: Optional[MatchReport] = None
+        if self.matcher:
+            report = self.matcher.match_segments(transcript)
+            if not report.matched:
+                self.record(channel_id, video, CheckpointStore.FILTERED)
+                return False
+
+        # Перезалив или зеркало уже сохранённого текста
+        if self.fingerprints:
+            duplicate = self.fingerprints.check_and_add(channel_id, video['video_id'], text)
+            if duplicate:
+                original, score = duplicate
+                self.record(channel_id, video, CheckpointStore.DUPLICATE)
+                with self._output_lock:
+                    self.duplicate_texts += 1
+                self.log(f"Дубликат: {video['title']} ≈ {original} ({score:.0%}), не сохранён", "WARNING")
+                return False
+
+        item = {
+            'channel_id': channel_id,
+            'video_id': video['video_id'],
+            'title': video['title'],
+            'published_at': video.get('published_at'),
+            'transcript': text
+        }
+        if report:
+            item['matches'] = report.counts
+            item['hits'] = [hit.to_dict() for hit in report.hits]
+
+        with self._output_lock:
+            self.writer.write(item, transcript)
+            self.record(channel_id, video, CheckpointStore.DONE)
+            self.result.total_videos += 1
+            if report:
+                for keyword, count in report.counts.items():
+                    self.keyword_videos[keyword] = self.keyword_videos.get(keyword, 0) + 1
+                    self.keyword_hits[keyword] = self.keyword_hits.get(keyword, 0) + count
+        self.emit("transcript", level="SUCCESS", item=item)
+
+        if report:
+            self.log(f"✅ Найдено: {report.summary()}", "SUCCESS")
+
+        return True
+
+    def finish(self) -> CollectionResult:
+        """Подвести итог и сообщить об окончании"""
+        result = self.result
+        result.stopped = self.stop_event.is_set()
+
+        # Результаты уже на диске - записаны по мере сбора
+        if self.writer.written:
+            output_path = self.config.output_file
+            result.output_file = output_path
+
+            self.log("="*50, "INFO")
+            self.log(f"Завершено! Собрано транскриптов: {result.total_videos}", "SUCCESS")
+            for keyword in self.matcher.keywords if self.matcher else []:
+                if keyword in self.keyword_videos:
+                    self.log(
+                        f"'{keyword}': {self.keyword_hits[keyword]} совпадений в {self.keyword_videos[keyword]} видео",
+                        "INFO"
+                    )
+            self.log(f"Сохранено в: {output_path}", "SUCCESS")
+        else:
+            self.log("Транскрипты не найдены", "WARNING")
+
+        self.emit("finished", level="SUCCESS" if result.output_file else "WARNING",
+                  total_videos=result.total_videos, output_file=result.output_file,
+                  stopped=result.stopped)
+
+        return result
@@ -0,0 +1,321 @@
+"""
+Локальная замена YouTube для бенчмарков и проверок без сети
+
+Сервер отдаёт методы Data API (channels, playlistItems, videos) и
+транскрипты по синтетическим каналам, умеет задержку и ошибки (429,
+квота, обрыв по таймауту). Он понимает и обычные запросы, и запросы через
+него как через HTTP-прокси (абсолютный URL в строке запроса), поэтому
+несколько экземпляров на разных портах изображают пул прокси, а
+proxy_mode - прокси, который умер посреди работы.
+"""
+
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit, parse_qs
+
+
+API_PATH = "/youtube/v3"
+
+# Режимы отказа прокси
+PROXY_DROP = "drop"        # соединение рвётся без ответа
+PROXY_STALL = "stall"      # соединение висит, потом рвётся
+PROXY_BLOCKED = "blocked"  # YouTube заблокировал IP: 429 на всё
+
+_NEWEST = datetime(2024, 6, 1)
+
+
+@dataclass
+class Faults:
+    """Доли запросов с ошибкой (0-1)"""
+
+    # 429 Too Many Requests
+    rate_limit: float = 0.0
+    # 403 quotaExceeded (только Data API)
+    quota: float = 0.0
+    # Нет ответа: соединение висит stall секунд и рвётся
+    timeout: float = 0.0
+    # 500
+    server_error: float = 0.0
+    # У видео нет субтитров (404 на транскрипт)
+    no_transcript: float = 0.0
+    stall: float = 1.0
+    seed: int = 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_Server"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        fake = self.server.fake
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        path = url.path
+
+        fake.count(path)
+
+        if fake.latency:
+            time.sleep(fake.latency)
+
+        fault = fake.pick_fault(path)
+        if fault in ("drop", "timeout"):
+            if fault == "timeout":
+                time.sleep(fake.faults.stall)
+            self.close_connection = True
+            return
+        if fault == "rate_limit":
+            self.send_error_json(429, "rateLimitExceeded")
+            return
+        if fault == "quota":
+            self.send_error_json(403, "quotaExceeded")
+            return
+        if fault == "server_error":
+            self.send_error_json(500, "backendError")
+            return
+
+        if path == "/generate_204":
+            self.send_response(204)
+            self.end_headers()
+        elif path == "/transcript":
+            transcript = fake.make_transcript(query.get("v", ""))
+            if transcript is None:
+                self.send_error_json(404, "noTranscript")
+            else:
+                self.send_json(transcript)
+        elif path == f"{API_PATH}/channels":
+            self.send_json(fake.channels(query))
+        elif path == f"{API_PATH}/playlistItems":
+            self.send_json(fake.playlist_items(query))
+        elif path == f"{API_PATH}/videos":
+            self.send_json(fake.videos(query))
+        else:
+            self.send_error_json(404, "notFound")
+
+    def send_error_json(self, status: int, reason: str):
+        self.send_json({"error": {"code": status, "errors": [{"reason": reason}]}}, status=status)
+
+    def send_json(self, payload, status: int = 200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    fake: "FakeYouTubeServer"
+
+
+class FakeYouTubeServer:
+    """Фейковый YouTube с настраиваемой задержкой и ошибками
+
+    Любой ID канала существует: у канала videos_per_channel видео, новые
+    первыми, раз в сколько-то часов; каждое short_every-е видео короткое
+    (1 минута), остальные по 15 минут.
+    """
+
+    def __init__(self, latency: float = 0.0, segments: int = 20,
+                 host: str = "127.0.0.1", port: int = 0,
+                 videos_per_channel: int = 200, short_every: int = 4,
+                 faults: Optional[Faults] = None):
+        self.latency = latency
+        self.segments = segments
+        self.videos_per_channel = videos_per_channel
+        self.short_every = short_every
+        self.faults = faults or Faults()
+        # Отказ прокси: PROXY_DROP | PROXY_STALL | PROXY_BLOCKED, можно менять на ходу
+        self.proxy_mode: Optional[str] = None
+        self.requests: Dict[str, int] = {}
+        self.injected: Dict[str, int] = {}
+        self._random = random.Random(self.faults.seed)
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), _Handler)
+        self._server.fake = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"{host}:{port}"
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.address}"
+
+    @property
+    def api_base(self) -> str:
+        """Адрес для YouTubeChannelCollector.api_base"""
+        return f"{self.base_url}{API_PATH}"
+
+    @property
+    def total_requests(self) -> int:
+        return sum(self.requests.values())
+
+    @property
+    def api_requests(self) -> int:
+        """Вызовов Data API"""
+        with self._lock:
+            return sum(count for path, count in self.requests.items() if path.startswith(API_PATH))
+
+    def count(self, path: str):
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+
+    def pick_fault(self, path: str) -> Optional[str]:
+        """Какую ошибку отдать на этот запрос (None - ответить нормально)"""
+        if self.proxy_mode == PROXY_DROP:
+            fault = "drop"
+        elif self.proxy_mode == PROXY_STALL:
+            fault = "timeout"
+        elif self.proxy_mode == PROXY_BLOCKED:
+            fault = "rate_limit"
+        elif path == "/generate_204":
+            return None
+        else:
+            faults = self.faults
+            chances = [
+                ("rate_limit", faults.rate_limit),
+                ("quota", faults.quota if path.startswith(API_PATH) else 0.0),
+                ("timeout", faults.timeout),
+                ("server_error", faults.server_error),
+            ]
+            with self._lock:
+                roll = self._random.random()
+            fault = None
+            for name, chance in chances:
+                if roll < chance:
+                    fault = name
+                    break
+                roll -= chance
+            if fault is None:
+                return None
+
+        with self._lock:
+            self.injected[fault] = self.injected.get(fault, 0) + 1
+        return fault
+
+    @staticmethod
+    def video_id(channel_id: str, index: int) -> str:
+        return f"{channel_id[2:]}_{index:05d}"
+
+    @staticmethod
+    def _parse_video_id(video_id: str):
+        channel, _, index = video_id.rpartition("_")
+        return f"UC{channel}", int(index) if index.isdigit() else 0
+
+    @staticmethod
+    def published_at(index: int) -> str:
+        return (_NEWEST - timedelta(hours=6 * index)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    @staticmethod
+    def channel_for_handle(handle: str) -> str:
+        """ID канала, который сервер отдаёт на forHandle / forUsername"""
+        return f"UC{handle.lstrip('@').lower()[:22]:_<22}"
+
+    def channels(self, query: Dict[str, str]) -> Dict:
+        """channels.list: плейлист загрузок UU... для каждого UC... (или handle)"""
+        handle = query.get("forHandle") or query.get("forUsername")
+        if handle:
+            ids = [self.channel_for_handle(handle)]
+        else:
+            ids = [channel_id for channel_id in query.get("id", "").split(",") if channel_id]
+        return {
+            "items": [
+                {
+                    "id": channel_id,
+                    "snippet": {"title": f"Channel {channel_id}"},
+                    "contentDetails": {"relatedPlaylists": {"uploads": f"UU{channel_id[2:]}"}}
+                }
+                for channel_id in ids
+            ]
+        }
+
+    def playlist_items(self, query: Dict[str, str]) -> Dict:
+        """playlistItems.list с постраничным токеном"""
+        channel_id = f"UC{query.get('playlistId', '')[2:]}"
+        start = int(query.get("pageToken") or 0)
+        end = min(start + int(query.get("maxResults", 5)), self.videos_per_channel)
+
+        data = {
+            "items": [
+                {
+                    "contentDetails": {
+                        "videoId": self.video_id(channel_id, index),
+                        "videoPublishedAt": self.published_at(index)
+                    }
+                }
+                for index in range(start, end)
+            ],
+            "pageInfo": {"totalResults": self.videos_per_channel}
+        }
+        if end < self.videos_per_channel:
+            data["nextPageToken"] = str(end)
+        return data
+
+    def videos(self, query: Dict[str, str]) -> Dict:
+        """videos.list: длительность, название, описание и теги"""
+        items = []
+        for video_id in query.get("id", "").split(","):
+            if not video_id:
+                continue
+            channel_id, index = self._parse_video_id(video_id)
+            short = self.short_every and index % self.short_every == self.short_every - 1
+            items.append({
+                "id": video_id,
+                "contentDetails": {
+                    "duration": "PT1M5S" if short else "PT15M30S",
+                    # Каждое пятое видео - только с автоматическими субтитрами
+                    "caption": "false" if index % 5 == 4 else "true"
+                },
+                "snippet": {
+                    "title": f"Video {index} of {channel_id}",
+                    "description": f"Episode {index} lorem ipsum",
+                    "tags": ["bench", f"episode{index}"],
+                    "publishedAt": self.published_at(index),
+                    "channelId": channel_id,
+                    "defaultAudioLanguage": "ru" if index % 3 == 2 else "en"
+                }
+            })
+        return {"items": items}
+
+    def make_transcript(self, video_id: str) -> Optional[List[Dict]]:
+        """Сегменты транскрипта в формате youtube-transcript-api (None - субтитров нет)"""
+        if self.faults.no_transcript:
+            with self._lock:
+                missing = self._random.random() < self.faults.no_transcript
+            if missing:
+                return None
+
+        return [
+            {
+                "text": f"{video_id} segment {i} lorem ipsum dolor sit amet",
+                "start": i * 4.0,
+                "duration": 4.0
+            }
+            for i in range(self.segments)
+        ]
+
+    def start(self) -> "FakeYouTubeServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeYouTubeServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
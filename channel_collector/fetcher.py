@@ -0,0 +1,181 @@
+"""
+Параллельная загрузка транскриптов: по одной полосе на прокси
+
+Каждая полоса держит свой бюджет задержек, поэтому вежливость к YouTube
+считается на IP, а общая скорость растёт с числом прокси.
+"""
+
+import queue
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Dict, Optional, Iterator
+
+from .collector import YouTubeChannelCollector
+from .metrics import Metrics, proxy_label
+from .pacing import AdaptivePacer, PacingController
+from .proxy import ProxyManager
+
+
+class ProxyLane:
+    """Полоса одного прокси со своими задержками"""
+
+    def __init__(self, proxy: Optional[str], delay_min: float, delay_max: float,
+                 long_pause_chance: float = 0.05, pacer: Optional[AdaptivePacer] = None):
+        self.proxy = proxy
+        self.delay_min = delay_min
+        self.delay_max = delay_max
+        self.long_pause_chance = long_pause_chance
+        self.pacer = pacer
+        self.ready_at = 0.0
+        self.fetched = 0
+        self.errors = 0
+
+    @property
+    def name(self) -> str:
+        return self.proxy or "direct"
+
+    def proxy_dict(self) -> Optional[Dict[str, str]]:
+        return ProxyManager.to_proxy_dict(self.proxy)
+
+    def schedule_next(self, error: bool = False):
+        """Назначить время следующего запроса через эту полосу"""
+        if self.pacer:
+            # Темп уже учёл исход запроса
+            self.ready_at = time.monotonic() + self.pacer.delay()
+            return
+
+        delay = random.uniform(self.delay_min, self.delay_max)
+
+        # Иногда длинная пауза
+        if random.random() < self.long_pause_chance:
+            delay += random.uniform(10, 30)
+
+        if error:
+            delay += random.uniform(2, 5)
+
+        self.ready_at = time.monotonic() + delay
+
+
+@dataclass
+class FetchResult:
+    """Результат загрузки одного видео"""
+
+    video: Dict
+    transcript: Optional[List[Dict]]
+    error: Optional[Exception]
+    lane: ProxyLane
+
+
+class ConcurrentFetcher:
+    """Пул потоков: полоса на прокси, общий лимит параллельных запросов"""
+
+    def __init__(self, collector: YouTubeChannelCollector, proxies: List[str],
+                 delay_min: float, delay_max: float, max_concurrency: int = 4,
+                 stop_event: Optional[threading.Event] = None,
+                 long_pause_chance: float = 0.05,
+                 proxy_manager: Optional[ProxyManager] = None,
+                 pacing: Optional[PacingController] = None,
+                 metrics: Optional[Metrics] = None):
+        self.collector = collector
+        self.proxy_manager = proxy_manager
+        self.pacing = pacing
+        self.metrics = metrics
+        self.lanes = [
+            ProxyLane(proxy, delay_min, delay_max, long_pause_chance,
+                      pacer=pacing.get(proxy) if pacing else None)
+            for proxy in (proxies or [None])
+        ]
+        self.max_concurrency = max(1, max_concurrency)
+        self.semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        self.stop_event = stop_event or threading.Event()
+
+    def fetch(self, videos: List[Dict]) -> Iterator[FetchResult]:
+        """Скачать транскрипты, отдавая результаты по мере готовности"""
+        jobs: "queue.Queue[Optional[Dict]]" = queue.Queue()
+        for video in videos:
+            jobs.put(video)
+        jobs.put(None)
+
+        return self.fetch_stream(jobs)
+
+    def fetch_stream(self, jobs: "queue.Queue[Optional[Dict]]") -> Iterator[FetchResult]:
+        """Скачивать видео из очереди, пока в ней не появится None
+
+        Очередь может пополняться во время работы - так листинг каналов
+        идёт одновременно с загрузкой транскриптов.
+        """
+        results: "queue.Queue[FetchResult]" = queue.Queue()
+        workers = [
+            threading.Thread(target=self._lane_worker, args=(lane, jobs, results), daemon=True)
+            for lane in self.lanes
+        ]
+        for worker in workers:
+            worker.start()
+
+        while True:
+            try:
+                result = results.get(timeout=0.5)
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in workers) and results.empty():
+                    break
+                continue
+
+            yield result
+
+    def _lane_worker(self, lane: ProxyLane, jobs: "queue.Queue[Optional[Dict]]",
+                     results: "queue.Queue[FetchResult]"):
+        stats = self.proxy_manager.stats.get(lane.proxy) if self.proxy_manager else None
+
+        while not self.stop_event.is_set():
+            ready_at = lane.ready_at
+            # Прокси на остывании после ошибок - полоса ждёт
+            if stats is not None:
+                ready_at = max(ready_at, stats.cooldown_until)
+
+            wait = ready_at - time.monotonic()
+            if wait > 0:
+                self.stop_event.wait(wait)
+                if self.metrics:
+                    self.metrics.observe('lane_wait_seconds', wait, proxy=proxy_label(lane.proxy))
+                continue
+
+            try:
+                video = jobs.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            if video is None:
+                # Конец очереди - оставляем метку остальным полосам
+                jobs.put(None)
+                return
+
+            transcript = None
+            error = None
+
+            with self.semaphore:
+                started = time.monotonic()
+                try:
+                    transcript = self.collector.get_transcript(
+                        video['video_id'],
+                        proxies=lane.proxy_dict()
+                    )
+                except Exception as e:
+                    error = e
+                latency = time.monotonic() - started
+
+            if error is None:
+                lane.fetched += 1
+                if self.proxy_manager and lane.proxy:
+                    self.proxy_manager.report_success(lane.proxy, latency)
+            else:
+                lane.errors += 1
+                if self.proxy_manager and lane.proxy:
+                    self.proxy_manager.report_error(lane.proxy)
+
+            if self.pacing:
+                self.pacing.record(lane.proxy, error, transcript)
+
+            lane.schedule_next(error=error is not None)
+            results.put(FetchResult(video, transcript, error, lane))
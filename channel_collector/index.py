@@ -0,0 +1,226 @@
+"""
+Локальный полнотекстовый индекс собранных транскриптов (SQLite FTS5)
+
+Каждый скачанный транскрипт кладётся в индекс вместе с каналом, названием
+и датой публикации - новый вопрос к собранному корпусу решается запросом
+за миллисекунды, без повторного сбора и без сети. Смещения сегментов
+хранятся рядом с текстом, поэтому у найденного фрагмента есть секунда видео.
+"""
+
+import json
+import sqlite3
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+
+
+# Маркеры подсветки внутри snippet(): в тексте транскрипта их не бывает
+_HIGHLIGHT_OPEN = "\x02"
+_HIGHLIGHT_CLOSE = "\x03"
+_ELLIPSIS = "…"
+
+
+def join_segments(segments: List[Dict]) -> Tuple[str, List[List[float]]]:
+    """Текст как в format_transcript и пары [смещение, секунда] по сегментам"""
+    parts = []
+    offsets = []
+    position = 0
+
+    for segment in segments:
+        text = segment.get('text', '')
+        offsets.append([position, segment.get('start', 0.0)])
+        parts.append(text)
+        position += len(text) + 1
+
+    return ' '.join(parts), offsets
+
+
+@dataclass
+class SearchHit:
+    """Найденное видео с лучшим фрагментом"""
+
+    video_id: str
+    channel_id: str
+    title: str
+    published_at: Optional[str]
+    snippet: str
+    # Секунда видео, где начинается фрагмент (None - неизвестно)
+    start: Optional[float]
+    score: float
+
+    @property
+    def url(self) -> str:
+        if self.start is None:
+            return f"https://www.youtube.com/watch?v={self.video_id}"
+        return f"https://www.youtube.com/watch?v={self.video_id}&t={int(self.start)}s"
+
+
+class TranscriptIndex:
+    """Индекс транскриптов в одном файле SQLite"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Текст хранится один раз в videos, FTS5 держит только индекс
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS videos (
+                id INTEGER PRIMARY KEY,
+                video_id TEXT NOT NULL UNIQUE,
+                channel_id TEXT,
+                title TEXT,
+                published_at TEXT,
+                transcript TEXT NOT NULL,
+                offsets TEXT,
+                indexed_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS videos_channel ON videos (channel_id, published_at);
+
+            CREATE VIRTUAL TABLE IF NOT EXISTS videos_fts USING fts5(
+                title, transcript,
+                content='videos', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            );
+
+            CREATE TRIGGER IF NOT EXISTS videos_ai AFTER INSERT ON videos BEGIN
+                INSERT INTO videos_fts (rowid, title, transcript)
+                VALUES (new.id, new.title, new.transcript);
+            END;
+            CREATE TRIGGER IF NOT EXISTS videos_ad AFTER DELETE ON videos BEGIN
+                INSERT INTO videos_fts (videos_fts, rowid, title, transcript)
+                VALUES ('delete', old.id, old.title, old.transcript);
+            END;
+            CREATE TRIGGER IF NOT EXISTS videos_au AFTER UPDATE ON videos BEGIN
+                INSERT INTO videos_fts (videos_fts, rowid, title, transcript)
+                VALUES ('delete', old.id, old.title, old.transcript);
+                INSERT INTO videos_fts (rowid, title, transcript)
+                VALUES (new.id, new.title, new.transcript);
+            END;
+        """)
+        self._conn.commit()
+
+    def add(self, channel_id: str, video: Dict, segments: Optional[List[Dict]] = None,
+            text: Optional[str] = None, replace: bool = False) -> bool:
+        """Добавить транскрипт; уже проиндексированное видео не трогается без replace"""
+        if segments is not None:
+            text, offsets = join_segments(segments)
+        else:
+            offsets = None
+
+        with self._lock:
+            exists = self._conn.execute(
+                "SELECT 1 FROM videos WHERE video_id = ?", (video['video_id'],)
+            ).fetchone()
+            if exists and not replace:
+                return False
+
+            values = (
+                channel_id,
+                video.get('title'),
+                video.get('published_at'),
+                text or '',
+                json.dumps(offsets) if offsets else None,
+                datetime.now().isoformat(),
+                video['video_id']
+            )
+            if exists:
+                self._conn.execute(
+                    """
+                    UPDATE videos SET channel_id = ?, title = ?, published_at = ?,
+                        transcript = ?, offsets = ?, indexed_at = ?
+                    WHERE video_id = ?
+                    """,
+                    values
+                )
+            else:
+                self._conn.execute(
+                    """
+                    INSERT INTO videos (channel_id, title, published_at, transcript, offsets, indexed_at, video_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    values
+                )
+            self._conn.commit()
+        return True
+
+    def import_jsonl(self, path: str) -> int:
+        """Добавить транскрипты из JSONL-вывода (без сегментов - без времени)"""
+        added = 0
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                if self.add(item.get('channel_id'), item, text=item.get('transcript')):
+                    added += 1
+        return added
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+
+    def search(self, query: str, limit: int = 20, channel_id: Optional[str] = None,
+               since: Optional[str] = None, snippet_tokens: int = 16) -> List[SearchHit]:
+        """Поиск в синтаксисе FTS5: слова, "фразы", AND / OR / NOT, NEAR(), префикс*"""
+        sql = f"""
+            SELECT v.video_id, v.channel_id, v.title, v.published_at, v.transcript, v.offsets,
+                   snippet(videos_fts, 1, ?, ?, ?, ?), bm25(videos_fts)
+            FROM videos_fts
+            JOIN videos v ON v.id = videos_fts.rowid
+            WHERE videos_fts MATCH ?
+            {"AND v.channel_id = ?" if channel_id else ""}
+            {"AND v.published_at >= ?" if since else ""}
+            ORDER BY bm25(videos_fts)
+            LIMIT ?
+        """
+        params: List = [_HIGHLIGHT_OPEN, _HIGHLIGHT_CLOSE, _ELLIPSIS, snippet_tokens, query]
+        if channel_id:
+            params.append(channel_id)
+        if since:
+            params.append(since)
+        params.append(limit)
+
+        try:
+            with self._lock:
+                rows = self._conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            raise Exception(f"Ошибка в запросе '{query}': {e}")
+
+        hits = []
+        for video_id, channel, title, published_at, transcript, offsets, snippet, score in rows:
+            start = self._snippet_start(snippet, transcript, offsets)
+            snippet = snippet.replace(_HIGHLIGHT_OPEN, '[').replace(_HIGHLIGHT_CLOSE, ']')
+            hits.append(SearchHit(video_id, channel, title, published_at, snippet, start, score))
+        return hits
+
+    @staticmethod
+    def _snippet_start(snippet: str, transcript: str, offsets: Optional[str]) -> Optional[float]:
+        """Секунда видео, где начинается фрагмент"""
+        if not offsets:
+            return None
+
+        plain = snippet.replace(_HIGHLIGHT_OPEN, '').replace(_HIGHLIGHT_CLOSE, '').strip(_ELLIPSIS)
+        # Первое подсвеченное слово точнее начала фрагмента
+        first = snippet.find(_HIGHLIGHT_OPEN)
+        lead = len(snippet[:first].lstrip(_ELLIPSIS)) if first >= 0 else 0
+
+        position = transcript.find(plain)
+        if position < 0:
+            return None
+
+        pairs = json.loads(offsets)
+        index = bisect_right([offset for offset, _ in pairs], position + lead) - 1
+        return pairs[max(0, index)][1]
+
+    def optimize(self):
+        """Слить сегменты индекса после большой загрузки"""
+        with self._lock:
+            self._conn.execute("INSERT INTO videos_fts (videos_fts) VALUES ('optimize')")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,77 @@
+"""
+Пул API ключей с переключением при исчерпании квоты
+"""
+
+import threading
+import time
+from typing import List, Dict, Optional
+
+from .quota import QuotaExceededError, QuotaMeter, key_id, seconds_until_reset
+
+
+class ApiKeyPool:
+    """Ротация API ключей, как ProxyManager для IP"""
+
+    # Сколько ждать после rateLimitExceeded (секунд)
+    RATE_LIMIT_COOLDOWN = 60
+
+    def __init__(self, keys: Optional[List[str]] = None):
+        self.keys: List[str] = list(keys or [])
+        self.current_index = 0
+        # Ключ -> время (monotonic), до которого его не трогаем
+        self.cooldown_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def read_keys(file_path: str) -> List[str]:
+        """Прочитать ключи из файла: по одному на строку, # - комментарий"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+    def load_keys(self, file_path: str) -> int:
+        """Загрузить ключи из файла"""
+        try:
+            self.keys = self.read_keys(file_path)
+            self.current_index = 0
+            self.cooldown_until.clear()
+            return len(self.keys)
+        except Exception as e:
+            raise Exception(f"Ошибка загрузки API ключей: {e}")
+
+    def is_available(self, api_key: str) -> bool:
+        return self.cooldown_until.get(api_key, 0) <= time.monotonic()
+
+    def acquire(self, cost: int = 1, quota: Optional[QuotaMeter] = None) -> str:
+        """Следующий ключ по кругу, у которого есть квота"""
+        with self._lock:
+            for _ in range(len(self.keys)):
+                api_key = self.keys[self.current_index]
+                self.current_index = (self.current_index + 1) % len(self.keys)
+
+                if not self.is_available(api_key):
+                    continue
+                if quota and not quota.can_afford(api_key, cost):
+                    continue
+
+                return api_key
+
+        raise QuotaExceededError(f"Квота исчерпана на всех API ключах ({len(self.keys)})")
+
+    def report_exhausted(self, api_key: str, reason: str = "quotaExceeded"):
+        """Убрать ключ из ротации до сброса квоты (или на минуту при rate limit)"""
+        if reason in ('rateLimitExceeded', 'userRateLimitExceeded'):
+            cooldown = self.RATE_LIMIT_COOLDOWN
+        else:
+            cooldown = seconds_until_reset()
+
+        with self._lock:
+            self.cooldown_until[api_key] = time.monotonic() + cooldown
+
+    def remaining(self, quota: QuotaMeter) -> int:
+        """Суммарный остаток квоты по доступным ключам"""
+        return sum(quota.remaining(api_key) for api_key in self.keys if self.is_available(api_key))
+
+    @staticmethod
+    def label(api_key: str) -> str:
+        """Безопасное имя ключа для лога"""
+        return f"key-{key_id(api_key)[:6]}"
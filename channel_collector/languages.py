@@ -0,0 +1,87 @@
+"""
+Выбор дорожки субтитров: язык, ручные или автоматические, перевод
+
+Без политики коллектор просит у библиотеки первый язык из списка и
+получает NoTranscriptFound, если у видео другой язык. С политикой список
+дорожек видео разбирается сам: ручные субтитры идут раньше автоматических,
+при отсутствии нужного языка берётся любой, а при translate_to YouTube
+переводит дорожку на своей стороне. Список дорожек библиотека запрашивает
+перед любой загрузкой, так что выбор запросов не добавляет.
+"""
+
+from typing import List, Optional, Iterable, Tuple, Any
+
+from .prefilter import primary_language
+
+
+DEFAULT_LANGUAGES = ['en', 'ru', 'es', 'fr', 'de']
+
+
+class LanguagePolicy:
+    """Порядок выбора дорожки из списка субтитров видео"""
+
+    def __init__(self, languages: Iterable[str] = DEFAULT_LANGUAGES,
+                 manual_first: bool = True, translate_to: Optional[str] = None):
+        self.languages = [code.strip() for code in languages if code.strip()]
+        self.manual_first = manual_first
+        self.translate_to = translate_to.strip() if translate_to else None
+
+    def key(self) -> str:
+        """Часть ключа кэша: другая политика - другой транскрипт"""
+        key = f"{','.join(self.languages)};{'manual' if self.manual_first else 'generated'}"
+        if self.translate_to:
+            key += f">{self.translate_to}"
+        return key
+
+    def candidates(self) -> List[str]:
+        """Языки по убыванию приоритета: перевод, затем список"""
+        codes = [self.translate_to, *self.languages]
+        return list(dict.fromkeys(primary_language(code) for code in codes if code))
+
+    def choose(self, tracks: Iterable[Any]) -> Optional[Tuple[Any, Any]]:
+        """(дорожка для загрузки, исходная дорожка) или None, если подходящей нет
+
+        Дорожки - объекты Transcript из youtube-transcript-api.
+        """
+        tracks = list(tracks)
+        if not tracks:
+            return None
+
+        rank = {code: index for index, code in enumerate(self.candidates())}
+        last = len(rank)
+
+        def order(track) -> Tuple[int, int, int]:
+            code = primary_language(track.language_code)
+            generated = 1 if track.is_generated else 0
+            kind = generated if self.manual_first else 1 - generated
+            # Язык не из списка - после всех языков списка (даже ручной после автоматических),
+            # но не отбрасывается
+            return (0 if code in rank else 1), kind, rank.get(code, last)
+
+        for track in sorted(tracks, key=order):
+            chosen = self.translated(track)
+            if chosen is not None:
+                return chosen, track
+
+        return None
+
+    def translated(self, track: Any) -> Optional[Any]:
+        """Дорожка на нужном языке: сама или её перевод (None - перевести нельзя)"""
+        target = self.translate_to
+        if not target or primary_language(track.language_code) == primary_language(target):
+            return track
+        if not track.is_translatable:
+            return None
+        return track.translate(target)
+
+
+def configure_languages(collector, languages: Optional[List[str]] = None,
+                        negotiate: bool = False, manual_first: bool = True,
+                        translate_to: Optional[str] = None):
+    """Настроить коллектор: список языков и, если нужно, политику выбора дорожки"""
+    if languages:
+        collector.languages = list(languages)
+    if negotiate or translate_to:
+        collector.language_policy = LanguagePolicy(collector.languages, manual_first, translate_to)
+    else:
+        collector.language_policy = None
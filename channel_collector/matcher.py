@@ -0,0 +1,198 @@
+"""
+Поиск многих ключевых слов за один проход (Aho-Corasick)
+
+Все слова и фразы списка собираются в один автомат, поэтому время поиска
+зависит от длины транскрипта, а не от числа слов. Совпадения считаются по
+каждому слову и привязываются к сегментам транскрипта, то есть к секундам
+видео.
+"""
+
+from bisect import bisect_right
+from collections import deque
+from dataclasses import dataclass, field
+from typing import List, Dict, Iterable, Tuple
+
+
+def _is_word(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+def format_timestamp(seconds: float) -> str:
+    """Секунды -> 1:02:03 или 02:03"""
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+def read_keywords(file_path: str) -> List[str]:
+    """Список слов из файла: по одному на строку, # - комментарий"""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    except Exception as e:
+        raise Exception(f"Ошибка загрузки ключевых слов: {e}")
+
+
+@dataclass
+class KeywordHit:
+    """Одно совпадение"""
+
+    keyword: str
+    # Секунда видео, с которой начинается сегмент с совпадением
+    start: float
+    segment: int
+
+    def to_dict(self) -> Dict:
+        return {'keyword': self.keyword, 'start': self.start, 'segment': self.segment}
+
+
+@dataclass
+class MatchReport:
+    """Совпадения в одном транскрипте"""
+
+    counts: Dict[str, int] = field(default_factory=dict)
+    hits: List[KeywordHit] = field(default_factory=list)
+
+    @property
+    def matched(self) -> bool:
+        return bool(self.counts)
+
+    def summary(self) -> str:
+        """META ×3, AAPL ×1"""
+        return ", ".join(f"{keyword} ×{count}" for keyword, count in self.counts.items())
+
+
+class KeywordMatcher:
+    """Автомат Aho-Corasick по списку слов и фраз"""
+
+    def __init__(self, keywords: Iterable[str], whole_words: bool = False,
+                 casefold: bool = True):
+        self.whole_words = whole_words
+        self.casefold = casefold
+        # Исходное написание слова для отчёта, без повторов
+        self.keywords: List[str] = []
+        patterns: List[str] = []
+
+        for keyword in keywords:
+            pattern = self._fold(' '.join(keyword.split()))
+            if pattern and pattern not in patterns:
+                self.keywords.append(keyword.strip())
+                patterns.append(pattern)
+
+        self.lengths = [len(pattern) for pattern in patterns]
+        self._build(patterns)
+
+    def _fold(self, text: str) -> str:
+        return text.casefold() if self.casefold else text
+
+    def _build(self, patterns: List[str]):
+        # Бор: переходы, ссылки неудач и номера слов, оканчивающихся в узле
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        for index, pattern in enumerate(patterns):
+            node = 0
+            for char in pattern:
+                nxt = self._goto[node].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append(index)
+
+        # Ссылки неудач обходом в ширину
+        pending = deque(self._goto[0].values())
+        while pending:
+            node = pending.popleft()
+            for char, nxt in self._goto[node].items():
+                pending.append(nxt)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(char, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _normalize(self, parts: Iterable[str]) -> Tuple[str, List[int]]:
+        """Склеить части через пробел со свёрткой регистра и пробелов
+
+        Возвращает текст и смещения начала каждой части в нём.
+        """
+        chars: List[str] = []
+        starts: List[int] = []
+        prev_space = True
+
+        for part in parts:
+            if chars and not prev_space:
+                chars.append(' ')
+                prev_space = True
+            starts.append(len(chars))
+
+            for char in part:
+                if char.isspace():
+                    if not prev_space:
+                        chars.append(' ')
+                        prev_space = True
+                    continue
+                chars.extend(self._fold(char))
+                prev_space = False
+
+        return ''.join(chars), starts
+
+    def _bounded(self, text: str, start: int, end: int) -> bool:
+        """Слово не продолжается за краями совпадения"""
+        if start > 0 and _is_word(text[start - 1]) and _is_word(text[start]):
+            return False
+        if end < len(text) and _is_word(text[end]) and _is_word(text[end - 1]):
+            return False
+        return True
+
+    def find(self, text: str) -> List[Tuple[int, int, int]]:
+        """Все совпадения в нормализованном тексте: (начало, конец, номер слова)"""
+        found = []
+        node = 0
+
+        for position, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+
+            for index in self._out[node]:
+                end = position + 1
+                start = end - self.lengths[index]
+                if not self.whole_words or self._bounded(text, start, end):
+                    found.append((start, end, index))
+
+        return found
+
+    def count(self, text: str) -> Dict[str, int]:
+        """Число совпадений по словам в произвольном тексте"""
+        normalized, _ = self._normalize([text])
+        counts: Dict[str, int] = {}
+        for _, _, index in self.find(normalized):
+            keyword = self.keywords[index]
+            counts[keyword] = counts.get(keyword, 0) + 1
+        return counts
+
+    def match_segments(self, segments: List[Dict]) -> MatchReport:
+        """Совпадения в транскрипте с привязкой к секундам сегментов
+
+        Фраза может начинаться в одном сегменте и заканчиваться в
+        следующем - время берётся по сегменту, где она начинается.
+        """
+        text, starts = self._normalize(segment.get('text', '') for segment in segments)
+        report = MatchReport()
+
+        for start, _, index in self.find(text):
+            keyword = self.keywords[index]
+            segment = max(0, bisect_right(starts, start) - 1)
+            report.counts[keyword] = report.counts.get(keyword, 0) + 1
+            report.hits.append(KeywordHit(keyword, segments[segment].get('start', 0.0), segment))
+
+        return report
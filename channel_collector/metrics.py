@@ -0,0 +1,222 @@
+"""
+Метрики запуска: счётчики, гистограммы задержек и время по фазам
+
+Каждый сетевой вызов и каждая пауза учитываются с метками (метод API,
+прокси, исход), поэтому видно, куда уходит время: API, транскрипты или
+сон, и какой прокси тормозит. Итог пишется в JSON, а во время работы
+метрики можно забирать в формате Prometheus.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+
+# Границы корзин гистограмм (секунды)
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+PROMETHEUS_PREFIX = "channel_collector_"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Optional[str]]) -> Labels:
+    return tuple(sorted((key, str(value) if value is not None else "") for key, value in labels.items()))
+
+
+def proxy_label(proxies: Union[Dict, str, None]) -> str:
+    """Метка прокси (словарь requests или строка): хост:порт без логина и пароля"""
+    proxy = proxies.get('https') if isinstance(proxies, dict) else proxies
+    if not proxy:
+        return "direct"
+    # Метки уходят в JSON и в /metrics - учётные данные туда попасть не должны
+    return urlsplit(proxy if '://' in proxy else f'http://{proxy}').netloc.rpartition('@')[2]
+
+
+class Histogram:
+    """Распределение значений по корзинам"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def observe(self, value: float):
+        index = len(BUCKETS)
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "Histogram"):
+        """Добавить значения другой гистограммы"""
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.sum += other.sum
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Оценка квантиля по корзинам (линейно внутри корзины)"""
+        if not self.count:
+            return None
+
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for i, count in enumerate(self.counts):
+            upper = BUCKETS[i] if i < len(BUCKETS) else (self.max or lower)
+            if count and seen + count >= rank:
+                estimate = lower + (upper - lower) * (rank - seen) / count
+                return min(max(estimate, self.min), self.max)
+            seen += count
+            lower = upper
+        return self.max
+
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'min': self.min,
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'buckets': {str(bound): count for bound, count in zip(BUCKETS + ('+Inf',), self.counts)},
+        }
+
+
+class Metrics:
+    """Реестр метрик одного запуска"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Увеличить счётчик"""
+        key = _labels(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """Добавить значение в гистограмму"""
+        key = _labels(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def grouped(self, name: str, by: Optional[str] = None, **match) -> Dict[str, Histogram]:
+        """Гистограммы с такими метками, сложенные по значению метки by"""
+        wanted = set(_labels(match))
+        groups: Dict[str, Histogram] = {}
+        with self._lock:
+            for key, histogram in self.histograms.get(name, {}).items():
+                if not wanted <= set(key):
+                    continue
+                group = dict(key).get(by, "") if by else ""
+                groups.setdefault(group, Histogram()).merge(histogram)
+        return groups
+
+    def total(self, name: str, **match) -> Histogram:
+        """Все серии гистограммы с такими метками вместе"""
+        return self.grouped(name, **match).get("", Histogram())
+
+    def snapshot(self) -> Dict:
+        """Все метрики в виде словаря для JSON"""
+        with self._lock:
+            return {
+                'started_at': self.started,
+                'elapsed': round(time.time() - self.started, 3),
+                'counters': {
+                    name: [dict(key, value=value) for key, value in series.items()]
+                    for name, series in self.counters.items()
+                },
+                'histograms': {
+                    name: [dict(key, **histogram.to_dict()) for key, histogram in series.items()]
+                    for name, series in self.histograms.items()
+                },
+            }
+
+    def write_json(self, path: str):
+        """Сохранить снимок метрик в файл"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+
+    def prometheus_text(self) -> str:
+        """Метрики в текстовом формате Prometheus"""
+        def render(key: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = key + extra
+            if not pairs:
+                return ""
+            escaped = (value.replace('\\', '\\\\').replace('"', '\\"') for _, value in pairs)
+            return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                metric = f"{PROMETHEUS_PREFIX}{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in series.items():
+                    lines.append(f"{metric}{render(key)} {value}")
+
+            for name, series in sorted(self.histograms.items()):
+                metric = f"{PROMETHEUS_PREFIX}{name}"
+                lines.append(f"# TYPE {metric} histogram")
+                for key, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip(BUCKETS + ('+Inf',), histogram.counts):
+                        cumulative += count
+                        lines.append(f"{metric}_bucket{render(key, (('le', str(bound)),))} {cumulative}")
+                    lines.append(f"{metric}_sum{render(key)} {histogram.sum}")
+                    lines.append(f"{metric}_count{render(key)} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> int:
+        """Отдавать /metrics для Prometheus в фоновом потоке"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split('?')[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server.server_address[1]
+
+    def stop_server(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
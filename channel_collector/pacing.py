@@ -0,0 +1,137 @@
+"""
+Адаптивные задержки: темп на каждый прокси по принципу AIMD
+
+Темп (запросов в секунду) растёт понемногу после каждого чистого ответа и
+падает вдвое, когда YouTube подаёт сигнал замедлиться (429, страница
+согласия, блокировка IP, пустой ответ). Так спим столько, сколько просит
+сервер, а не фиксированные 3-10 секунд на каждый запрос.
+"""
+
+import random
+import threading
+from typing import Dict, Optional, List, Any
+
+
+# Ошибки youtube-transcript-api, которыми YouTube просит притормозить
+THROTTLE_ERRORS = {
+    'TooManyRequests',
+    'RequestBlocked',
+    'IpBlocked',
+    'FailedToCreateConsentCookie',
+    'YouTubeDataUnparsable',
+}
+
+# Исходы запроса
+CLEAN = "clean"
+SLOW_DOWN = "slow_down"
+THROTTLED = "throttled"
+
+
+def status_code(error: BaseException) -> Optional[int]:
+    """HTTP-код ответа, на котором упал запрос
+
+    YouTubeRequestFailed не хранит ответ, но поднимается внутри except HTTPError:
+    код берём у исходной ошибки.
+    """
+    while error is not None:
+        code = getattr(getattr(error, 'response', None), 'status_code', None)
+        if code is not None:
+            return code
+        error = error.__cause__ or error.__context__
+    return None
+
+
+def classify(error: Optional[Exception] = None, transcript: Any = None) -> str:
+    """Исход запроса для регулятора темпа"""
+    if error is not None:
+        if type(error).__name__ in THROTTLE_ERRORS or status_code(error) == 429:
+            return THROTTLED
+
+        # Сетевые ошибки и прочее: прокси остынет сам, темп сбавляем мягко
+        return SLOW_DOWN
+
+    # Пустой список (не None) - YouTube отдал страницу без субтитров
+    if transcript is not None and len(transcript) == 0:
+        return SLOW_DOWN
+
+    return CLEAN
+
+
+class AdaptivePacer:
+    """Темп запросов одного прокси"""
+
+    # Прибавка темпа за чистый ответ - доля от максимального темпа:
+    # после одного замедления вдвое полная скорость вернётся за 5 ответов
+    INCREASE = 0.1
+    # Множители темпа при сигналах
+    THROTTLE_FACTOR = 0.5
+    SLOW_DOWN_FACTOR = 0.8
+
+    def __init__(self, min_delay: float, max_delay: float):
+        # Нулевая задержка не даёт посчитать темп - держим хоть какой-то пол
+        self.min_delay = max(min_delay, 0.05)
+        self.max_delay = max(max_delay, self.min_delay)
+        # Старт на максимальной скорости, притормаживаем по сигналам
+        self.rate = 1 / self.min_delay
+        self.clean = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    @property
+    def interval(self) -> float:
+        """Текущий интервал между запросами (сек)"""
+        return 1 / self.rate
+
+    def record(self, outcome: str):
+        """Учесть исход запроса"""
+        with self._lock:
+            if outcome == CLEAN:
+                self.clean += 1
+                self.rate += self.INCREASE / self.min_delay
+            elif outcome == THROTTLED:
+                self.throttled += 1
+                self.rate *= self.THROTTLE_FACTOR
+            else:
+                self.rate *= self.SLOW_DOWN_FACTOR
+
+            self.rate = min(max(self.rate, 1 / self.max_delay), 1 / self.min_delay)
+
+    def delay(self) -> float:
+        """Сколько ждать до следующего запроса (с разбросом ±20%)"""
+        return self.interval * random.uniform(0.8, 1.2)
+
+
+class PacingController:
+    """Регуляторы темпа по прокси"""
+
+    def __init__(self, min_delay: float, max_delay: float):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.pacers: Dict[Optional[str], AdaptivePacer] = {}
+        self._lock = threading.Lock()
+
+    def get(self, proxy: Optional[str]) -> AdaptivePacer:
+        """Регулятор прокси (None - прямое соединение)"""
+        with self._lock:
+            pacer = self.pacers.get(proxy)
+            if pacer is None:
+                pacer = self.pacers[proxy] = AdaptivePacer(self.min_delay, self.max_delay)
+            return pacer
+
+    def record(self, proxy: Optional[str], error: Optional[Exception] = None,
+               transcript: Any = None) -> str:
+        """Учесть ответ и вернуть его исход"""
+        outcome = classify(error, transcript)
+        self.get(proxy).record(outcome)
+        return outcome
+
+    def summary(self) -> List[str]:
+        """Строки для лога: итоговый интервал и число замедлений"""
+        with self._lock:
+            pacers = list(self.pacers.items())
+
+        return [
+            f"{proxy or 'direct'}: интервал {pacer.interval:.1f} с, "
+            f"чистых ответов {pacer.clean}, замедлений {pacer.throttled}"
+            for proxy, pacer in pacers
+        ]
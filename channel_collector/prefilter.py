@@ -0,0 +1,116 @@
+"""
+Отсев видео по метаданным до запроса транскрипта
+
+videos.list уже вернул название, описание, теги, дату, наличие загруженных
+субтитров и язык. Всё это проверяется до загрузки: каждый запрос
+транскрипта - самый дефицитный ресурс и главный повод для бана по IP.
+Чего в метаданных нет (старые контрольные точки, пустой язык), то фильтр
+не отсеивает.
+"""
+
+import threading
+from datetime import datetime
+from typing import List, Dict, Optional, Iterable, Tuple
+
+from .matcher import KeywordMatcher
+
+
+# Причины отсева
+KEYWORDS = "keywords"
+DATE = "date"
+CAPTIONS = "captions"
+LANGUAGE = "language"
+
+REASON_LABELS = {
+    KEYWORDS: "нет слов в названии, описании и тегах",
+    DATE: "вне диапазона дат",
+    CAPTIONS: "нет загруженных субтитров",
+    LANGUAGE: "другой язык",
+}
+
+
+def parse_date(text: str) -> str:
+    """Дата ГГГГ-ММ-ДД для сравнения с publishedAt"""
+    try:
+        return datetime.strptime(text.strip(), "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise Exception(f"Неверная дата '{text}', нужен формат ГГГГ-ММ-ДД")
+
+
+def primary_language(code: str) -> str:
+    """en-US -> en"""
+    return code.replace('_', '-').split('-')[0].lower()
+
+
+class VideoFilter:
+    """Проверки метаданных видео; считает, сколько загрузок сэкономлено"""
+
+    def __init__(self, matcher: Optional[KeywordMatcher] = None,
+                 published_after: Optional[str] = None,
+                 published_before: Optional[str] = None,
+                 captions_only: bool = False,
+                 languages: Iterable[str] = ()):
+        self.matcher = matcher
+        self.published_after = parse_date(published_after) if published_after else None
+        self.published_before = parse_date(published_before) if published_before else None
+        self.captions_only = captions_only
+        self.languages = {primary_language(code) for code in languages if code.strip()}
+        self.checked = 0
+        # Отсеяно по причинам
+        self.skipped: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return bool(self.matcher or self.published_after or self.published_before
+                    or self.captions_only or self.languages)
+
+    @property
+    def total_skipped(self) -> int:
+        return sum(self.skipped.values())
+
+    def reason(self, video: Dict) -> Optional[str]:
+        """Почему видео не стоит качать (None - качать)"""
+        published = (video.get('published_at') or '')[:10]
+        if published:
+            if self.published_after and published < self.published_after:
+                return DATE
+            if self.published_before and published > self.published_before:
+                return DATE
+
+        if self.captions_only and video.get('caption') is False:
+            return CAPTIONS
+
+        language = video.get('language')
+        if self.languages and language and primary_language(language) not in self.languages:
+            return LANGUAGE
+
+        # Слова - последними: это самая дорогая проверка
+        if self.matcher and 'description' in video:
+            text = ' '.join([video.get('title') or '', video.get('description') or '', *video.get('tags', [])])
+            if not self.matcher.count(text):
+                return KEYWORDS
+
+        return None
+
+    def split(self, videos: List[Dict]) -> Tuple[List[Dict], List[Tuple[Dict, str]]]:
+        """Разделить видео: что качать и что отсеяно (с причиной)"""
+        kept = []
+        skipped = []
+        for video in videos:
+            reason = self.reason(video)
+            if reason is None:
+                kept.append(video)
+            else:
+                skipped.append((video, reason))
+
+        with self._lock:
+            self.checked += len(videos)
+            for _, reason in skipped:
+                self.skipped[reason] = self.skipped.get(reason, 0) + 1
+
+        return kept, skipped
+
+    def summary(self) -> str:
+        """нет загруженных субтитров: 3, другой язык: 1"""
+        return ", ".join(f"{REASON_LABELS[reason]}: {count}" for reason, count in sorted(self.skipped.items()))
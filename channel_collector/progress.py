@@ -0,0 +1,103 @@
+"""
+Прогресс сбора по событиям движка: скорость, оценка остатка
+
+Не зависит от GUI: трекер получает CollectorEvent (channel, planned, video)
+и отвечает, сколько видео обработано, с какой скоростью и сколько осталось.
+"""
+
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from .engine import CollectorEvent
+
+
+class ProgressTracker:
+    """Скорость по скользящему окну и ETA"""
+
+    def __init__(self, window: float = 60):
+        self.window = window
+        self.started: Optional[float] = None
+        self.channels_total = 0
+        self.channels_started = 0
+        # Видео, взятые в работу после листинга, и видео с итоговым статусом
+        self.planned = 0
+        self.processed = 0
+        self.statuses: Dict[str, int] = {}
+        # (время, processed) для скорости за последние window секунд
+        self._samples: "deque[tuple]" = deque()
+
+    def update(self, event: CollectorEvent, now: Optional[float] = None):
+        """Учесть событие движка; остальные события игнорируются"""
+        now = time.monotonic() if now is None else now
+        if self.started is None:
+            self.started = now
+            self._samples.append((now, 0))
+
+        if event.kind == "channel":
+            self.channels_total = event.data['total']
+            self.channels_started = max(self.channels_started, event.data['index'])
+        elif event.kind == "planned":
+            self.planned += event.data['count']
+        elif event.kind == "video":
+            status = event.data['status']
+            self.processed += 1
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            self._samples.append((now, self.processed))
+            while len(self._samples) > 2 and now - self._samples[0][0] > self.window:
+                self._samples.popleft()
+
+    def rate(self, now: Optional[float] = None) -> float:
+        """Видео в секунду за последние window секунд"""
+        if len(self._samples) < 2:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        first_time, first_count = self._samples[0]
+        elapsed = max(now - first_time, 1e-6)
+        return (self.processed - first_count) / elapsed
+
+    @property
+    def estimated_total(self) -> int:
+        """Сколько видео будет всего: непролистанные каналы - по среднему пролистанных"""
+        total = max(self.planned, self.processed)
+        if 0 < self.channels_started < self.channels_total:
+            total = round(total / self.channels_started * self.channels_total)
+        return total
+
+    def eta(self, now: Optional[float] = None) -> Optional[float]:
+        """Секунд до конца (None - скорость ещё неизвестна)"""
+        rate = self.rate(now)
+        if rate <= 0:
+            return None
+        return max(0, self.estimated_total - self.processed) / rate
+
+    @property
+    def fraction(self) -> float:
+        total = self.estimated_total
+        return min(1.0, self.processed / total) if total else 0.0
+
+    def summary(self, now: Optional[float] = None) -> str:
+        """Каналы 2/10 · видео 150/~400 · 1.8 видео/с · осталось ~3 мин"""
+        parts = []
+        if self.channels_total:
+            parts.append(f"каналы {self.channels_started}/{self.channels_total}")
+
+        approx = "~" if 0 < self.channels_started < self.channels_total else ""
+        parts.append(f"видео {self.processed}/{approx}{self.estimated_total}")
+        parts.append(f"{self.rate(now):.2f} видео/с")
+
+        eta = self.eta(now)
+        if eta is not None and self.processed < self.estimated_total:
+            parts.append(f"осталось ~{format_duration(eta)}")
+
+        return " · ".join(parts)
+
+
+def format_duration(seconds: float) -> str:
+    """45 с, 12 мин, 2 ч 05 мин"""
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds} с"
+    if seconds < 3600:
+        return f"{seconds // 60} мин"
+    return f"{seconds // 3600} ч {seconds % 3600 // 60:02d} мин"
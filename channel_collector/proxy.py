@@ -0,0 +1,273 @@
+"""
+Управление прокси: выбор по здоровью, остывание упавших, проверка при загрузке
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
+
+import requests
+
+
+class ProxyStats:
+    """Здоровье одного прокси"""
+
+    # Задержка, которую считаем для ещё не измеренного прокси (сек)
+    DEFAULT_LATENCY = 1.0
+
+    def __init__(self, proxy: str):
+        self.proxy = proxy
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.latency: Optional[float] = None
+        self.last_failure: Optional[float] = None
+        self.cooldown_until = 0.0
+
+    @property
+    def success_rate(self) -> float:
+        # Сглаживание: новый прокси стартует с 50%, а не с 0 или 100
+        return (self.successes + 1) / (self.successes + self.failures + 2)
+
+    @property
+    def score(self) -> float:
+        """Чем меньше, тем лучше: ожидаемое время на успешный запрос"""
+        latency = self.latency if self.latency is not None else self.DEFAULT_LATENCY
+        return latency / self.success_rate
+
+    def is_cooling(self, now: Optional[float] = None) -> bool:
+        return self.cooldown_until > (now if now is not None else time.monotonic())
+
+    def record_success(self, latency: Optional[float] = None):
+        self.successes += 1
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+
+        if latency is not None:
+            # Скользящее среднее, чтобы один медленный ответ не решал всё
+            self.latency = latency if self.latency is None else 0.7 * self.latency + 0.3 * latency
+
+    def record_failure(self, base_cooldown: float, max_cooldown: float):
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_failure = time.monotonic()
+
+        # Экспоненциальное остывание: 30 с, 60 с, 120 с ... до max_cooldown
+        cooldown = min(base_cooldown * 2 ** (self.consecutive_failures - 1), max_cooldown)
+        self.cooldown_until = self.last_failure + cooldown
+
+
+class ProxyManager:
+    """Управление прокси: самый быстрый здоровый, упавшие - на остывание"""
+
+    def __init__(self):
+        self.proxies: List[str] = []
+        self.stats: Dict[str, ProxyStats] = {}
+        self.current_index = 0
+        self.requests_count = 0
+        self.rotation_interval = 10
+        self.consecutive_errors = 0
+        self.base_cooldown = 30.0
+        self.max_cooldown = 900.0
+        self._paused = False
+        self._lock = threading.RLock()
+
+    def load_proxies(self, file_path: str):
+        """Загрузить прокси из файла"""
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                proxies = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+            self.set_proxies(proxies)
+            return len(self.proxies)
+        except Exception as e:
+            raise Exception(f"Ошибка загрузки прокси: {e}")
+
+    def set_proxies(self, proxies: List[str]):
+        """Заменить список прокси, сохранив статистику известных"""
+        with self._lock:
+            self.proxies = list(dict.fromkeys(proxies))
+            self.stats = {proxy: self.stats.get(proxy) or ProxyStats(proxy) for proxy in self.proxies}
+            self.current_index = 0
+            self.requests_count = 0
+            self.consecutive_errors = 0
+            self._paused = False
+
+    def check_proxies(self, test_url: str = "https://www.youtube.com/generate_204",
+                      timeout: float = 10, workers: int = 16) -> Tuple[List[str], List[str]]:
+        """Параллельная проверка всех прокси: мёртвые удаляются из списка"""
+        def probe(proxy: str) -> Tuple[str, Optional[float]]:
+            started = time.monotonic()
+            try:
+                response = requests.get(test_url, proxies=self.to_proxy_dict(proxy), timeout=timeout)
+                response.raise_for_status()
+                return proxy, time.monotonic() - started
+            except Exception:
+                return proxy, None
+
+        if not self.proxies:
+            return [], []
+
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(self.proxies)))) as pool:
+            results = list(pool.map(probe, self.proxies))
+
+        alive = [proxy for proxy, latency in results if latency is not None]
+        dead = [proxy for proxy, latency in results if latency is None]
+
+        with self._lock:
+            for proxy, latency in results:
+                if latency is not None:
+                    self.stats[proxy].record_success(latency)
+            self.proxies = alive
+            self.stats = {proxy: self.stats[proxy] for proxy in alive}
+            self.current_index = self._best_index()
+            self.requests_count = 0
+
+        return alive, dead
+
+    def get_current_proxy(self) -> Optional[str]:
+        """Получить текущий прокси"""
+        if not self.proxies:
+            return None
+        return self.proxies[self.current_index]
+
+    def _best_index(self, exclude: Optional[str] = None) -> int:
+        """Индекс самого быстрого прокси не на остывании"""
+        if not self.proxies:
+            return 0
+
+        now = time.monotonic()
+        candidates = [
+            (self.stats[proxy].score, index)
+            for index, proxy in enumerate(self.proxies)
+            if not self.stats[proxy].is_cooling(now) and proxy != exclude
+        ]
+
+        if not candidates:
+            # Все остывают (или он один) - берём того, кто освободится раньше
+            candidates = [
+                (self.stats[proxy].cooldown_until, index)
+                for index, proxy in enumerate(self.proxies)
+            ]
+
+        return min(candidates)[1]
+
+    def rotate_proxy(self):
+        """Сменить прокси на лучший из остальных"""
+        with self._lock:
+            if not self.proxies:
+                return
+
+            self.current_index = self._best_index(exclude=self.get_current_proxy())
+            self.requests_count = 0
+
+    def healthy_count(self) -> int:
+        """Сколько прокси не на остывании"""
+        now = time.monotonic()
+        return sum(1 for stats in self.stats.values() if not stats.is_cooling(now))
+
+    def seconds_until_available(self) -> float:
+        """Через сколько освободится первый прокси"""
+        if not self.stats:
+            return 0.0
+        return max(0.0, min(stats.cooldown_until for stats in self.stats.values()) - time.monotonic())
+
+    def report_success(self, proxy: Optional[str] = None, latency: Optional[float] = None):
+        """Отметить успешный запрос"""
+        with self._lock:
+            current = self.get_current_proxy()
+            proxy = proxy or current
+
+            if proxy in self.stats:
+                self.stats[proxy].record_success(latency)
+
+            self.consecutive_errors = 0
+
+            if proxy is None or proxy != current:
+                return
+
+            self.requests_count += 1
+
+            if self.requests_count >= self.rotation_interval:
+                self.rotate_proxy()
+
+    def report_error(self, proxy: Optional[str] = None) -> str:
+        """Отметить ошибку"""
+        with self._lock:
+            proxy = proxy or self.get_current_proxy()
+            self.consecutive_errors += 1
+
+            if proxy in self.stats:
+                self.stats[proxy].record_failure(self.base_cooldown, self.max_cooldown)
+
+            if proxy == self.get_current_proxy():
+                self.rotate_proxy()  # Моментальная смена!
+
+            if self.proxies:
+                # Пауза только если остывают все прокси
+                if self.healthy_count() == 0:
+                    self._paused = True
+                    return "pause"
+            elif self.consecutive_errors >= 3:
+                self._paused = True
+                return "pause"
+
+            return "rotate"
+
+    def snapshot(self) -> List[Dict]:
+        """Состояние каждого прокси для панели статуса"""
+        now = time.monotonic()
+        with self._lock:
+            current = self.get_current_proxy()
+            return [
+                {
+                    'proxy': proxy,
+                    'current': proxy == current,
+                    'successes': stats.successes,
+                    'failures': stats.failures,
+                    'latency': stats.latency,
+                    'cooldown': max(0.0, stats.cooldown_until - now),
+                }
+                for proxy, stats in ((proxy, self.stats[proxy]) for proxy in self.proxies)
+            ]
+
+    @property
+    def paused(self) -> bool:
+        """На паузе; снимается сама, когда какой-то прокси остыл"""
+        with self._lock:
+            if self._paused and self.proxies and self.healthy_count() > 0:
+                self._paused = False
+                self.consecutive_errors = 0
+                self.current_index = self._best_index()
+            return self._paused
+
+    @paused.setter
+    def paused(self, value: bool):
+        self._paused = value
+
+    def resume(self):
+        """Возобновить работу"""
+        with self._lock:
+            self._paused = False
+            self.consecutive_errors = 0
+            for stats in self.stats.values():
+                stats.cooldown_until = 0.0
+                stats.consecutive_failures = 0
+
+    def get_proxy_dict(self) -> Optional[Dict[str, str]]:
+        """Получить прокси для requests"""
+        return self.to_proxy_dict(self.get_current_proxy())
+
+    @staticmethod
+    def to_proxy_dict(proxy: Optional[str]) -> Optional[Dict[str, str]]:
+        """Строка прокси -> словарь для requests"""
+        if not proxy:
+            return None
+
+        if not proxy.startswith(('http://', 'https://', 'socks5://', 'socks4://')):
+            proxy = f'http://{proxy}'
+
+        return {
+            'http': proxy,
+            'https': proxy
+        }
@@ -0,0 +1,165 @@
+"""
+Учёт квоты YouTube Data API
+
+Считает единицы по каждому ключу и методу API за текущие сутки (квота
+сбрасывается в полночь по тихоокеанскому времени) и хранит их в SQLite
+между запусками. Перед запросом можно проверить, хватит ли остатка.
+"""
+
+import hashlib
+import math
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+
+# Стоимость вызовов в единицах квоты
+QUOTA_COSTS = {
+    'channels': 1,
+    'playlistItems': 1,
+    'videos': 1,
+    'search': 100,
+}
+
+DEFAULT_DAILY_QUOTA = 10000
+
+# Максимум id в одном videos.list / channels.list
+MAX_BATCH = 50
+
+
+class QuotaExceededError(Exception):
+    """Квота ключа исчерпана (по счётчику или по ответу API)"""
+
+    def __init__(self, message: str, reason: str = "quotaExceeded"):
+        super().__init__(message)
+        self.reason = reason
+
+
+def _pacific_tz():
+    try:
+        from zoneinfo import ZoneInfo
+        return ZoneInfo("America/Los_Angeles")
+    except Exception:
+        # Без базы часовых поясов (Windows без tzdata) - стандартное время
+        return timezone(timedelta(hours=-8))
+
+
+PACIFIC = _pacific_tz()
+
+
+def quota_day(now: Optional[datetime] = None) -> str:
+    """Сутки квоты (дата по тихоокеанскому времени)"""
+    now = now or datetime.now(timezone.utc)
+    return now.astimezone(PACIFIC).strftime("%Y-%m-%d")
+
+
+def seconds_until_reset(now: Optional[datetime] = None) -> float:
+    """Сколько секунд до сброса квоты"""
+    now = (now or datetime.now(timezone.utc)).astimezone(PACIFIC)
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (midnight - now).total_seconds()
+
+
+def key_id(api_key: str) -> str:
+    """Короткий отпечаток ключа - сам ключ в базу не пишется"""
+    return hashlib.sha1(api_key.encode('utf-8')).hexdigest()[:12]
+
+
+def estimate_listing_cost(max_results: int, uploads_known: bool = False,
+                          incremental: bool = False) -> int:
+    """Оценка единиц квоты на листинг одного канала"""
+    if incremental:
+        # playlistItems до первого известного видео + videos.list для новых
+        return 2
+
+    pages = max(1, math.ceil(max_results / MAX_BATCH))
+    cost = pages * (QUOTA_COSTS['playlistItems'] + QUOTA_COSTS['videos'])
+
+    if not uploads_known:
+        cost += QUOTA_COSTS['channels']
+
+    return cost
+
+
+class QuotaMeter:
+    """Счётчик единиц квоты по ключам и методам"""
+
+    def __init__(self, path: str = ":memory:", daily_limit: int = DEFAULT_DAILY_QUOTA,
+                 reserve: int = 0):
+        self.path = path
+        self.daily_limit = daily_limit
+        self.reserve = reserve
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS quota_usage (
+                day TEXT NOT NULL,
+                key_id TEXT NOT NULL,
+                endpoint TEXT NOT NULL,
+                units INTEGER NOT NULL DEFAULT 0,
+                calls INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, key_id, endpoint)
+            );
+        """)
+        self._conn.commit()
+
+    def charge(self, api_key: str, endpoint: str, units: Optional[int] = None):
+        """Списать единицы за вызов"""
+        if units is None:
+            units = QUOTA_COSTS.get(endpoint, 1)
+
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO quota_usage (day, key_id, endpoint, units, calls) VALUES (?, ?, ?, ?, 1)
+                ON CONFLICT (day, key_id, endpoint) DO UPDATE SET
+                    units = units + excluded.units,
+                    calls = calls + 1
+                """,
+                (quota_day(), key_id(api_key), endpoint, units)
+            )
+            self._conn.commit()
+
+    def mark_exhausted(self, api_key: str):
+        """API ответил quotaExceeded - считаем ключ израсходованным до сброса"""
+        missing = self.daily_limit - self.used(api_key)
+        if missing > 0:
+            with self._lock:
+                self._conn.execute(
+                    """
+                    INSERT INTO quota_usage (day, key_id, endpoint, units, calls) VALUES (?, ?, '_exhausted', ?, 0)
+                    ON CONFLICT (day, key_id, endpoint) DO UPDATE SET units = units + excluded.units
+                    """,
+                    (quota_day(), key_id(api_key), missing)
+                )
+                self._conn.commit()
+
+    def used(self, api_key: str) -> int:
+        """Израсходовано за текущие сутки"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COALESCE(SUM(units), 0) FROM quota_usage WHERE day = ? AND key_id = ?",
+                (quota_day(), key_id(api_key))
+            ).fetchone()
+        return row[0]
+
+    def remaining(self, api_key: str) -> int:
+        """Доступно до сброса с учётом резерва"""
+        return max(0, self.daily_limit - self.reserve - self.used(api_key))
+
+    def can_afford(self, api_key: str, units: int) -> bool:
+        return self.remaining(api_key) >= units
+
+    def usage_by_endpoint(self, api_key: str) -> Dict[str, Dict[str, int]]:
+        """Единицы и вызовы по методам за текущие сутки"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT endpoint, units, calls FROM quota_usage WHERE day = ? AND key_id = ?",
+                (quota_day(), key_id(api_key))
+            ).fetchall()
+        return {endpoint: {'units': units, 'calls': calls} for endpoint, units, calls in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,200 @@
+"""
+Каналы по @handle, ссылке или ID и кэш плейлистов загрузок
+
+Плейлист загрузок канала не меняется, поэтому он запоминается в SQLite
+один раз и навсегда: повторные запуски не тратят на него channels.list.
+Неизвестные ID разрешаются пачками по 50 за вызов; @handle и старые имена
+(/user/...) API понимает только по одному, и результат тоже кэшируется.
+"""
+
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+from urllib.parse import urlsplit, unquote
+
+from .quota import MAX_BATCH, QuotaExceededError
+
+
+CHANNEL_ID = re.compile(r"^UC[\w-]{22}$")
+
+# Виды ссылок на канал
+ID = "id"
+HANDLE = "handle"
+USERNAME = "username"
+
+
+def parse_channel_ref(text: str) -> Tuple[str, str]:
+    """Разобрать ID, @handle или ссылку на канал: (вид, значение)
+
+    youtube.com/channel/UC..., youtube.com/@name, youtube.com/user/name;
+    имя без @ считается handle. Ссылки youtube.com/c/name не принимаются:
+    у Data API нет поиска по такому имени, а с handle оно часто не совпадает.
+    """
+    text = text.strip()
+
+    if '/' in text or text.startswith(('http:', 'https:', 'www.', 'youtube.com', 'm.youtube.com')):
+        url = urlsplit(text if '://' in text else f"https://{text}")
+        parts = [unquote(part) for part in url.path.split('/') if part]
+        if not parts:
+            raise Exception("не похоже на ссылку на канал")
+
+        head = parts[0]
+        if head == 'channel' and len(parts) > 1:
+            return ID, parts[1]
+        if head == 'user' and len(parts) > 1:
+            return USERNAME, parts[1]
+        if head == 'c' and len(parts) > 1:
+            raise Exception("ссылки /c/ не поддерживаются - укажите @handle или ссылку /channel/UC...")
+        if head.startswith('@'):
+            return HANDLE, head[1:]
+        raise Exception("не похоже на ссылку на канал")
+
+    if CHANNEL_ID.match(text):
+        return ID, text
+    return HANDLE, text.lstrip('@')
+
+
+def alias_key(kind: str, value: str) -> str:
+    """Ключ кэша для handle и имени: регистр не важен"""
+    return f"{kind}:{value.lower()}"
+
+
+class ChannelDirectory:
+    """Кэш каналов: ID -> плейлист загрузок, handle / имя -> ID"""
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS channels (
+                channel_id TEXT PRIMARY KEY,
+                uploads_playlist TEXT NOT NULL,
+                title TEXT,
+                resolved_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS aliases (
+                alias TEXT PRIMARY KEY,
+                channel_id TEXT NOT NULL
+            );
+        """)
+        self._conn.commit()
+
+    def uploads_playlist(self, channel_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT uploads_playlist FROM channels WHERE channel_id = ?", (channel_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def channel_for(self, alias: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT channel_id FROM aliases WHERE alias = ?", (alias,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def save(self, items: List[Dict], alias: Optional[str] = None):
+        """Запомнить ответ channels.list"""
+        now = datetime.now().isoformat()
+        with self._lock:
+            for item in items:
+                self._conn.execute(
+                    """
+                    INSERT OR REPLACE INTO channels (channel_id, uploads_playlist, title, resolved_at)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    (
+                        item['id'],
+                        item['contentDetails']['relatedPlaylists']['uploads'],
+                        item.get('snippet', {}).get('title'),
+                        now
+                    )
+                )
+                if alias:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO aliases (alias, channel_id) VALUES (?, ?)",
+                        (alias, item['id'])
+                    )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ChannelResolver:
+    """Список каналов в любом виде -> ID с известными плейлистами загрузок"""
+
+    def __init__(self, collector, directory: ChannelDirectory):
+        self.collector = collector
+        self.directory = directory
+        self.api_calls = 0
+
+    def resolve(self, refs: List[str],
+                proxies: Optional[Dict] = None) -> Tuple[List[str], Dict[str, str]]:
+        """ID каналов в исходном порядке (без повторов) и ошибки {ссылка: причина}"""
+        channel_ids: List[str] = []
+        failures: Dict[str, str] = {}
+
+        for ref in refs:
+            try:
+                kind, value = parse_channel_ref(ref)
+                if kind == ID:
+                    channel_id = value
+                else:
+                    alias = alias_key(kind, value)
+                    channel_id = self.directory.channel_for(alias) or self.lookup(kind, value, alias, proxies)
+            except QuotaExceededError:
+                raise
+            except Exception as e:
+                failures[ref] = str(e)
+                continue
+
+            if channel_id is None:
+                failures[ref] = "канал не найден"
+            else:
+                channel_ids.append(channel_id)
+
+        return list(dict.fromkeys(channel_ids)), failures
+
+    def lookup(self, kind: str, value: str, alias: str,
+               proxies: Optional[Dict] = None) -> Optional[str]:
+        """Один channels.list по handle или имени"""
+        param = 'forHandle' if kind == HANDLE else 'forUsername'
+        data = self.collector.api_get('channels', {
+            'part': 'snippet,contentDetails',
+            param: value
+        }, proxies)
+        self.api_calls += 1
+
+        items = data.get('items') or []
+        if not items:
+            return None
+
+        self.directory.save(items[:1], alias)
+        return items[0]['id']
+
+    def prefetch(self, channel_ids: List[str], proxies: Optional[Dict] = None) -> List[str]:
+        """Плейлисты загрузок для ID не из кэша - по 50 за вызов; вернуть ненайденные"""
+        unknown = [channel_id for channel_id in channel_ids
+                   if self.directory.uploads_playlist(channel_id) is None]
+        missing = []
+
+        for start in range(0, len(unknown), MAX_BATCH):
+            batch = unknown[start:start + MAX_BATCH]
+            data = self.collector.api_get('channels', {
+                'part': 'snippet,contentDetails',
+                'id': ','.join(batch),
+                'maxResults': MAX_BATCH
+            }, proxies)
+            self.api_calls += 1
+
+            items = data.get('items') or []
+            self.directory.save(items)
+            found = {item['id'] for item in items}
+            missing.extend(channel_id for channel_id in batch if channel_id not in found)
+
+        return missing
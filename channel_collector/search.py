@@ -0,0 +1,91 @@
+"""
+Поиск по локальному индексу транскриптов
+
+    python -m channel_collector.search transcripts_index.sqlite '"interest rates" AND META'
+    python -m channel_collector.search transcripts_index.sqlite --import transcripts.jsonl
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import List, Optional
+
+from .index import TranscriptIndex
+from .matcher import format_timestamp
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Аргументы командной строки"""
+    parser = argparse.ArgumentParser(
+        prog="python -m channel_collector.search",
+        description="Поиск по собранным транскриптам без сети"
+    )
+    parser.add_argument("index", help="Файл индекса (SQLite)")
+    parser.add_argument("query", nargs="?",
+                        help='Запрос FTS5: слова, "фраза", AND / OR / NOT, NEAR(a b, 5), префикс*')
+    parser.add_argument("-n", "--limit", type=int, default=20,
+                        help="Сколько видео показать")
+    parser.add_argument("--channel", help="Только этот канал")
+    parser.add_argument("--since", help="Только видео не старше даты (YYYY-MM-DD)")
+    parser.add_argument("--json", action="store_true",
+                        help="Вывод JSONL вместо текста")
+    parser.add_argument("--import", dest="import_files", action="append", default=[],
+                        help="Добавить в индекс JSONL-вывод сборщика (можно несколько раз)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if not args.query and not args.import_files:
+        print("Нужен запрос или --import", file=sys.stderr)
+        return 2
+
+    index = TranscriptIndex(args.index)
+
+    try:
+        for path in args.import_files:
+            added = index.import_jsonl(path)
+            print(f"{path}: добавлено {added} видео", file=sys.stderr)
+        if args.import_files:
+            index.optimize()
+
+        if not args.query:
+            return 0
+
+        started = time.perf_counter()
+        try:
+            hits = index.search(args.query, limit=args.limit, channel_id=args.channel, since=args.since)
+        except Exception as e:
+            print(str(e), file=sys.stderr)
+            return 2
+        elapsed = (time.perf_counter() - started) * 1000
+
+        for hit in hits:
+            if args.json:
+                print(json.dumps({
+                    'video_id': hit.video_id,
+                    'channel_id': hit.channel_id,
+                    'title': hit.title,
+                    'published_at': hit.published_at,
+                    'start': hit.start,
+                    'snippet': hit.snippet,
+                    'url': hit.url,
+                }, ensure_ascii=False))
+                continue
+
+            stamp = format_timestamp(hit.start) if hit.start is not None else "--:--"
+            print(f"{hit.title} | {hit.channel_id} | {(hit.published_at or '')[:10]}")
+            print(f"  [{stamp}] {hit.snippet}")
+            print(f"  {hit.url}")
+
+        print(f"Найдено: {len(hits)} из {index.count()} видео за {elapsed:.1f} мс", file=sys.stderr)
+        return 0 if hits else 1
+
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
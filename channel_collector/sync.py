@@ -0,0 +1,111 @@
+"""
+Состояние инкрементальной синхронизации каналов
+
+Для каждого канала помнит плейлист загрузок, самое свежее publishedAt и
+последний список видео. Ежедневное обновление листает плейлист только до
+первого известного видео. Если листинг остановился на дате (--after),
+дата запоминается: список полон только начиная с неё.
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import List, Dict, Optional
+
+
+class ChannelSyncStore:
+    """High-water marks каналов в SQLite"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS channel_sync (
+                channel_id TEXT PRIMARY KEY,
+                uploads_playlist TEXT NOT NULL,
+                newest_published_at TEXT,
+                newest_video_id TEXT,
+                max_results INTEGER NOT NULL,
+                min_duration INTEGER NOT NULL,
+                videos TEXT NOT NULL,
+                synced_at TEXT NOT NULL,
+                listed_after TEXT
+            );
+        """)
+        # Файлы от прежних версий - без listed_after
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(channel_sync)")}
+        if 'listed_after' not in columns:
+            self._conn.execute("ALTER TABLE channel_sync ADD COLUMN listed_after TEXT")
+        self._conn.commit()
+
+    def get(self, channel_id: str) -> Optional[Dict]:
+        """Сохранённое состояние канала"""
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT uploads_playlist, newest_published_at, newest_video_id,
+                       max_results, min_duration, videos, synced_at, listed_after
+                FROM channel_sync WHERE channel_id = ?
+                """,
+                (channel_id,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return {
+            'uploads_playlist': row[0],
+            'newest_published_at': row[1],
+            'newest_video_id': row[2],
+            'max_results': row[3],
+            'min_duration': row[4],
+            'videos': json.loads(row[5]),
+            'synced_at': row[6],
+            'listed_after': row[7],
+        }
+
+    def save(self, channel_id: str, uploads_playlist: str, videos: List[Dict],
+             max_results: int, min_duration: int, cursor: Optional[Dict] = None,
+             listed_after: Optional[str] = None):
+        """Запомнить список видео и самую свежую отметку
+
+        listed_after - дата, на которой остановился листинг: более старых видео в списке нет.
+        """
+        newest = max(videos, key=lambda v: v['published_at'], default=None)
+        newest_published_at = newest['published_at'] if newest else None
+        newest_video_id = newest['video_id'] if newest else None
+
+        # Отметка из плейлиста учитывает и отсеянные по длительности видео
+        if cursor and cursor.get('newest_published_at') and (
+                not newest_published_at or cursor['newest_published_at'] > newest_published_at):
+            newest_published_at = cursor['newest_published_at']
+            newest_video_id = cursor['newest_video_id']
+
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO channel_sync (
+                    channel_id, uploads_playlist, newest_published_at, newest_video_id,
+                    max_results, min_duration, videos, synced_at, listed_after
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    channel_id,
+                    uploads_playlist,
+                    newest_published_at,
+                    newest_video_id,
+                    max_results,
+                    min_duration,
+                    json.dumps(videos, ensure_ascii=False),
+                    datetime.now().isoformat(),
+                    listed_after,
+                )
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
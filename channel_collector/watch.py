@@ -0,0 +1,693 @@
+"""
+Наблюдение за каналами: новые видео с ключевыми словами вскоре после публикации
+
+    python -m channel_collector.watch channels.txt --api-key-file keys.txt -k META --webhook https://hooks.example/meta
+    python -m channel_collector.watch @handle UC... --api-key-file keys.txt -k META -o matches.jsonl
+
+Каждый канал опрашивается со своим интервалом (строка файла каналов:
+`UC... 15m`). Листается только то, что новее последнего увиденного видео -
+обычно один запрос playlistItems на опрос. Автоматические субтитры появляются
+через минуты или часы после публикации, поэтому видео без транскрипта
+остаётся в очереди и запрашивается снова с растущей паузой. Совпадения
+уходят в webhook (POST JSON) и/или дописываются в JSONL; если отправка не
+удалась, совпадение ждёт в состоянии и отправляется повторно. Состояние
+(SQLite) переживает перезапуск.
+"""
+
+import argparse
+import json
+import os
+import random
+import signal
+import sqlite3
+import sys
+import threading
+import time
+from typing import List, Dict, Optional, Callable, Set, Tuple
+
+import requests
+
+from .checkpoint import CheckpointStore
+from .cli import add_api_arguments, add_keyword_arguments, add_language_arguments, add_proxy_arguments
+from .collector import YouTubeChannelCollector
+from .engine import CollectorConfig, CollectorEvent
+from .fetcher import ConcurrentFetcher, FetchResult
+from .keys import ApiKeyPool
+from .languages import configure_languages
+from .matcher import KeywordMatcher, read_keywords
+from .pacing import PacingController
+from .prefilter import VideoFilter
+from .progress import format_duration
+from .proxy import ProxyManager
+from .quota import QuotaExceededError, QuotaMeter, seconds_until_reset
+from .resolver import ChannelDirectory, ChannelResolver
+from .writer import open_writer
+
+
+# Статусы видео в состоянии наблюдения
+PENDING = "pending"    # ждёт транскрипт
+MATCHED = "matched"    # совпадение ждёт отправки
+DONE = CheckpointStore.DONE
+FILTERED = CheckpointStore.FILTERED
+SKIPPED = CheckpointStore.SKIPPED
+NO_TRANSCRIPT = CheckpointStore.NO_TRANSCRIPT
+FAILED = CheckpointStore.FAILED
+
+# Видео недоступно: ждать субтитры бесполезно. TranscriptsDisabled сюда не входит -
+# у свежего видео нет captionTracks, пока не готовы автосубтитры
+FINAL_MISSING = {'VideoUnavailable'}
+
+INTERVAL_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Первый повтор отправки в webhook (сек), дальше вдвое дольше
+DELIVERY_RETRY = 30
+# Дольше не спать: список каналов и очередь проверяются хотя бы так часто
+MAX_IDLE = 30
+
+
+def parse_interval(text: str) -> float:
+    """300, 30s, 15m, 2h, 1d -> секунды"""
+    value = text.strip().lower()
+    try:
+        if value and value[-1] in INTERVAL_UNITS:
+            seconds = float(value[:-1]) * INTERVAL_UNITS[value[-1]]
+        else:
+            seconds = float(value)
+    except ValueError:
+        seconds = 0
+    if seconds <= 0:
+        raise Exception(f"Неверный интервал '{text}', примеры: 300, 15m, 2h")
+    return seconds
+
+
+def read_watchlist(refs: List[str], default_interval: float) -> List[Tuple[str, float]]:
+    """(канал, интервал): аргумент - канал или файл со строками 'канал [интервал]'"""
+    watchlist = []
+    for ref in refs:
+        if not os.path.isfile(ref):
+            watchlist.extend((channel, default_interval) for channel in CollectorConfig.parse_channels(ref))
+            continue
+
+        with open(ref, 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.split()
+                if not parts or parts[0].startswith('#'):
+                    continue
+                interval = parse_interval(parts[1]) if len(parts) > 1 else default_interval
+                watchlist.append((parts[0], interval))
+    return watchlist
+
+
+class WatchStore:
+    """Отметки каналов и очередь видео наблюдения в SQLite"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS watch_channels (
+                channel_id TEXT PRIMARY KEY,
+                newest_published_at TEXT,
+                newest_video_id TEXT,
+                polled_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS watch_videos (
+                video_id TEXT PRIMARY KEY,
+                channel_id TEXT NOT NULL,
+                video TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt REAL NOT NULL,
+                first_seen REAL NOT NULL,
+                item TEXT,
+                sent TEXT NOT NULL DEFAULT '',
+                error TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS watch_due ON watch_videos (status, next_attempt);
+        """)
+        self._conn.commit()
+
+    def cursor(self, channel_id: str) -> Optional[Dict]:
+        """Самое свежее видео канала и время последнего опроса (None - канал новый)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT newest_published_at, newest_video_id, polled_at FROM watch_channels WHERE channel_id = ?",
+                (channel_id,)
+            ).fetchone()
+
+        if row is None:
+            return None
+        return {'newest_published_at': row[0], 'newest_video_id': row[1], 'polled_at': row[2]}
+
+    def save_cursor(self, channel_id: str, cursor: Dict, polled_at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO watch_channels VALUES (?, ?, ?, ?)",
+                (channel_id, cursor.get('newest_published_at'), cursor.get('newest_video_id'), polled_at)
+            )
+            self._conn.commit()
+
+    def add(self, channel_id: str, videos: List[Dict], status: str = PENDING,
+            now: Optional[float] = None) -> int:
+        """Новые видео; уже известные пропускаются"""
+        now = time.time() if now is None else now
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                """
+                INSERT OR IGNORE INTO watch_videos
+                    (video_id, channel_id, video, status, next_attempt, first_seen, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (video['video_id'], channel_id, json.dumps(video, ensure_ascii=False), status, now, now, now)
+                    for video in videos
+                ]
+            )
+            self._conn.commit()
+            return self._conn.total_changes - before
+
+    def due(self, now: float, limit: int) -> List[Dict]:
+        """Видео, которым пора запросить транскрипт"""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT channel_id, video, attempts, first_seen FROM watch_videos
+                WHERE status = ? AND next_attempt <= ? ORDER BY next_attempt LIMIT ?
+                """,
+                (PENDING, now, limit)
+            ).fetchall()
+
+        return [
+            dict(json.loads(video), channel_id=channel_id, attempts=attempts, first_seen=first_seen)
+            for channel_id, video, attempts, first_seen in rows
+        ]
+
+    def undelivered(self, now: float, limit: int = 50) -> List[Tuple[str, Dict, Set[str], int]]:
+        """Совпадения, которым пора повторить отправку: (video_id, запись, куда уже ушло, попыток)"""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT video_id, item, sent, attempts FROM watch_videos
+                WHERE status = ? AND next_attempt <= ? ORDER BY next_attempt LIMIT ?
+                """,
+                (MATCHED, now, limit)
+            ).fetchall()
+
+        return [
+            (video_id, json.loads(item), set(filter(None, sent.split(','))), attempts)
+            for video_id, item, sent, attempts in rows
+        ]
+
+    def postpone(self, video_id: str, attempts: int, next_attempt: float,
+                 error: Optional[str] = None, sent: Optional[Set[str]] = None):
+        """Повторить позже"""
+        with self._lock:
+            self._conn.execute(
+                """
+                UPDATE watch_videos SET attempts = ?, next_attempt = ?, error = ?,
+                    sent = COALESCE(?, sent), updated_at = ?
+                WHERE video_id = ?
+                """,
+                (attempts, next_attempt, error, ','.join(sorted(sent)) if sent is not None else None,
+                 time.time(), video_id)
+            )
+            self._conn.commit()
+
+    def match(self, video_id: str, item: Dict):
+        """Транскрипт с совпадением: ждёт отправки"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                UPDATE watch_videos SET status = ?, item = ?, attempts = 0, next_attempt = ?,
+                    error = NULL, updated_at = ?
+                WHERE video_id = ?
+                """,
+                (MATCHED, json.dumps(item, ensure_ascii=False), now, now, video_id)
+            )
+            self._conn.commit()
+
+    def finish(self, video_id: str, status: str, error: Optional[str] = None,
+               sent: Optional[Set[str]] = None):
+        """Итоговый статус: видео больше не запрашивается"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE watch_videos SET status = ?, error = ?, sent = COALESCE(?, sent), updated_at = ? "
+                "WHERE video_id = ?",
+                (status, error, ','.join(sorted(sent)) if sent is not None else None, time.time(), video_id)
+            )
+            self._conn.commit()
+
+    def next_attempt(self) -> Optional[float]:
+        """Ближайший повтор транскрипта или отправки"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(next_attempt) FROM watch_videos WHERE status IN (?, ?)",
+                (PENDING, MATCHED)
+            ).fetchone()
+        return row[0]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM watch_videos GROUP BY status").fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class FileSink:
+    """Совпадения - строками JSONL, сразу на диск"""
+
+    name = "file"
+
+    def __init__(self, path: str):
+        self.writer = open_writer(path, "jsonl", append=True, fsync_every=1)
+
+    def send(self, item: Dict):
+        self.writer.write(item)
+
+    def close(self):
+        self.writer.close()
+
+
+class WebhookSink:
+    """Совпадения - POST JSON на адрес webhook"""
+
+    name = "webhook"
+
+    def __init__(self, url: str, timeout: float = 10):
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def send(self, item: Dict):
+        response = self.session.post(self.url, json=item, timeout=self.timeout)
+        response.raise_for_status()
+
+    def close(self):
+        self.session.close()
+
+
+class ChannelWatcher:
+    """Цикл наблюдения: опрос каналов по расписанию, транскрипты с повторами, отправка совпадений"""
+
+    def __init__(self, collector: YouTubeChannelCollector, store: WatchStore,
+                 channels: List[Tuple[str, float]], sinks: List,
+                 proxy_manager: ProxyManager,
+                 matcher: Optional[KeywordMatcher] = None,
+                 video_filter: Optional[VideoFilter] = None,
+                 min_duration: int = 0, backfill: int = 0, max_new: int = 50,
+                 retry_after: float = 600, max_retry_delay: float = 6 * 3600,
+                 give_up_after: float = 48 * 3600,
+                 batch: int = 20, max_concurrency: int = 4,
+                 delay_min: float = 3, max_backoff: float = 120,
+                 on_event: Optional[Callable[[CollectorEvent], None]] = None,
+                 stop_event: Optional[threading.Event] = None):
+        self.collector = collector
+        # Причина отсутствия субтитров отличает "ещё не готовы" от "не будет"
+        collector.missing_reasons = {}
+        self.store = store
+        # Канал -> интервал опроса (сек)
+        self.intervals: Dict[str, float] = dict(channels)
+        self.sinks = sinks
+        self.proxy_manager = proxy_manager
+        self.matcher = matcher
+        self.video_filter = video_filter
+        self.min_duration = min_duration
+        # Сколько последних видео обработать при первом опросе канала
+        self.backfill = backfill
+        self.max_new = max_new
+        self.retry_after = retry_after
+        self.max_retry_delay = max_retry_delay
+        # Столько ждать субтитры с момента, как видео замечено
+        self.give_up_after = give_up_after
+        self.batch = max(1, batch)
+        self.on_event = on_event
+        self.stop_event = stop_event or threading.Event()
+        self.pacing = PacingController(delay_min, max_backoff)
+        self.fetcher = ConcurrentFetcher(
+            collector,
+            proxy_manager.proxies,
+            delay_min,
+            delay_min,
+            max_concurrency=max_concurrency,
+            stop_event=self.stop_event,
+            proxy_manager=proxy_manager,
+            pacing=self.pacing
+        )
+        # Канал -> время следующего опроса; после перезапуска расписание продолжается
+        self.next_poll: Dict[str, float] = {}
+        for channel_id, interval in self.intervals.items():
+            state = store.cursor(channel_id)
+            self.next_poll[channel_id] = state['polled_at'] + interval if state else 0.0
+        # До сброса квоты каналы не опрашиваются; транскриптам квота не нужна
+        self.quota_until = 0.0
+        self.counts = {'polls': 0, 'new': 0, DONE: 0, FILTERED: 0, NO_TRANSCRIPT: 0, FAILED: 0}
+
+    def log(self, message: str, level: str = "INFO"):
+        if self.on_event:
+            self.on_event(CollectorEvent("log", message, level))
+
+    def run(self) -> Dict[str, int]:
+        """Работать до остановки"""
+        self.log(
+            f"Наблюдение за каналами: {len(self.intervals)}, полос: {len(self.fetcher.lanes)}, "
+            f"отправка: {', '.join(sink.name for sink in self.sinks)}",
+            "INFO"
+        )
+
+        while not self.stop_event.is_set():
+            self.poll_due()
+            self.fetch_due()
+            self.deliver_due()
+            self.stop_event.wait(self.idle_seconds())
+
+        self.log(
+            f"Наблюдение остановлено: опросов {self.counts['polls']}, новых видео {self.counts['new']}, "
+            f"отправлено совпадений {self.counts[DONE]}, без совпадений {self.counts[FILTERED]}",
+            "SUCCESS"
+        )
+        return self.counts
+
+    def idle_seconds(self) -> float:
+        """Сколько спать до ближайшего опроса или повтора"""
+        now = time.time()
+        wake = max(min(self.next_poll.values(), default=now + MAX_IDLE), self.quota_until)
+        retry = self.store.next_attempt()
+        if retry is not None:
+            wake = min(wake, retry)
+        return min(max(wake - now, 0), MAX_IDLE)
+
+    def poll_due(self):
+        """Опросить каналы, у которых подошло время"""
+        now = time.time()
+        if now < self.quota_until:
+            return
+
+        for channel_id, interval in self.intervals.items():
+            if self.stop_event.is_set() or self.next_poll[channel_id] > now:
+                continue
+
+            # Разброс, чтобы каналы с одним интервалом не опрашивались пачкой
+            self.next_poll[channel_id] = now + interval * random.uniform(0.9, 1.1)
+            try:
+                self.poll(channel_id)
+            except QuotaExceededError as e:
+                wait = seconds_until_reset() + 60
+                self.quota_until = time.time() + wait
+                self.log(f"⛔ Квота API: {e}; опрос каналов продолжится через {format_duration(wait)}", "ERROR")
+                return
+            except Exception as e:
+                self.log(f"❌ Ошибка канала {channel_id}: {e}", "ERROR")
+                if self.proxy_manager.report_error() == "rotate":
+                    self.log("Смена прокси...", "PROXY")
+
+    def poll(self, channel_id: str):
+        """Новые видео канала - в очередь транскриптов"""
+        state = self.store.cursor(channel_id)
+        cursor = dict(state) if state else {}
+        proxies = self.proxy_manager.get_proxy_dict()
+
+        if state is None:
+            # Первый опрос: запомнить самое свежее видео, архив канала - только с backfill
+            videos = self.collector.get_channel_videos(
+                channel_id,
+                max_results=max(1, self.backfill),
+                min_duration=self.min_duration,
+                proxies=proxies,
+                cursor=cursor
+            )[:self.backfill]
+        else:
+            videos = self.collector.get_channel_videos(
+                channel_id,
+                max_results=self.max_new,
+                min_duration=self.min_duration,
+                proxies=proxies,
+                since=state['newest_published_at'],
+                cursor=cursor
+            )
+
+        now = time.time()
+        self.counts['polls'] += 1
+
+        if self.video_filter and self.video_filter.active and videos:
+            videos, skipped = self.video_filter.split(videos)
+            self.store.add(channel_id, [video for video, _ in skipped], SKIPPED, now)
+
+        added = self.store.add(channel_id, videos, PENDING, now)
+        self.store.save_cursor(channel_id, cursor, now)
+        self.counts['new'] += added
+
+        if state is None:
+            newest = cursor.get('newest_published_at') or "видео нет"
+            self.log(f"Канал {channel_id}: отметка {newest}, в очередь {added}", "INFO")
+        elif added:
+            self.log(f"🆕 {channel_id}: новых видео {added}", "SUCCESS")
+
+    def fetch_due(self):
+        """Транскрипты видео, которым пора"""
+        due = self.store.due(time.time(), self.batch)
+        if not due:
+            return
+
+        for fetched in self.fetcher.fetch(due):
+            self.handle(fetched)
+
+    def handle(self, fetched: FetchResult):
+        """Транскрипт есть - проверить слова; нет - повторить позже или перестать ждать"""
+        video = fetched.video
+        video_id = video['video_id']
+
+        reason = self.collector.missing_reasons.pop(video_id, None)
+        if fetched.transcript:
+            self.accept(video, fetched.transcript)
+            return
+
+        # Остальное (NoTranscriptFound, TranscriptsDisabled) повторяем: автосубтитры ещё готовятся
+        if fetched.error is None and reason in FINAL_MISSING:
+            self.store.finish(video_id, NO_TRANSCRIPT, reason)
+            self.counts[NO_TRANSCRIPT] += 1
+            self.log(f"⚠️ {video['title']}: {reason}, субтитров не будет", "WARNING")
+            return
+
+        error = None
+        if fetched.error is not None:
+            error = f"{type(fetched.error).__name__}: {fetched.error}"[:500]
+
+        if time.time() - video['first_seen'] >= self.give_up_after:
+            status = FAILED if error else NO_TRANSCRIPT
+            self.store.finish(video_id, status, error)
+            self.counts[status] += 1
+            self.log(f"⚠️ {video['title']}: транскрипта нет за {format_duration(self.give_up_after)}, "
+                     f"больше не ждём", "WARNING")
+            return
+
+        attempts = video['attempts'] + 1
+        delay = min(self.retry_after * 2 ** (attempts - 1), self.max_retry_delay)
+        self.store.postpone(video_id, attempts, time.time() + delay, error)
+
+        if error:
+            self.log(f"❌ {video['title']} ({fetched.lane.name}): {fetched.error}; "
+                     f"повтор через {format_duration(delay)}", "ERROR")
+        else:
+            self.log(f"⏳ {video['title']}: субтитров пока нет, повтор через {format_duration(delay)}", "INFO")
+
+    def accept(self, video: Dict, transcript: List[Dict]):
+        """Найти слова и отправить совпадение"""
+        video_id = video['video_id']
+        report = None
+        if self.matcher:
+            report = self.matcher.match_segments(transcript)
+            if not report.matched:
+                self.store.finish(video_id, FILTERED)
+                self.counts[FILTERED] += 1
+                return
+
+        item = {
+            'channel_id': video['channel_id'],
+            'video_id': video_id,
+            'title': video['title'],
+            'published_at': video.get('published_at'),
+            'url': f"https://www.youtube.com/watch?v={video_id}",
+            'transcript': self.collector.format_transcript(transcript)
+        }
+        if report:
+            item['matches'] = report.counts
+            item['hits'] = [hit.to_dict() for hit in report.hits]
+
+        self.store.match(video_id, item)
+        self.log(f"✅ {video['title']}: {report.summary() if report else 'транскрипт получен'}", "SUCCESS")
+        self.deliver(video_id, item, set(), 0)
+
+    def deliver_due(self):
+        """Повторить неудавшиеся отправки"""
+        for video_id, item, sent, attempts in self.store.undelivered(time.time()):
+            if self.stop_event.is_set():
+                break
+            self.deliver(video_id, item, sent, attempts)
+
+    def deliver(self, video_id: str, item: Dict, sent: Set[str], attempts: int):
+        """Отправить во все приёмники, куда ещё не ушло"""
+        errors = []
+        for sink in self.sinks:
+            if sink.name in sent:
+                continue
+            try:
+                sink.send(item)
+                sent.add(sink.name)
+            except Exception as e:
+                errors.append(f"{sink.name}: {e}")
+
+        if not errors:
+            self.store.finish(video_id, DONE, sent=sent)
+            self.counts[DONE] += 1
+            return
+
+        # Совпадение не теряется: отправка повторяется, пока приёмник не ответит
+        delay = min(DELIVERY_RETRY * 2 ** attempts, self.max_retry_delay)
+        self.store.postpone(video_id, attempts + 1, time.time() + delay, "; ".join(errors)[:500], sent)
+        self.log(f"❌ Не отправлено ({'; '.join(errors)}), повтор через {format_duration(delay)}", "ERROR")
+
+
+def print_event(event: CollectorEvent):
+    print(event.format(), file=sys.stderr, flush=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m channel_collector.watch",
+        description="Наблюдение за каналами: новые видео с ключевыми словами - в webhook или файл"
+    )
+    parser.add_argument("channels", nargs="+",
+                        help="Каналы (ID, @handle, ссылка) или файл со строками 'канал [интервал]'")
+    add_api_arguments(parser)
+    parser.add_argument("--interval", default="30m",
+                        help="Интервал опроса канала, если в файле не указан (300, 15m, 2h)")
+    add_keyword_arguments(parser)
+    parser.add_argument("--webhook", help="Куда отправлять совпадения (POST JSON)")
+    parser.add_argument("-o", "--output", help="Дописывать совпадения в файл JSONL")
+    parser.add_argument("--state", default="watch_state.sqlite",
+                        help="Файл состояния: отметки каналов и очередь видео")
+    parser.add_argument("--min-duration", type=int, default=0,
+                        help="Минимальная длительность (минут)")
+    parser.add_argument("--backfill", type=int, default=0,
+                        help="Сколько последних видео обработать при первом опросе канала")
+    parser.add_argument("--max-new", type=int, default=50,
+                        help="Больше новых видео за один опрос не брать")
+    parser.add_argument("--retry-after", default="10m",
+                        help="Первый повтор, если субтитров ещё нет; дальше вдвое дольше")
+    parser.add_argument("--max-retry-delay", default="6h",
+                        help="Предел паузы между повторами")
+    parser.add_argument("--give-up-after", default="48h",
+                        help="Сколько ждать субтитры с момента, как видео замечено")
+    add_language_arguments(parser)
+    add_proxy_arguments(parser)
+    parser.add_argument("--batch", type=int, default=20,
+                        help="Сколько транскриптов запрашивать за один проход")
+    args = parser.parse_args(argv)
+
+    if not args.webhook and not args.output:
+        parser.error("нужен --webhook или --output")
+
+    proxy_manager = ProxyManager()
+    try:
+        api_keys = CollectorConfig.read_api_keys(args.api_key_file)
+        watchlist = read_watchlist(args.channels, parse_interval(args.interval))
+        retry_after = parse_interval(args.retry_after)
+        max_retry_delay = parse_interval(args.max_retry_delay)
+        give_up_after = parse_interval(args.give_up_after)
+        keywords = CollectorConfig.parse_channels(','.join(args.keywords))
+        if args.keyword_file:
+            keywords += read_keywords(args.keyword_file)
+        if args.proxy_file:
+            proxy_manager.load_proxies(args.proxy_file)
+        if args.check_proxies and proxy_manager.proxies:
+            alive, dead = proxy_manager.check_proxies()
+            if not alive:
+                raise Exception("Ни один прокси не прошёл проверку")
+    except Exception as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    quota = QuotaMeter(args.quota_file, daily_limit=args.daily_quota)
+    collector = YouTubeChannelCollector(api_keys[0], quota=quota, key_pool=ApiKeyPool(api_keys))
+    directory = ChannelDirectory(args.channel_cache)
+    collector.directory = directory
+    configure_languages(
+        collector,
+        args.transcript_languages,
+        negotiate=args.negotiate_language,
+        manual_first=not args.prefer_generated,
+        translate_to=args.translate_to
+    )
+    store = WatchStore(args.state)
+    sinks = []
+
+    try:
+        # @handle и ссылки -> ID один раз при старте; дальше из кэша каналов
+        resolver = ChannelResolver(collector, directory)
+        channels = []
+        for ref, interval in watchlist:
+            channel_ids, failures = resolver.resolve([ref], proxy_manager.get_proxy_dict())
+            for reason in failures.values():
+                print(f"Канал {ref}: {reason}, пропущен", file=sys.stderr)
+            channels.extend((channel_id, interval) for channel_id in channel_ids)
+
+        if not channels:
+            print("Нет каналов для наблюдения", file=sys.stderr)
+            return 2
+
+        if args.output:
+            sinks.append(FileSink(args.output))
+        if args.webhook:
+            sinks.append(WebhookSink(args.webhook))
+
+        matcher = KeywordMatcher(keywords, whole_words=args.whole_words) if keywords else None
+        watcher = ChannelWatcher(
+            collector,
+            store,
+            channels,
+            sinks,
+            proxy_manager,
+            matcher=matcher,
+            video_filter=VideoFilter(matcher if args.prefilter_keywords else None),
+            min_duration=args.min_duration,
+            backfill=args.backfill,
+            max_new=args.max_new,
+            retry_after=retry_after,
+            max_retry_delay=max_retry_delay,
+            give_up_after=give_up_after,
+            batch=args.batch,
+            max_concurrency=args.max_concurrency,
+            delay_min=args.delay_min,
+            max_backoff=args.max_backoff,
+            on_event=print_event
+        )
+
+        # Ctrl+C или остановка службы: очередь и отметки уже в файле состояния
+        signal.signal(signal.SIGINT, lambda *_: watcher.stop_event.set())
+        signal.signal(signal.SIGTERM, lambda *_: watcher.stop_event.set())
+
+        watcher.run()
+    except QuotaExceededError as e:
+        print(f"Квота API при поиске каналов: {e}", file=sys.stderr)
+        return 2
+    finally:
+        for sink in sinks:
+            sink.close()
+        store.close()
+        directory.close()
+        quota.close()
+        collector.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,228 @@
+"""
+Рабочий общей очереди: берёт видео у координатора и качает транскрипты
+
+    python -m channel_collector.worker http://coordinator:8765 --proxies proxies.txt
+    python -m channel_collector.worker jobs_queue.sqlite
+
+У каждого рабочего свои прокси и свой темп; Data API ему не нужен.
+Работает, пока координатор не закончит листинг и очередь не опустеет.
+"""
+
+import argparse
+import os
+import queue
+import signal
+import socket
+import sys
+import threading
+import time
+from typing import List, Dict, Optional, Callable, Set
+
+from .cli import add_language_arguments, add_proxy_arguments
+from .collector import YouTubeChannelCollector
+from .engine import CollectorEvent
+from .fetcher import ConcurrentFetcher
+from .languages import configure_languages
+from .pacing import PacingController
+from .proxy import ProxyManager
+from .workqueue import DONE, NO_TRANSCRIPT, open_queue
+
+
+class QueueWorker:
+    """Цикл рабочего: аренда заданий, загрузка, подтверждение"""
+
+    def __init__(self, work_queue, collector: YouTubeChannelCollector,
+                 proxy_manager: ProxyManager, worker_id: str,
+                 batch: int = 20, max_concurrency: int = 4,
+                 delay_min: float = 3, max_backoff: float = 120,
+                 poll_interval: float = 2, max_errors: int = 10,
+                 on_event: Optional[Callable[[CollectorEvent], None]] = None,
+                 stop_event: Optional[threading.Event] = None):
+        self.queue = work_queue
+        self.collector = collector
+        self.proxy_manager = proxy_manager
+        self.worker_id = worker_id
+        self.batch = max(1, batch)
+        self.poll_interval = poll_interval
+        # Координатор недоступен столько раз подряд - закончить работу
+        self.max_errors = max_errors
+        self.on_event = on_event
+        self.stop_event = stop_event or threading.Event()
+        self.pacing = PacingController(delay_min, max_backoff)
+        self.fetcher = ConcurrentFetcher(
+            collector,
+            proxy_manager.proxies,
+            delay_min,
+            delay_min,
+            max_concurrency=max_concurrency,
+            stop_event=self.stop_event,
+            proxy_manager=proxy_manager,
+            pacing=self.pacing
+        )
+        # video_id в аренде у этого рабочего
+        self.held: Set[str] = set()
+        self._held_lock = threading.Lock()
+        self.counts = {DONE: 0, NO_TRANSCRIPT: 0, 'released': 0, 'lost': 0}
+
+    def log(self, message: str, level: str = "INFO"):
+        if self.on_event:
+            self.on_event(CollectorEvent("log", message, level))
+
+    def run(self) -> Dict[str, int]:
+        """Работать до конца очереди или до остановки"""
+        jobs: "queue.Queue[Optional[Dict]]" = queue.Queue()
+        threading.Thread(target=self.feed, args=(jobs,), daemon=True).start()
+        threading.Thread(target=self.heartbeat, daemon=True).start()
+
+        self.log(f"Рабочий {self.worker_id}: {len(self.fetcher.lanes)} полос", "INFO")
+
+        for fetched in self.fetcher.fetch_stream(jobs):
+            video = fetched.video
+            video_id = video['video_id']
+
+            try:
+                if fetched.error is not None:
+                    # Другой рабочий (другой IP) попробует ещё раз
+                    self.queue.release(self.worker_id, video_id, f"{type(fetched.error).__name__}: {fetched.error}"[:500])
+                    self.counts['released'] += 1
+                    self.log(f"❌ {video['title']} ({fetched.lane.name}): {fetched.error}", "ERROR")
+                else:
+                    status = DONE if fetched.transcript else NO_TRANSCRIPT
+                    if self.queue.ack(self.worker_id, video_id, status, fetched.transcript):
+                        self.counts[status] += 1
+                        self.log(f"{'✅' if fetched.transcript else '⚠️'} {video['title']} ({fetched.lane.name})",
+                                 "SUCCESS" if fetched.transcript else "WARNING")
+                    else:
+                        # Аренда истекла, и видео уже у другого рабочего
+                        self.counts['lost'] += 1
+            except Exception as e:
+                self.log(f"Очередь недоступна: {e}", "ERROR")
+            finally:
+                with self._held_lock:
+                    self.held.discard(video_id)
+
+        self.log(
+            f"Рабочий {self.worker_id} закончил: транскриптов {self.counts[DONE]}, "
+            f"без субтитров {self.counts[NO_TRANSCRIPT]}, возвращено {self.counts['released']}",
+            "SUCCESS"
+        )
+        return self.counts
+
+    def feed(self, jobs: "queue.Queue[Optional[Dict]]"):
+        """Брать задания, пока локальная очередь почти пуста"""
+        errors = 0
+        try:
+            while not self.stop_event.is_set():
+                if jobs.qsize() >= self.batch:
+                    self.stop_event.wait(0.2)
+                    continue
+
+                try:
+                    leased = self.queue.lease(self.worker_id, self.batch)
+                    errors = 0
+                except Exception as e:
+                    errors += 1
+                    self.log(f"Очередь недоступна ({errors}/{self.max_errors}): {e}", "ERROR")
+                    if errors >= self.max_errors:
+                        break
+                    self.stop_event.wait(self.poll_interval * 5)
+                    continue
+
+                if not leased:
+                    with self._held_lock:
+                        idle = not self.held
+                    if self.queue.finished and idle:
+                        break
+                    self.stop_event.wait(self.poll_interval)
+                    continue
+
+                with self._held_lock:
+                    self.held.update(job.video['video_id'] for job in leased)
+                for job in leased:
+                    jobs.put(dict(job.video, channel_id=job.channel_id))
+        finally:
+            jobs.put(None)
+
+    def heartbeat(self):
+        """Продлевать аренду того, что ещё качается"""
+        renewed = time.monotonic()
+        # Срок аренды RemoteQueue узнаёт из первого ответа lease, поэтому он читается каждый раз
+        while not self.stop_event.wait(0.5):
+            if time.monotonic() - renewed < self.queue.lease_seconds / 3:
+                continue
+            renewed = time.monotonic()
+            with self._held_lock:
+                held = list(self.held)
+            if not held:
+                continue
+            try:
+                self.queue.renew(self.worker_id, held)
+            except Exception as e:
+                self.log(f"Не удалось продлить аренду: {e}", "WARNING")
+
+
+def print_event(event: CollectorEvent):
+    print(event.format(), file=sys.stderr, flush=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m channel_collector.worker",
+        description="Рабочий общей очереди: транскрипты через свои прокси"
+    )
+    parser.add_argument("queue", help="Адрес координатора (http://host:port) или файл очереди")
+    parser.add_argument("--token", help="Токен очереди координатора")
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}",
+                        help="Имя рабочего в очереди")
+    add_language_arguments(parser)
+    add_proxy_arguments(parser)
+    parser.add_argument("--batch", type=int, default=20, help="Сколько видео брать за раз")
+    args = parser.parse_args(argv)
+
+    proxy_manager = ProxyManager()
+    try:
+        if args.proxy_file:
+            proxy_manager.load_proxies(args.proxy_file)
+        if args.check_proxies and proxy_manager.proxies:
+            alive, dead = proxy_manager.check_proxies()
+            if not alive:
+                raise Exception("Ни один прокси не прошёл проверку")
+        work_queue = open_queue(args.queue, args.token)
+    except Exception as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    collector = YouTubeChannelCollector(api_key="")
+    configure_languages(
+        collector,
+        args.transcript_languages,
+        negotiate=args.negotiate_language,
+        manual_first=not args.prefer_generated,
+        translate_to=args.translate_to
+    )
+    worker = QueueWorker(
+        work_queue,
+        collector,
+        proxy_manager,
+        args.worker_id,
+        batch=args.batch,
+        max_concurrency=args.max_concurrency,
+        delay_min=args.delay_min,
+        max_backoff=args.max_backoff,
+        on_event=print_event
+    )
+
+    # Ctrl+C - взятые задания вернутся в очередь по истечении аренды
+    signal.signal(signal.SIGINT, lambda *_: worker.stop_event.set())
+
+    try:
+        counts = worker.run()
+    finally:
+        collector.close()
+        work_queue.close()
+
+    return 0 if counts[DONE] or counts[NO_TRANSCRIPT] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
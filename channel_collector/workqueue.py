@@ -0,0 +1,404 @@
+"""
+Общая очередь заданий: один координатор, много рабочих на разных машинах
+
+Координатор листает каналы и кладёт видео в очередь (SQLite). Рабочий
+берёт задания в аренду на lease секунд, качает транскрипты через свои
+прокси и подтверждает результат. Аренда продлевается, пока рабочий жив;
+если он пропал, задание по истечении аренды возвращается в очередь и
+достаётся другому. Результаты забирает координатор и пишет в свой файл.
+
+Рабочие на той же машине открывают файл очереди напрямую, с других машин -
+через HTTP (QueueServer у координатора и RemoteQueue у рабочего).
+"""
+
+import hmac
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Optional, Any
+
+import requests
+
+from .checkpoint import CheckpointStore
+
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = CheckpointStore.DONE
+NO_TRANSCRIPT = CheckpointStore.NO_TRANSCRIPT
+FAILED = CheckpointStore.FAILED
+
+# Итоговые статусы: задание больше никому не выдаётся
+FINISHED = (DONE, NO_TRANSCRIPT, FAILED)
+
+
+@dataclass
+class Job:
+    """Видео, выданное рабочему"""
+
+    channel_id: str
+    video: Dict
+    attempts: int
+
+
+@dataclass
+class JobResult:
+    """Итог задания для координатора"""
+
+    channel_id: str
+    video: Dict
+    status: str
+    transcript: Optional[List[Dict]]
+    error: Optional[str]
+    worker: Optional[str]
+
+
+class JobQueue:
+    """Очередь с арендой заданий в одном файле SQLite"""
+
+    def __init__(self, path: str, lease_seconds: float = 120, max_attempts: int = 3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.requeued = 0
+        self._lock = threading.Lock()
+        # Транзакции вручную: аренда должна быть атомарной и между процессами
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                video_id TEXT PRIMARY KEY,
+                channel_id TEXT NOT NULL,
+                video TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                lease_until REAL,
+                transcript TEXT,
+                error TEXT,
+                collected INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_until);
+            CREATE TABLE IF NOT EXISTS queue_state (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def reset(self):
+        """Начать задание заново"""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM jobs")
+            conn.execute("DELETE FROM queue_state")
+
+    def put(self, channel_id: str, videos: List[Dict]) -> int:
+        """Добавить видео; уже известные пропускаются, кроме неудачных прошлого запуска"""
+        now = time.time()
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                """
+                INSERT INTO jobs (video_id, channel_id, video, status, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (video_id) DO UPDATE SET
+                    status = excluded.status, attempts = 0, worker = NULL, error = NULL,
+                    collected = 0, updated_at = excluded.updated_at
+                WHERE jobs.status = ?
+                """,
+                [
+                    (video['video_id'], channel_id, json.dumps(video, ensure_ascii=False), PENDING, now, FAILED)
+                    for video in videos
+                ]
+            )
+            return conn.total_changes - before
+
+    def _requeue_expired(self, conn: sqlite3.Connection, now: float):
+        """Задания пропавших рабочих - обратно в очередь (или в ошибки после max_attempts)"""
+        conn.execute(
+            """
+            UPDATE jobs SET status = ?, error = 'аренда истекла', worker = NULL, updated_at = ?
+            WHERE status = ? AND lease_until < ? AND attempts >= ?
+            """,
+            (FAILED, now, LEASED, now, self.max_attempts)
+        )
+        cursor = conn.execute(
+            "UPDATE jobs SET status = ?, worker = NULL, updated_at = ? WHERE status = ? AND lease_until < ?",
+            (PENDING, now, LEASED, now)
+        )
+        self.requeued += cursor.rowcount
+
+    def lease(self, worker: str, limit: int = 1) -> List[Job]:
+        """Взять до limit заданий в аренду"""
+        now = time.time()
+        with self._transaction() as conn:
+            self._requeue_expired(conn, now)
+            rows = conn.execute(
+                "SELECT video_id, channel_id, video, attempts FROM jobs WHERE status = ? ORDER BY rowid LIMIT ?",
+                (PENDING, limit)
+            ).fetchall()
+            conn.executemany(
+                """
+                UPDATE jobs SET status = ?, worker = ?, lease_until = ?, attempts = attempts + 1, updated_at = ?
+                WHERE video_id = ?
+                """,
+                [(LEASED, worker, now + self.lease_seconds, now, row[0]) for row in rows]
+            )
+
+        return [Job(channel_id, json.loads(video), attempts + 1) for _, channel_id, video, attempts in rows]
+
+    def renew(self, worker: str, video_ids: List[str]) -> int:
+        """Продлить аренду заданий, которые рабочий ещё держит"""
+        now = time.time()
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE video_id = ? AND worker = ? AND status = ?",
+                [(now + self.lease_seconds, now, video_id, worker, LEASED) for video_id in video_ids]
+            )
+            return conn.total_changes - before
+
+    def ack(self, worker: str, video_id: str, status: str,
+            transcript: Optional[List[Dict]] = None, error: Optional[str] = None) -> bool:
+        """Сдать итог задания; False - аренда уже ушла другому рабочему"""
+        if status not in FINISHED:
+            raise Exception(f"Неизвестный статус задания: {status}")
+
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE jobs SET status = ?, transcript = ?, error = ?, lease_until = NULL, updated_at = ?
+                WHERE video_id = ? AND worker = ? AND status = ?
+                """,
+                (status, json.dumps(transcript, ensure_ascii=False) if transcript is not None else None,
+                 error, time.time(), video_id, worker, LEASED)
+            )
+            return cursor.rowcount > 0
+
+    def release(self, worker: str, video_id: str, error: Optional[str] = None) -> bool:
+        """Вернуть задание после ошибки: его возьмёт другой рабочий (или FAILED после max_attempts)"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END,
+                    worker = CASE WHEN attempts >= ? THEN worker ELSE NULL END,
+                    error = ?, lease_until = NULL, updated_at = ?
+                WHERE video_id = ? AND worker = ? AND status = ?
+                """,
+                (self.max_attempts, FAILED, PENDING, self.max_attempts, error, time.time(),
+                 video_id, worker, LEASED)
+            )
+            return cursor.rowcount > 0
+
+    def take_results(self, limit: int = 100) -> List[JobResult]:
+        """Итоги, которые координатор ещё не забирал"""
+        placeholders = ",".join("?" * len(FINISHED))
+        with self._transaction() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT video_id, channel_id, video, status, transcript, error, worker FROM jobs
+                WHERE status IN ({placeholders}) AND collected = 0 ORDER BY updated_at LIMIT ?
+                """,
+                (*FINISHED, limit)
+            ).fetchall()
+            conn.executemany("UPDATE jobs SET collected = 1 WHERE video_id = ?", [(row[0],) for row in rows])
+
+        return [
+            JobResult(channel_id, json.loads(video), status,
+                      json.loads(transcript) if transcript else None, error, worker)
+            for _, channel_id, video, status, transcript, error, worker in rows
+        ]
+
+    def unfinished(self) -> int:
+        """Заданий в очереди и в аренде"""
+        with self._transaction() as conn:
+            self._requeue_expired(conn, time.time())
+            return conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (PENDING, LEASED)
+            ).fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Заданий по статусам и аренд по рабочим"""
+        with self._lock:
+            statuses = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            workers = dict(self._conn.execute(
+                "SELECT worker, COUNT(*) FROM jobs WHERE status = ? GROUP BY worker", (LEASED,)
+            ).fetchall())
+        return {'statuses': statuses, 'workers': workers, 'requeued': self.requeued,
+                'finished': self.finished}
+
+    @property
+    def finished(self) -> bool:
+        """Координатор закончил: новых заданий не будет"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM queue_state WHERE key = 'finished'").fetchone()
+        return bool(row and row[0] == "1")
+
+    def set_finished(self, finished: bool = True):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO queue_state (key, value) VALUES ('finished', ?)",
+                ("1" if finished else "0",)
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_Server"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if not self.authorized():
+            return
+        if self.path == "/stats":
+            self.send_json(self.server.queue.stats())
+        else:
+            self.send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        if not self.authorized():
+            return
+
+        queue = self.server.queue
+        try:
+            # Битое тело или заголовок - ответ 400, как и прочие ошибки запроса
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if self.path == "/lease":
+                jobs = queue.lease(body['worker'], int(body.get('limit', 1)))
+                self.send_json({'jobs': [asdict(job) for job in jobs], 'finished': queue.finished,
+                                'lease_seconds': queue.lease_seconds})
+            elif self.path == "/renew":
+                self.send_json({'renewed': queue.renew(body['worker'], body['video_ids'])})
+            elif self.path == "/ack":
+                self.send_json({'ok': queue.ack(body['worker'], body['video_id'], body['status'],
+                                                body.get('transcript'), body.get('error'))})
+            elif self.path == "/release":
+                self.send_json({'ok': queue.release(body['worker'], body['video_id'], body.get('error'))})
+            else:
+                self.send_json({"error": "not found"}, status=404)
+        except Exception as e:
+            self.send_json({"error": str(e)}, status=400)
+
+    def authorized(self) -> bool:
+        token = self.server.token
+        given = self.headers.get("X-Queue-Token", "")
+        if token and not hmac.compare_digest(given.encode("utf-8"), token.encode("utf-8")):
+            self.send_json({"error": "unauthorized"}, status=401)
+            return False
+        return True
+
+    def send_json(self, payload, status: int = 200):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    queue: JobQueue
+    token: Optional[str]
+
+
+class QueueServer:
+    """HTTP-доступ к очереди координатора для рабочих с других машин"""
+
+    def __init__(self, queue: JobQueue, port: int, host: str = "127.0.0.1",
+                 token: Optional[str] = None):
+        # Наружу (не 127.0.0.1) - только с токеном
+        if host not in ("127.0.0.1", "localhost") and not token:
+            raise Exception("Очередь на внешнем адресе без токена недоступна")
+        self._server = _Server((host, port), _Handler)
+        self._server.queue = queue
+        self._server.token = token
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def start(self) -> "QueueServer":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class RemoteQueue:
+    """Очередь координатора по HTTP: то же, что нужно рабочему от JobQueue"""
+
+    def __init__(self, url: str, token: Optional[str] = None, timeout: float = 30):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        if token:
+            self.session.headers['X-Queue-Token'] = token
+        self.lease_seconds = 120.0
+        self._finished = False
+
+    def _post(self, path: str, payload: Dict) -> Dict:
+        response = self.session.post(f"{self.url}{path}", json=payload, timeout=self.timeout)
+        if response.status_code != 200:
+            raise Exception(f"Очередь {self.url}: {response.status_code} {response.text[:200]}")
+        return response.json()
+
+    def lease(self, worker: str, limit: int = 1) -> List[Job]:
+        data = self._post("/lease", {'worker': worker, 'limit': limit})
+        self._finished = data.get('finished', False)
+        self.lease_seconds = data.get('lease_seconds', self.lease_seconds)
+        return [Job(**job) for job in data['jobs']]
+
+    def renew(self, worker: str, video_ids: List[str]) -> int:
+        return self._post("/renew", {'worker': worker, 'video_ids': video_ids})['renewed']
+
+    def ack(self, worker: str, video_id: str, status: str,
+            transcript: Optional[List[Dict]] = None, error: Optional[str] = None) -> bool:
+        return self._post("/ack", {'worker': worker, 'video_id': video_id, 'status': status,
+                                   'transcript': transcript, 'error': error})['ok']
+
+    def release(self, worker: str, video_id: str, error: Optional[str] = None) -> bool:
+        return self._post("/release", {'worker': worker, 'video_id': video_id, 'error': error})['ok']
+
+    def stats(self) -> Dict[str, Any]:
+        response = self.session.get(f"{self.url}/stats", timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    @property
+    def finished(self) -> bool:
+        """По последнему ответу на lease"""
+        return self._finished
+
+    def close(self):
+        self.session.close()
+
+
+def open_queue(target: str, token: Optional[str] = None):
+    """Файл очереди или адрес координатора (http://host:port)"""
+    if target.startswith(('http://', 'https://')):
+        return RemoteQueue(target, token)
+    return JobQueue(target)
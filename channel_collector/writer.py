@@ -0,0 +1,170 @@
+"""
+Потоковая запись результатов на диск
+
+Каждый транскрипт дописывается в файл сразу после загрузки, так что
+память не растёт с объёмом сбора, а остановка или падение не теряет
+уже собранное.
+"""
+
+import json
+import os
+import time
+from typing import List, Dict, Optional, IO
+
+from .matcher import format_timestamp
+
+
+class TranscriptWriter:
+    """Запись транскриптов в файл по одному, с периодическим fsync"""
+
+    binary = False
+
+    def __init__(self, path: str, append: bool = False,
+                 fsync_every: int = 10, fsync_interval: float = 30.0):
+        self.path = path
+        self.append = append
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.written = 0
+        self._file: Optional[IO] = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _open(self) -> IO:
+        # Файл создаётся при первой записи: без результатов - без пустого файла
+        if self._file is None:
+            mode = 'a' if self.append else 'w'
+            if self.binary:
+                self._file = open(self.path, mode + 'b')
+            else:
+                self._file = open(self.path, mode, encoding='utf-8')
+        return self._file
+
+    def format_item(self, item: Dict) -> str:
+        raise NotImplementedError
+
+    def serialize(self, item: Dict, segments: Optional[List[Dict]] = None):
+        """Запись для файла; сегменты нужны только форматам с разметкой времени"""
+        return self.format_item(item)
+
+    def write(self, item: Dict, segments: Optional[List[Dict]] = None):
+        """Дописать один транскрипт"""
+        f = self._open()
+        f.write(self.serialize(item, segments))
+        f.flush()
+
+        self.written += 1
+        self._unsynced += 1
+
+        if (self._unsynced >= self.fsync_every
+                or time.monotonic() - self._last_sync >= self.fsync_interval):
+            self.sync()
+
+    def sync(self):
+        """Сбросить данные на диск"""
+        if self._file is None or not self._unsynced:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if self._file is None:
+            return
+        self.sync()
+        self._file.close()
+        self._file = None
+
+    def __enter__(self) -> "TranscriptWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TextTranscriptWriter(TranscriptWriter):
+    """Текстовый формат с заголовками, как раньше"""
+
+    def format_item(self, item: Dict) -> str:
+        banner = "=" * 80
+        return (
+            f"{banner}\n"
+            f"Channel: {item['channel_id']}\n"
+            f"Video ID: {item['video_id']}\n"
+            f"Title: {item['title']}\n"
+            f"{self.format_matches(item)}"
+            f"{banner}\n\n"
+            f"{item['transcript']}\n\n\n"
+        )
+
+    @staticmethod
+    def format_matches(item: Dict) -> str:
+        """Строки совпадений: слово, число и время первых упоминаний"""
+        lines = []
+        for keyword, count in item.get('matches', {}).items():
+            times = [format_timestamp(hit['start']) for hit in item['hits'] if hit['keyword'] == keyword]
+            shown = ", ".join(times[:10]) + (" ..." if len(times) > 10 else "")
+            lines.append(f"Match: {keyword} x{count} @ {shown}\n")
+        return "".join(lines)
+
+
+class JsonlTranscriptWriter(TranscriptWriter):
+    """Одна JSON-строка на видео"""
+
+    def format_item(self, item: Dict) -> str:
+        return json.dumps(item, ensure_ascii=False) + "\n"
+
+
+class ArchiveTranscriptWriter(TranscriptWriter):
+    """Сжатый двоичный архив с сегментами и временем (см. archive.py)"""
+
+    binary = True
+
+    def _open(self) -> IO:
+        # Импорт здесь: python -m channel_collector.archive не должен видеть модуль загруженным
+        from .archive import MAGIC, valid_length
+
+        new = self._file is None and not self.append
+        if self._file is None and self.append:
+            # После падения в конце может быть недописанная запись: дописанное за ней не прочиталось бы
+            length = valid_length(self.path)
+            if os.path.exists(self.path) and os.path.getsize(self.path) != length:
+                with open(self.path, 'r+b') as f:
+                    f.truncate(length)
+            new = length == 0
+        f = super()._open()
+        if new:
+            f.write(MAGIC)
+        return f
+
+    def serialize(self, item: Dict, segments: Optional[List[Dict]] = None) -> bytes:
+        from .archive import encode_record
+
+        return encode_record(item, segments)
+
+
+WRITERS = {
+    'text': TextTranscriptWriter,
+    'jsonl': JsonlTranscriptWriter,
+    'archive': ArchiveTranscriptWriter,
+}
+
+
+def resolve_format(path: str, output_format: str = "auto") -> str:
+    """Формат по имени файла, если не задан явно"""
+    if output_format != "auto":
+        return output_format
+    if path.lower().endswith('.tsa'):
+        return 'archive'
+    return 'jsonl' if path.lower().endswith(('.jsonl', '.ndjson')) else 'text'
+
+
+def open_writer(path: str, output_format: str = "auto", **kwargs) -> TranscriptWriter:
+    """Создать writer нужного формата"""
+    output_format = resolve_format(path, output_format)
+
+    if output_format not in WRITERS:
+        raise Exception(f"Неизвестный формат вывода: {output_format}")
+
+    return WRITERS[output_format](path, **kwargs)
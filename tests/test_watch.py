@@ -0,0 +1,83 @@
+"""
+Наблюдение: видео без субтитров ждёт их с повторами, недоступное - нет
+"""
+
+import json
+
+import pytest
+
+from channel_collector.benchmark import FakeTranscriptCollector
+from channel_collector.fake_server import FakeYouTubeServer
+from channel_collector.keys import ApiKeyPool
+from channel_collector.proxy import ProxyManager
+from channel_collector.quota import QuotaMeter
+from channel_collector.resolver import ChannelDirectory
+from channel_collector.watch import ChannelWatcher, FileSink, WatchStore
+
+CHANNEL = "UCaaaaaaaaaaaaaaaaaaaaaa"
+
+
+class LateCaptionsCollector(FakeTranscriptCollector):
+    """Пока reason задан, библиотека будто бы отвечает этим исключением"""
+
+    reason = "TranscriptsDisabled"
+
+    def get_transcript(self, video_id, proxies=None):
+        if self.reason:
+            self.missing_reasons[video_id] = self.reason
+            return None
+        return super().get_transcript(video_id, proxies)
+
+
+@pytest.fixture
+def server():
+    fake = FakeYouTubeServer().start()
+    yield fake
+    fake.stop()
+
+
+@pytest.fixture
+def make_watcher(server, tmp_path):
+    created = []
+
+    def make(reason):
+        collector = LateCaptionsCollector(server.api_base)
+        collector.reason = reason
+        collector.quota = QuotaMeter(":memory:")
+        collector.key_pool = ApiKeyPool(["key"])
+        collector.directory = ChannelDirectory(":memory:")
+        store = WatchStore(str(tmp_path / "state.sqlite"))
+        sink = FileSink(str(tmp_path / "matches.jsonl"))
+        watcher = ChannelWatcher(
+            collector, store, [(CHANNEL, 60)], [sink], ProxyManager(),
+            backfill=2, retry_after=0, give_up_after=3600, delay_min=0
+        )
+        created.append((store, sink))
+        return watcher
+
+    yield make
+    for store, sink in created:
+        sink.close()
+        store.close()
+
+
+def test_disabled_captions_are_retried_until_they_appear(make_watcher, tmp_path):
+    watcher = make_watcher("TranscriptsDisabled")
+    watcher.poll_due()
+    watcher.fetch_due()
+    assert watcher.store.stats() == {'pending': 2}
+
+    # Автосубтитры готовы к следующему опросу
+    watcher.collector.reason = None
+    watcher.fetch_due()
+    assert watcher.store.stats() == {'done': 2}
+
+    with open(tmp_path / "matches.jsonl", encoding="utf-8") as f:
+        assert len([json.loads(line) for line in f]) == 2
+
+
+def test_unavailable_video_is_not_retried(make_watcher):
+    watcher = make_watcher("VideoUnavailable")
+    watcher.poll_due()
+    watcher.fetch_due()
+    assert watcher.store.stats() == {'no_transcript': 2}
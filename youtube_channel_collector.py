@@ -5,218 +5,29 @@ YouTube Transcript Collector v2.0 with Proxy & Delays
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
+import queue
 import threading
 import time
-import random
-import json
-from pathlib import Path
-from datetime import datetime
-from typing import List, Dict, Optional
-import requests
 
+from channel_collector import (
+    CollectionEngine,
+    CollectorConfig,
+    CollectorEvent,
+    ProxyManager,
+    YouTubeChannelCollector,
+)
+from channel_collector.keys import ApiKeyPool
+from channel_collector.progress import ProgressTracker
 
-class ProxyManager:
-    """Управление прокси с ротацией"""
-    
-    def __init__(self):
-        self.proxies: List[str] = []
-        self.current_index = 0
-        self.requests_count = 0
-        self.rotation_interval = 10
-        self.consecutive_errors = 0
-        self.paused = False
-    
-    def load_proxies(self, file_path: str):
-        """Загрузить прокси из файла"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                self.proxies = [line.strip() for line in f if line.strip() and not line.startswith('#')]
-            self.current_index = 0
-            self.consecutive_errors = 0
-            return len(self.proxies)
-        except Exception as e:
-            raise Exception(f"Ошибка загрузки прокси: {e}")
-    
-    def get_current_proxy(self) -> Optional[str]:
-        """Получить текущий прокси"""
-        if not self.proxies:
-            return None
-        return self.proxies[self.current_index]
-    
-    def rotate_proxy(self):
-        """Сменить прокси"""
-        if not self.proxies:
-            return
-        
-        self.current_index = (self.current_index + 1) % len(self.proxies)
-        self.requests_count = 0
-    
-    def report_success(self):
-        """Отметить успешный запрос"""
-        self.requests_count += 1
-        self.consecutive_errors = 0
-        
-        if self.requests_count >= self.rotation_interval:
-            self.rotate_proxy()
-    
-    def report_error(self) -> str:
-        """Отметить ошибку"""
-        self.consecutive_errors += 1
-        self.rotate_proxy()  # Моментальная смена!
-        
-        if self.consecutive_errors >= 3:
-            self.paused = True
-            return "pause"
-        
-        return "rotate"
-    
-    def resume(self):
-        """Возобновить работу"""
-        self.paused = False
-        self.consecutive_errors = 0
-    
-    def get_proxy_dict(self) -> Optional[Dict[str, str]]:
-        """Получить прокси для requests"""
-        proxy = self.get_current_proxy()
-        if not proxy:
-            return None
-        
-        if not proxy.startswith(('http://', 'https://', 'socks5://', 'socks4://')):
-            proxy = f'http://{proxy}'
-        
-        return {
-            'http': proxy,
-            'https': proxy
-        }
 
-
-class YouTubeChannelCollector:
-    """Сбор транскриптов с YouTube каналов"""
-    
-    def __init__(self, api_key: str):
-        self.api_key = api_key
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-    
-    def get_channel_videos(self, channel_id: str, max_results: int = 50, 
-                          min_duration: int = 0, proxies: Optional[Dict] = None) -> List[Dict]:
-        """Получить список видео канала через YouTube Data API"""
-        try:
-            # Получаем uploads playlist ID
-            url = "https://www.googleapis.com/youtube/v3/channels"
-            params = {
-                'part': 'contentDetails',
-                'id': channel_id,
-                'key': self.api_key
-            }
-            
-            response = self.session.get(url, params=params, proxies=proxies, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-            
-            if 'items' not in data or len(data['items']) == 0:
-                raise Exception(f"Канал {channel_id} не найден")
-            
-            uploads_playlist = data['items'][0]['contentDetails']['relatedPlaylists']['uploads']
-            
-            # Получаем видео из playlist
-            videos = []
-            next_page_token = None
-            
-            while len(videos) < max_results:
-                url = "https://www.googleapis.com/youtube/v3/playlistItems"
-                params = {
-                    'part': 'contentDetails',
-                    'playlistId': uploads_playlist,
-                    'maxResults': min(50, max_results - len(videos)),
-                    'key': self.api_key
-                }
-                
-                if next_page_token:
-                    params['pageToken'] = next_page_token
-                
-                response = self.session.get(url, params=params, proxies=proxies, timeout=30)
-                response.raise_for_status()
-                data = response.json()
-                
-                video_ids = [item['contentDetails']['videoId'] for item in data.get('items', [])]
-                
-                if not video_ids:
-                    break
-                
-                # Получаем детали видео (duration, title)
-                url = "https://www.googleapis.com/youtube/v3/videos"
-                params = {
-                    'part': 'contentDetails,snippet',
-                    'id': ','.join(video_ids),
-                    'key': self.api_key
-                }
-                
-                response = self.session.get(url, params=params, proxies=proxies, timeout=30)
-                response.raise_for_status()
-                video_data = response.json()
-                
-                for item in video_data.get('items', []):
-                    duration = self._parse_duration(item['contentDetails']['duration'])
-                    
-                    if duration >= min_duration:
-                        videos.append({
-                            'video_id': item['id'],
-                            'title': item['snippet']['title'],
-                            'duration': duration,
-                            'published_at': item['snippet']['publishedAt']
-                        })
-                
-                next_page_token = data.get('nextPageToken')
-                if not next_page_token:
-                    break
-            
-            return videos[:max_results]
-        
-        except Exception as e:
-            raise Exception(f"Ошибка получения видео канала {channel_id}: {e}")
-    
-    def _parse_duration(self, duration_str: str) -> int:
-        """Парсинг ISO 8601 duration в минуты"""
-        import re
-        
-        pattern = r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?'
-        match = re.match(pattern, duration_str)
-        
-        if not match:
-            return 0
-        
-        hours = int(match.group(1) or 0)
-        minutes = int(match.group(2) or 0)
-        seconds = int(match.group(3) or 0)
-        
-        return hours * 60 + minutes + (1 if seconds > 30 else 0)
-    
-    def get_transcript(self, video_id: str, proxies: Optional[Dict] = None) -> Optional[List[Dict]]:
-        """Получить транскрипт видео"""
-        try:
-            from youtube_transcript_api import YouTubeTranscriptApi
-            
-            # Получаем транскрипт (приоритет английскому)
-            transcript = YouTubeTranscriptApi.get_transcript(
-                video_id,
-                languages=['en', 'ru', 'es', 'fr', 'de']
-            )
-            
-            return transcript
-        
-        except Exception as e:
-            return None
-    
-    def format_transcript(self, transcript: List[Dict]) -> str:
-        """Форматировать транскрипт в текст"""
-        lines = []
-        for entry in transcript:
-            text = entry.get('text', '')
-            lines.append(text)
-        return ' '.join(lines)
+# Лог окна - кольцевой буфер: старые строки удаляются
+LOG_MAX_LINES = 2000
+# Как часто главный поток разбирает события рабочего потока (мс)
+DRAIN_INTERVAL_MS = 100
+# Сколько событий разбирать за один раз, чтобы окно не замирало
+DRAIN_BATCH = 1000
+# Как часто обновлять панель прогресса (сек)
+PANEL_REFRESH = 0.5
 
 
 class YouTubeCollectorGUI(tk.Tk):
@@ -226,14 +37,20 @@ class YouTubeCollectorGUI(tk.Tk):
         super().__init__()
         
         self.title("YouTube Transcript Collector v2.0 Pro")
-        self.geometry("700x850")
+        self.geometry("760x980")
         
         # Менеджеры
         self.proxy_manager = ProxyManager()
         self.collector = None
+        self.engine = None
         self.stop_event = threading.Event()
         self.worker_thread = None
         
+        # События из рабочего потока: виджеты трогает только главный поток
+        self.events: "queue.Queue[CollectorEvent]" = queue.Queue()
+        self.tracker = ProgressTracker()
+        self.panel_refreshed = 0.0
+        
         # Переменные
         self.api_key_file = tk.StringVar()
         self.output_file = tk.StringVar(value="transcripts_output.txt")
@@ -241,15 +58,28 @@ class YouTubeCollectorGUI(tk.Tk):
         self.video_count = tk.IntVar(value=100)
         self.min_duration = tk.IntVar(value=10)
         self.keyword = tk.StringVar()
+        self.whole_words = tk.BooleanVar(value=False)
+        self.resume = tk.BooleanVar(value=False)
+        self.use_cache = tk.BooleanVar(value=True)
+        self.incremental = tk.BooleanVar(value=False)
+        self.pipeline = tk.BooleanVar(value=False)
+        self.use_index = tk.BooleanVar(value=True)
+        self.skip_collected = tk.BooleanVar(value=False)
+        self.prefilter_keywords = tk.BooleanVar(value=False)
+        self.negotiate_language = tk.BooleanVar(value=False)
         
         # Настройки прокси и задержек
         self.proxy_file = tk.StringVar()
         self.rotation_interval = tk.IntVar(value=10)
         self.delay_min = tk.IntVar(value=3)
         self.delay_max = tk.IntVar(value=10)
+        self.adaptive_delay = tk.BooleanVar(value=True)
+        self.concurrent = tk.BooleanVar(value=False)
+        self.max_concurrency = tk.IntVar(value=4)
         
         # Создаем GUI
         self.create_gui()
+        self.after(DRAIN_INTERVAL_MS, self.drain_events)
     
     def create_gui(self):
         """Создать интерфейс"""
@@ -273,12 +103,12 @@ class YouTubeCollectorGUI(tk.Tk):
         settings_frame = ttk.LabelFrame(main_frame, text="Основные настройки", padding=10)
         settings_frame.pack(fill=tk.X, pady=5)
         
-        # ID каналов
-        ttk.Label(settings_frame, text="ID каналов (через запятую):").grid(row=0, column=0, sticky=tk.W, pady=5)
+        # Каналы
+        ttk.Label(settings_frame, text="Каналы (ID, @handle или ссылки, через запятую):").grid(row=0, column=0, sticky=tk.W, pady=5)
         ttk.Entry(settings_frame, textvariable=self.channel_ids, width=50).grid(row=0, column=1, pady=5, padx=5)
         
         # API ключ
-        ttk.Label(settings_frame, text="Файл с API ключом (.txt):").grid(row=1, column=0, sticky=tk.W, pady=5)
+        ttk.Label(settings_frame, text="Файл с API ключами (.txt):").grid(row=1, column=0, sticky=tk.W, pady=5)
         ttk.Entry(settings_frame, textvariable=self.api_key_file, width=40).grid(row=1, column=1, pady=5, padx=5)
         ttk.Button(settings_frame, text="Выбрать", command=self.select_api_file).grid(row=1, column=2, padx=5)
         
@@ -296,8 +126,33 @@ class YouTubeCollectorGUI(tk.Tk):
         ttk.Spinbox(settings_frame, from_=0, to=180, textvariable=self.min_duration, width=20).grid(row=4, column=1, sticky=tk.W, pady=5, padx=5)
         
         # Ключевое слово
-        ttk.Label(settings_frame, text="Ключевое слово (например, META):").grid(row=5, column=0, sticky=tk.W, pady=5)
+        ttk.Label(settings_frame, text="Ключевые слова через запятую (META, AAPL):").grid(row=5, column=0, sticky=tk.W, pady=5)
         ttk.Entry(settings_frame, textvariable=self.keyword, width=30).grid(row=5, column=1, sticky=tk.W, pady=5, padx=5)
+        ttk.Checkbutton(settings_frame, text="Целые слова", variable=self.whole_words).grid(row=5, column=2, sticky=tk.W, padx=5)
+        
+        # Продолжение прерванного запуска
+        ttk.Checkbutton(settings_frame, text="Продолжить прошлый запуск (пропустить готовые видео)", variable=self.resume).grid(row=6, column=0, columnspan=3, sticky=tk.W, pady=5)
+        
+        # Кэш транскриптов
+        ttk.Checkbutton(settings_frame, text="Кэшировать транскрипты (повторный сбор без сети)", variable=self.use_cache).grid(row=7, column=0, columnspan=3, sticky=tk.W, pady=5)
+        
+        # Инкрементальное обновление
+        ttk.Checkbutton(settings_frame, text="Инкрементально: листать каналы только до известных видео", variable=self.incremental).grid(row=8, column=0, columnspan=3, sticky=tk.W, pady=5)
+        
+        # Конвейер
+        ttk.Checkbutton(settings_frame, text="Конвейер: качать транскрипты, пока каналы ещё листаются", variable=self.pipeline).grid(row=9, column=0, columnspan=3, sticky=tk.W, pady=5)
+        
+        # Полнотекстовый индекс
+        ttk.Checkbutton(settings_frame, text="Индексировать для поиска (transcripts_index.sqlite)", variable=self.use_index).grid(row=10, column=0, columnspan=3, sticky=tk.W, pady=5)
+        
+        # Дубликаты между запусками
+        ttk.Checkbutton(settings_frame, text="Не собирать повторно видео из прошлых запусков", variable=self.skip_collected).grid(row=11, column=0, columnspan=3, sticky=tk.W, pady=5)
+        
+        # Отсев по метаданным до загрузки
+        ttk.Checkbutton(settings_frame, text="Качать только видео со словами в названии, описании или тегах", variable=self.prefilter_keywords).grid(row=12, column=0, columnspan=3, sticky=tk.W, pady=5)
+        
+        # Выбор дорожки субтитров
+        ttk.Checkbutton(settings_frame, text="Выбирать дорожку: ручные субтитры раньше автоматических, любой язык канала", variable=self.negotiate_language).grid(row=13, column=0, columnspan=3, sticky=tk.W, pady=5)
         
         # ===== НАСТРОЙКИ ПРОКСИ =====
         proxy_frame = ttk.LabelFrame(main_frame, text="🌐 Настройки прокси (защита от банов)", padding=10)
@@ -313,9 +168,13 @@ class YouTubeCollectorGUI(tk.Tk):
         ttk.Label(proxy_frame, text="Ротация каждые (запросов):").grid(row=1, column=0, sticky=tk.W, pady=5)
         ttk.Spinbox(proxy_frame, from_=5, to=50, textvariable=self.rotation_interval, width=10).grid(row=1, column=1, sticky=tk.W, pady=5, padx=5)
         
+        # Параллельный режим
+        ttk.Checkbutton(proxy_frame, text="Параллельно (полоса на прокси), потоков max:", variable=self.concurrent).grid(row=2, column=0, columnspan=2, sticky=tk.W, pady=5)
+        ttk.Spinbox(proxy_frame, from_=1, to=64, textvariable=self.max_concurrency, width=10).grid(row=2, column=2, sticky=tk.W, pady=5, padx=5)
+        
         # Статус прокси
         self.proxy_status_label = ttk.Label(proxy_frame, text="Прокси не загружены", foreground="red")
-        self.proxy_status_label.grid(row=2, column=0, columnspan=4, sticky=tk.W, pady=5)
+        self.proxy_status_label.grid(row=3, column=0, columnspan=4, sticky=tk.W, pady=5)
         
         # ===== НАСТРОЙКИ ЗАДЕРЖЕК =====
         delay_frame = ttk.LabelFrame(main_frame, text="⏱️ Задержки между запросами", padding=10)
@@ -327,6 +186,9 @@ class YouTubeCollectorGUI(tk.Tk):
         ttk.Label(delay_frame, text="Задержка max (сек):").grid(row=0, column=2, sticky=tk.W, pady=5, padx=(20, 0))
         ttk.Spinbox(delay_frame, from_=1, to=60, textvariable=self.delay_max, width=10).grid(row=0, column=3, sticky=tk.W, pady=5, padx=5)
         
+        # Адаптивный темп: от min, замедление по сигналам YouTube
+        ttk.Checkbutton(delay_frame, text="Адаптивно (min - нижняя граница, max не используется)", variable=self.adaptive_delay).grid(row=1, column=0, columnspan=4, sticky=tk.W, pady=5)
+        
         # ===== КНОПКИ УПРАВЛЕНИЯ =====
         control_frame = ttk.Frame(main_frame)
         control_frame.pack(fill=tk.X, pady=10)
@@ -358,11 +220,37 @@ class YouTubeCollectorGUI(tk.Tk):
             command=self.resume_work
         ).pack(side=tk.LEFT, padx=5)
         
+        # ===== ПРОГРЕСС =====
+        progress_frame = ttk.LabelFrame(main_frame, text="📈 Прогресс", padding=10)
+        progress_frame.pack(fill=tk.X, pady=5)
+        
+        self.progress_bar = ttk.Progressbar(progress_frame, maximum=1.0, mode="determinate")
+        self.progress_bar.pack(fill=tk.X)
+        
+        self.progress_label = ttk.Label(progress_frame, text="Ожидание запуска")
+        self.progress_label.pack(anchor=tk.W, pady=5)
+        
+        # Состояние прокси: успехи, ошибки, задержка, остывание и темп
+        columns = {
+            "status": ("Статус", 110),
+            "ok": ("Успешно", 70),
+            "errors": ("Ошибок", 70),
+            "latency": ("Задержка", 80),
+            "interval": ("Интервал", 80),
+        }
+        self.proxy_table = ttk.Treeview(progress_frame, columns=list(columns), height=4)
+        self.proxy_table.heading("#0", text="Прокси")
+        self.proxy_table.column("#0", width=220)
+        for column, (title, width) in columns.items():
+            self.proxy_table.heading(column, text=title)
+            self.proxy_table.column(column, width=width, anchor=tk.CENTER)
+        self.proxy_table.pack(fill=tk.X)
+        
         # ===== ЛОГ =====
         log_frame = ttk.LabelFrame(main_frame, text="Лог", padding=10)
         log_frame.pack(fill=tk.BOTH, expand=True, pady=5)
         
-        self.log_text = scrolledtext.ScrolledText(log_frame, height=15, width=80)
+        self.log_text = scrolledtext.ScrolledText(log_frame, height=12, width=80)
         self.log_text.pack(fill=tk.BOTH, expand=True)
         
         # ===== СТАТУС =====
@@ -370,23 +258,95 @@ class YouTubeCollectorGUI(tk.Tk):
         self.status_label.pack(pady=10)
     
     def log(self, message: str, level: str = "INFO"):
-        """Вывести сообщение в лог"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        
-        icons = {
-            "INFO": "ℹ️",
-            "SUCCESS": "✅",
-            "ERROR": "❌",
-            "WARNING": "⚠️",
-            "PROXY": "🌐"
-        }
+        """Вывести сообщение в лог (из любого потока)"""
+        self.events.put(CollectorEvent("log", message, level))
+    
+    def drain_events(self):
+        """Разобрать накопившиеся события пакетом и обновить окно"""
+        lines = []
+        try:
+            for _ in range(DRAIN_BATCH):
+                event = self.events.get_nowait()
+                
+                if event.kind in ("log", "resumed"):
+                    lines.append(event.format())
+                elif event.kind == "paused":
+                    self.status_label.config(text=event.message)
+                elif event.kind == "transcript":
+                    self.status_label.config(text=f"Собрано: {event.data['item']['title']}")
+                elif event.kind in ("channel", "planned", "video"):
+                    self.tracker.update(event)
+                elif event.kind == "proxy_check":
+                    self.show_proxy_check(event.data['alive'], event.data['dead'])
+                elif event.kind == "worker_done":
+                    # Диалог - после разбора пачки, чтобы не задерживать лог
+                    self.after(0, self.collection_finished, event)
+        except queue.Empty:
+            pass
+        
+        if lines:
+            self.write_log(lines)
+        
+        now = time.monotonic()
+        if now - self.panel_refreshed >= PANEL_REFRESH:
+            self.panel_refreshed = now
+            self.refresh_progress()
+        
+        self.after(DRAIN_INTERVAL_MS, self.drain_events)
+    
+    def write_log(self, lines: list):
+        """Добавить строки одной вставкой и обрезать лог до LOG_MAX_LINES"""
+        lines = lines[-LOG_MAX_LINES:]
+        self.log_text.insert(tk.END, "\n".join(lines) + "\n")
         
-        icon = icons.get(level, "ℹ️")
-        log_message = f"[{timestamp}] {icon} {message}\n"
+        total = int(self.log_text.index("end-1c").split(".")[0]) - 1
+        if total > LOG_MAX_LINES:
+            self.log_text.delete("1.0", f"{total - LOG_MAX_LINES + 1}.0")
         
-        self.log_text.insert(tk.END, log_message)
         self.log_text.see(tk.END)
-        self.log_text.update()
+    
+    def refresh_progress(self):
+        """Скорость, оценка остатка и состояние прокси"""
+        tracker = self.tracker
+        if tracker.started is not None:
+            self.progress_bar["value"] = tracker.fraction
+            self.progress_label.config(text=tracker.summary())
+        
+        pacing = self.engine.pacing if self.engine else None
+        rows = self.proxy_manager.snapshot()
+        if not rows and pacing:
+            rows = [{'proxy': None, 'current': True, 'successes': None, 'failures': None,
+                     'latency': None, 'cooldown': 0.0}]
+        
+        # Не pacing.get: он заводит регулятор для прокси, который ещё не работал
+        pacers = dict(pacing.pacers) if pacing else {}
+        seen = set()
+        for row in rows:
+            item = row['proxy'] or "direct"
+            seen.add(item)
+            
+            if row['cooldown'] > 0:
+                status = f"🧊 {row['cooldown']:.0f} с"
+            elif row['current']:
+                status = "▶ текущий"
+            else:
+                status = "✅"
+            
+            values = (
+                status,
+                "" if row['successes'] is None else row['successes'],
+                "" if row['failures'] is None else row['failures'],
+                f"{row['latency']:.2f} с" if row['latency'] is not None else "",
+                f"{pacers[row['proxy']].interval:.1f} с" if row['proxy'] in pacers else "",
+            )
+            if self.proxy_table.exists(item):
+                self.proxy_table.item(item, values=values)
+            else:
+                self.proxy_table.insert("", tk.END, iid=item, text=row['proxy'] or "прямое соединение", values=values)
+        
+        for item in self.proxy_table.get_children():
+            if item not in seen:
+                self.proxy_table.delete(item)
     
     def select_api_file(self):
         """Выбрать файл с API ключом"""
@@ -402,7 +362,7 @@ class YouTubeCollectorGUI(tk.Tk):
         filename = filedialog.asksaveasfilename(
             title="Сохранить как",
             defaultextension=".txt",
-            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
+            filetypes=[("Text files", "*.txt"), ("JSON Lines", "*.jsonl"), ("Архив с разметкой времени", "*.tsa"), ("All files", "*.*")]
         )
         if filename:
             self.output_file.set(filename)
@@ -434,11 +394,30 @@ class YouTubeCollectorGUI(tk.Tk):
             )
             
             self.log(f"Загружено {count} прокси из {proxy_file}", "SUCCESS")
+            self.log("Проверка прокси...", "PROXY")
+            
+            threading.Thread(target=self.check_proxies_worker, daemon=True).start()
         
         except Exception as e:
             messagebox.showerror("Ошибка", str(e))
             self.log(f"Ошибка загрузки прокси: {e}", "ERROR")
     
+    def check_proxies_worker(self):
+        """Параллельная проверка прокси в фоне"""
+        alive, dead = self.proxy_manager.check_proxies()
+        self.events.put(CollectorEvent("proxy_check", data={'alive': len(alive), 'dead': dead}))
+    
+    def show_proxy_check(self, alive: int, dead: list):
+        """Показать результат проверки прокси"""
+        for proxy in dead:
+            self.log(f"Прокси не отвечает, исключён: {proxy}", "WARNING")
+        
+        self.proxy_status_label.config(
+            text=f"Рабочих прокси: {alive} (исключено: {len(dead)})",
+            foreground="green" if alive else "red"
+        )
+        self.log(f"Рабочих прокси: {alive}", "SUCCESS" if alive else "ERROR")
+    
     def reload_proxies(self):
         """Перезагрузить прокси"""
         if self.proxy_file.get():
@@ -450,21 +429,11 @@ class YouTubeCollectorGUI(tk.Tk):
         self.proxy_manager.resume()
         self.log("Работа возобновлена", "SUCCESS")
     
-    def smart_delay(self):
-        """Умная задержка"""
-        delay = random.uniform(self.delay_min.get(), self.delay_max.get())
-        
-        # Иногда длинная пауза
-        if random.random() < 0.05:
-            delay += random.uniform(10, 30)
-        
-        time.sleep(delay)
-    
     def start_collection(self):
         """Начать сбор"""
         # Проверки
         if not self.channel_ids.get().strip():
-            messagebox.showwarning("Внимание", "Введите ID каналов!")
+            messagebox.showwarning("Внимание", "Введите ID, @handle или ссылки на каналы!")
             return
         
         if not self.api_key_file.get():
@@ -473,21 +442,56 @@ class YouTubeCollectorGUI(tk.Tk):
         
         # Загружаем API ключ
         try:
-            with open(self.api_key_file.get(), 'r', encoding='utf-8') as f:
-                api_key = f.read().strip()
-            
-            self.collector = YouTubeChannelCollector(api_key)
+            api_keys = CollectorConfig.read_api_keys(self.api_key_file.get())
+            self.collector = YouTubeChannelCollector(api_keys[0], key_pool=ApiKeyPool(api_keys))
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось загрузить API ключ:\n{e}")
             return
         
+        # Переменные Tk читаются только здесь, в главном потоке
+        try:
+            config = CollectorConfig(
+                api_key=self.collector.api_key,
+                api_keys=self.collector.key_pool.keys,
+                channel_ids=CollectorConfig.parse_channels(self.channel_ids.get()),
+                output_file=self.output_file.get(),
+                checkpoint_file=f"{self.output_file.get()}.checkpoint.sqlite",
+                resume=self.resume.get(),
+                cache_file="transcripts_cache.sqlite" if self.use_cache.get() else None,
+                sync_file="channel_sync.sqlite" if self.incremental.get() else None,
+                index_file="transcripts_index.sqlite" if self.use_index.get() else None,
+                dedup_file="collected_fingerprints.sqlite" if self.skip_collected.get() else None,
+                quota_file="quota_usage.sqlite",
+                channel_cache="channels_cache.sqlite",
+                video_count=self.video_count.get(),
+                min_duration=self.min_duration.get(),
+                keyword=self.keyword.get(),
+                whole_words=self.whole_words.get(),
+                prefilter_keywords=self.prefilter_keywords.get(),
+                negotiate_language=self.negotiate_language.get(),
+                rotation_interval=self.rotation_interval.get(),
+                delay_min=self.delay_min.get(),
+                delay_max=self.delay_max.get(),
+                adaptive_delay=self.adaptive_delay.get(),
+                concurrent=self.concurrent.get(),
+                max_concurrency=self.max_concurrency.get(),
+                pipeline=self.pipeline.get()
+            )
+        except (tk.TclError, ValueError) as e:
+            messagebox.showerror("Ошибка", f"Неверные настройки:\n{e}")
+            return
+        
         # Запуск
         self.stop_event.clear()
+        self.tracker = ProgressTracker()
+        self.progress_bar["value"] = 0
+        self.progress_label.config(text="Листинг каналов...")
         self.start_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
         
         self.worker_thread = threading.Thread(
             target=self.collection_worker,
+            args=(config,),
             daemon=True
         )
         self.worker_thread.start()
@@ -497,164 +501,48 @@ class YouTubeCollectorGUI(tk.Tk):
         self.stop_event.set()
         self.log("Остановка...", "WARNING")
     
-    def collection_worker(self):
+    def handle_event(self, event: CollectorEvent):
+        """Событие движка из рабочего потока - в очередь главного"""
+        self.events.put(event)
+    
+    def collection_worker(self, config: CollectorConfig):
         """Рабочий поток сбора"""
         try:
-            # Парсим каналы
-            channels = [ch.strip() for ch in self.channel_ids.get().split(',') if ch.strip()]
-            
-            self.log(f"Начало сбора с {len(channels)} каналов", "INFO")
-            
-            all_transcripts = []
-            total_videos = 0
-            
-            for channel_id in channels:
-                if self.stop_event.is_set():
-                    break
-                
-                # Проверка паузы
-                while self.proxy_manager.paused and not self.stop_event.is_set():
-                    self.log("⏸ ПАУЗА: 3 ошибки подряд! Смените прокси и нажмите 'Продолжить'", "ERROR")
-                    self.status_label.config(text="⏸ ПАУЗА - Ожидание оператора")
-                    time.sleep(1)
-                
-                if self.stop_event.is_set():
-                    break
-                
-                self.log(f"Обработка канала: {channel_id}", "INFO")
-                
-                try:
-                    # Получаем прокси
-                    proxies = self.proxy_manager.get_proxy_dict()
-                    
-                    if proxies:
-                        self.log(f"Используем прокси: {self.proxy_manager.get_current_proxy()}", "PROXY")
-                    
-                    # Получаем видео канала
-                    videos = self.collector.get_channel_videos(
-                        channel_id,
-                        max_results=self.video_count.get(),
-                        min_duration=self.min_duration.get(),
-                        proxies=proxies
-                    )
-                    
-                    self.proxy_manager.report_success()
-                    
-                    self.log(f"Найдено {len(videos)} видео", "SUCCESS")
-                    
-                    # Обрабатываем каждое видео
-                    for idx, video in enumerate(videos, 1):
-                        if self.stop_event.is_set():
-                            break
-                        
-                        # Проверка паузы
-                        while self.proxy_manager.paused and not self.stop_event.is_set():
-                            time.sleep(1)
-                        
-                        if self.stop_event.is_set():
-                            break
-                        
-                        self.log(f"[{idx}/{len(videos)}] {video['title']}", "INFO")
-                        
-                        try:
-                            # Получаем прокси
-                            proxies = self.proxy_manager.get_proxy_dict()
-                            
-                            # Получаем транскрипт
-                            transcript = self.collector.get_transcript(
-                                video['video_id'],
-                                proxies=proxies
-                            )
-                            
-                            if transcript:
-                                text = self.collector.format_transcript(transcript)
-                                
-                                # Фильтрация по ключевому слову
-                                keyword = self.keyword.get().strip()
-                                if keyword:
-                                    if keyword.lower() in text.lower():
-                                        all_transcripts.append({
-                                            'channel_id': channel_id,
-                                            'video_id': video['video_id'],
-                                            'title': video['title'],
-                                            'transcript': text
-                                        })
-                                        total_videos += 1
-                                        self.log(f"✅ Найдено ключевое слово '{keyword}'", "SUCCESS")
-                                else:
-                                    all_transcripts.append({
-                                        'channel_id': channel_id,
-                                        'video_id': video['video_id'],
-                                        'title': video['title'],
-                                        'transcript': text
-                                    })
-                                    total_videos += 1
-                                
-                                self.proxy_manager.report_success()
-                            else:
-                                self.log(f"⚠️ Транскрипт недоступен", "WARNING")
-                            
-                            # Задержка
-                            if idx < len(videos):
-                                self.smart_delay()
-                        
-                        except Exception as e:
-                            self.log(f"❌ Ошибка: {e}", "ERROR")
-                            
-                            action = self.proxy_manager.report_error()
-                            
-                            if action == "rotate":
-                                self.log("Смена прокси...", "PROXY")
-                            
-                            time.sleep(random.uniform(2, 5))
-                
-                except Exception as e:
-                    self.log(f"❌ Ошибка канала {channel_id}: {e}", "ERROR")
-                    
-                    action = self.proxy_manager.report_error()
-                    
-                    if action == "rotate":
-                        self.log("Смена прокси...", "PROXY")
-                
-                # Задержка между каналами
-                if channels.index(channel_id) < len(channels) - 1:
-                    time.sleep(random.uniform(5, 15))
+            self.engine = CollectionEngine(
+                config,
+                proxy_manager=self.proxy_manager,
+                collector=self.collector,
+                on_event=self.handle_event,
+                stop_event=self.stop_event
+            )
             
-            # Сохраняем результаты
-            if all_transcripts:
-                output_path = self.output_file.get()
-                
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    for item in all_transcripts:
-                        f.write(f"="*80 + "\n")
-                        f.write(f"Channel: {item['channel_id']}\n")
-                        f.write(f"Video ID: {item['video_id']}\n")
-                        f.write(f"Title: {item['title']}\n")
-                        f.write(f"="*80 + "\n\n")
-                        f.write(item['transcript'])
-                        f.write("\n\n\n")
-                
-                self.log("="*50, "INFO")
-                self.log(f"Завершено! Собрано транскриптов: {total_videos}", "SUCCESS")
-                self.log(f"Сохранено в: {output_path}", "SUCCESS")
-                
-                messagebox.showinfo(
-                    "Готово",
-                    f"Собрано транскриптов: {total_videos}\n"
-                    f"Сохранено в: {output_path}"
-                )
-            else:
-                self.log("Транскрипты не найдены", "WARNING")
-                messagebox.showwarning("Внимание", "Транскрипты не найдены")
+            result = self.engine.run()
+            self.events.put(CollectorEvent("worker_done", data={'result': result}))
         
         except Exception as e:
             self.log(f"Критическая ошибка: {e}", "ERROR")
-            messagebox.showerror("Ошибка", str(e))
+            self.events.put(CollectorEvent("worker_done", str(e), "ERROR"))
+    
+    def collection_finished(self, event: CollectorEvent):
+        """Итог рабочего потока - в главном потоке"""
+        self.start_button.config(state=tk.NORMAL)
+        self.stop_button.config(state=tk.DISABLED)
+        self.status_label.config(text="Готово")
+        self.refresh_progress()
+        
+        if event.level == "ERROR":
+            messagebox.showerror("Ошибка", event.message)
+            return
         
-        finally:
-            self.start_button.config(state=tk.NORMAL)
-            self.stop_button.config(state=tk.DISABLED)
-            self.status_label.config(text="Готово")
+        result = event.data['result']
+        if result.output_file:
+            messagebox.showinfo(
+                "Готово",
+                f"Собрано транскриптов: {result.total_videos}\n"
+                f"Сохранено в: {result.output_file}"
+            )
+        else:
+            messagebox.showwarning("Внимание", "Транскрипты не найдены")
 
 
 if __name__ == "__main__":